@@ -0,0 +1,311 @@
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DATA = "data/BSAI_OFL_ABC_TAC.csv"
+OUT_PATH = "data/backtest_scores.csv"
+
+METRICS = ["OFL", "ABC", "TAC"]
+
+# Reference metric for the ratio carry-forward baseline: the target/ref ratio
+# from the origin year is applied to the projected (lag 2) reference value.
+RATIO_REFERENCE = {"ABC": "OFL", "TAC": "ABC"}
+
+SERIES_KEY = ["Species", "Area"]
+
+
+def to_num(series):
+    s = series.astype(str).str.replace(",", "", regex=False).str.strip()
+    s = s.replace({"": pd.NA, "na": pd.NA, "n/a": pd.NA, "N/A": pd.NA, "None": pd.NA, "nan": pd.NA})
+    return pd.to_numeric(s, errors="coerce")
+
+
+def load_long(path, oy_only=True):
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    if oy_only and "OY" in df.columns:
+        df = df[df["OY"] == 1]
+    df = df.copy()
+    df["Area"] = df["Area"].fillna("").astype(str)
+    for m in METRICS:
+        if m in df.columns:
+            df[m] = to_num(df[m])
+    # One value per (ProjYear, lag, series); overlapping documents keep the
+    # first row, as in the scraper's dedup.
+    return df.drop_duplicates(subset=["ProjYear", "lag"] + SERIES_KEY, keep="first")
+
+
+# Baselines take the panel, a metric and an integer array of target rows
+# (year indices) and return forecasts with shape (len(rows), n_series) using
+# only information available at the origin, row - 1.
+
+def _lagged(arr, rows, k):
+    idx = rows - k
+    out = arr[np.clip(idx, 0, None)]
+    out[idx < 0] = np.nan
+    return out
+
+
+def baseline_projection(panel, metric, rows):
+    return panel["proj"][metric][rows]
+
+
+def baseline_rollover(panel, metric, rows):
+    return _lagged(panel["used"][metric], rows, 1)
+
+
+def make_moving_average(k):
+    def baseline(panel, metric, rows):
+        stack = np.stack([_lagged(panel["used"][metric], rows, j) for j in range(1, k + 1)])
+        with np.errstate(invalid="ignore"):
+            n = np.isfinite(stack).sum(axis=0)
+            out = np.nansum(stack, axis=0) / np.where(n > 0, n, 1)
+        out[n == 0] = np.nan
+        return out
+    baseline.lookback = k
+    return baseline
+
+
+def baseline_last_change(panel, metric, rows):
+    u1 = _lagged(panel["used"][metric], rows, 1)
+    u2 = _lagged(panel["used"][metric], rows, 2)
+    return np.clip(2 * u1 - u2, 0, None)
+
+
+def baseline_ratio_carry_forward(panel, metric, rows):
+    ref = RATIO_REFERENCE.get(metric)
+    if ref is None or ref not in panel["used"]:
+        return np.full((len(rows), len(panel["series"])), np.nan)
+    num = _lagged(panel["used"][metric], rows, 1)
+    den = _lagged(panel["used"][ref], rows, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(den > 0, num / den, np.nan)
+    return ratio * panel["proj"][ref][rows]
+
+
+baseline_rollover.lookback = 1
+baseline_projection.lookback = 1
+baseline_last_change.lookback = 2
+baseline_ratio_carry_forward.lookback = 1
+
+BASELINES = {
+    "projection": baseline_projection,
+    "rollover": baseline_rollover,
+    "moving_avg_3": make_moving_average(3),
+    "moving_avg_5": make_moving_average(5),
+    "last_change": baseline_last_change,
+    "ratio_carry_forward": baseline_ratio_carry_forward,
+}
+
+
+def max_lookback(baselines):
+    return max(getattr(f, "lookback", 1) for f in baselines.values())
+
+
+def _empty_panel(metrics):
+    return {
+        "years": np.zeros(0, dtype=int),
+        "series": [],
+        "series_index": {},
+        "used": {m: np.zeros((0, 0)) for m in metrics},
+        "proj": {m: np.zeros((0, 0)) for m in metrics},
+    }
+
+
+def _grow(panel, years, series):
+    """Extend the dense year x series arrays to cover new years/series."""
+    new_series = [s for s in series if s not in panel["series_index"]]
+    for s in new_series:
+        panel["series_index"][s] = len(panel["series"])
+        panel["series"].append(s)
+
+    lo = int(min(years)) if len(years) else None
+    hi = int(max(years)) if len(years) else None
+    old_years = panel["years"]
+    if len(old_years):
+        lo = min(lo, int(old_years[0])) if lo is not None else int(old_years[0])
+        hi = max(hi, int(old_years[-1])) if hi is not None else int(old_years[-1])
+    if lo is None:
+        return 0
+    new_years = np.arange(lo, hi + 1)
+    pre = int(old_years[0] - lo) if len(old_years) else 0
+    S = len(panel["series"])
+    for block in ("used", "proj"):
+        for m, arr in panel[block].items():
+            grown = np.full((len(new_years), S), np.nan)
+            if arr.size:
+                grown[pre:pre + arr.shape[0], :arr.shape[1]] = arr
+            panel[block][m] = grown
+    panel["years"] = new_years
+    return pre
+
+
+def _scatter(panel, df):
+    """Write lag-1 and lag-2 values from `df` into the panel; return touched rows."""
+    yi = df["ProjYear"].to_numpy(dtype=int) - int(panel["years"][0])
+    si = np.array([panel["series_index"][s] for s in zip(df["Species"], df["Area"])], dtype=int)
+    lag = df["lag"].to_numpy()
+    for m in panel["used"]:
+        if m not in df.columns:
+            continue
+        vals = df[m].to_numpy(dtype=float)
+        used = lag == 1
+        proj = lag == 2
+        panel["used"][m][yi[used], si[used]] = vals[used]
+        panel["proj"][m][yi[proj], si[proj]] = vals[proj]
+    return np.unique(yi)
+
+
+def build_panel(df, metrics=None):
+    metrics = [m for m in (metrics or METRICS) if m in df.columns]
+    # Ratio baselines need their reference metric even when not scored.
+    for m in list(metrics):
+        ref = RATIO_REFERENCE.get(m)
+        if ref and ref in df.columns and ref not in metrics:
+            metrics.append(ref)
+    panel = _empty_panel(metrics)
+    series = list(dict.fromkeys(zip(df["Species"], df["Area"])))
+    _grow(panel, df["ProjYear"].unique(), series)
+    _scatter(panel, df)
+    return panel
+
+
+def forecast_rows(panel, metric, rows, baselines=None):
+    baselines = baselines or BASELINES
+    return np.stack([f(panel, metric, rows) for f in baselines.values()])
+
+
+def error_rows(panel, metric, rows, baselines=None):
+    """Absolute and absolute-percent errors, shape (n_baselines, len(rows), n_series)."""
+    fc = forecast_rows(panel, metric, rows, baselines)
+    obs = panel["used"][metric][rows]
+    err = np.abs(fc - obs[None])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = np.where(obs[None] > 0, err / obs[None], np.nan)
+    return err, ape
+
+
+def run_backtest(df, metrics=None, baselines=None):
+    """Evaluate every baseline over every origin year in one pass."""
+    baselines = baselines or BASELINES
+    metrics = [m for m in (metrics or ["ABC", "TAC"]) if m in df.columns]
+    panel = build_panel(df, metrics)
+    state = {"panel": panel, "metrics": metrics, "baselines": baselines, "err": {}, "ape": {}}
+    rows = np.arange(len(panel["years"]))
+    for m in metrics:
+        state["err"][m], state["ape"][m] = error_rows(panel, m, rows, baselines)
+    return state
+
+
+def append_rows(state, df_new):
+    """Add a new assessment year (or corrected rows) without recomputing history.
+
+    Only target rows whose forecasts can see the new values are re-scored:
+    the touched years plus the baselines' maximum lookback.
+    """
+    panel = state["panel"]
+    baselines = state["baselines"]
+    series = list(dict.fromkeys(zip(df_new["Species"], df_new["Area"])))
+    n_old_series = len(panel["series"])
+    pre = _grow(panel, df_new["ProjYear"].unique(), series)
+    touched = _scatter(panel, df_new)
+
+    Y, S = len(panel["years"]), len(panel["series"])
+    for m in state["metrics"]:
+        for key in ("err", "ape"):
+            old = state[key][m]
+            grown = np.full((len(baselines), Y, S), np.nan)
+            grown[:, pre:pre + old.shape[1], :n_old_series] = old
+            state[key][m] = grown
+
+    lookback = max_lookback(baselines)
+    rows = np.unique((touched[:, None] + np.arange(lookback + 1)[None]).ravel())
+    rows = rows[rows < Y]
+    for m in state["metrics"]:
+        err, ape = error_rows(panel, m, rows, baselines)
+        state["err"][m][:, rows] = err
+        state["ape"][m][:, rows] = ape
+    return rows
+
+
+def score_table(state, start_year=None, end_year=None):
+    """MAE/MAPE and win rate per baseline x series x metric."""
+    panel = state["panel"]
+    names = list(state["baselines"])
+    years = panel["years"]
+    keep = np.ones(len(years), dtype=bool)
+    if start_year is not None:
+        keep &= years >= start_year
+    if end_year is not None:
+        keep &= years <= end_year
+
+    frames = []
+    for m in state["metrics"]:
+        err = state["err"][m][:, keep]
+        ape = state["ape"][m][:, keep]
+        valid = np.isfinite(err)
+        # A baseline wins an origin when its error ties the best available one.
+        best = np.where(valid.any(axis=0), np.nanmin(np.where(valid, err, np.inf), axis=0), np.nan)
+        win = valid & (err <= best[None] + 1e-9)
+        contested = valid.sum(axis=0) >= 2
+
+        n = valid.sum(axis=1)
+        n_ape = np.isfinite(ape).sum(axis=1)
+        n_contested = (valid & contested[None]).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mae = np.where(n > 0, np.nansum(err, axis=1) / n, np.nan)
+            mape = np.where(n_ape > 0, np.nansum(ape, axis=1) / n_ape, np.nan)
+            win_rate = np.where(n_contested > 0, (win & contested[None]).sum(axis=1) / n_contested, np.nan)
+
+        B, S = mae.shape
+        species = [s[0] for s in panel["series"]]
+        areas = [s[1] for s in panel["series"]]
+        frames.append(pd.DataFrame({
+            "Metric": m,
+            "Baseline": np.repeat(names, S),
+            "Species": np.tile(species, B),
+            "Area": np.tile(areas, B),
+            "n": n.ravel(),
+            "MAE": mae.ravel(),
+            "MAPE": mape.ravel(),
+            "WinRate": win_rate.ravel(),
+        }))
+    out = pd.concat(frames, ignore_index=True)
+    return out[out["n"] > 0].reset_index(drop=True)
+
+
+def summary_table(scores):
+    """Series-weighted overall scores per metric and baseline."""
+    g = scores.groupby(["Metric", "Baseline"], sort=False)
+    return pd.DataFrame({
+        "series": g.size(),
+        "n": g["n"].sum(),
+        "MAPE_mean": g["MAPE"].mean(),
+        "WinRate_mean": g["WinRate"].mean(),
+    }).reset_index()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Rolling-origin backtest of ABC/TAC forecast baselines.")
+    ap.add_argument("--data", default=DEFAULT_DATA, help="Long harvest-spec CSV (AssmentYr, ProjYear, lag, Species, Area, ...).")
+    ap.add_argument("--metric", action="append", choices=METRICS, help="Metric(s) to score (default: ABC and TAC).")
+    ap.add_argument("--start-year", type=int, default=2001, help="First target year scored (report uses 2001+).")
+    ap.add_argument("--end-year", type=int, default=None)
+    ap.add_argument("--all-rows", action="store_true", help="Keep OY == 0 rows.")
+    ap.add_argument("--out", default=OUT_PATH)
+    args = ap.parse_args(argv)
+
+    df = load_long(args.data, oy_only=not args.all_rows)
+    if df.empty:
+        print(f"No rows in {args.data}.")
+        sys.exit(1)
+    state = run_backtest(df, metrics=args.metric)
+    scores = score_table(state, start_year=args.start_year, end_year=args.end_year)
+    scores.to_csv(args.out, index=False)
+    print(f"Scored {len(BASELINES)} baselines over {len(state['panel']['series'])} series; wrote {args.out}")
+    print(summary_table(scores).to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
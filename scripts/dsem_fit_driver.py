@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from tac_abc_regression import (
+    DEFAULT_AGGREGATION,
+    load_region,
+    safe_names,
+    species_panel,
+    top_groups_by_tac,
+    yearly_series,
+)
+
+RSCRIPT = os.getenv("DSEM_RSCRIPT", "Rscript")
+WORKER = "R/dsem_fit_worker.R"
+CACHE_DIR = os.getenv("DSEM_CACHE_DIR", ".dsem_cache")
+
+# Same fallback order as fit_dsem_region() in doc/index.qmd; the first
+# configuration in this order that succeeds is the one kept.
+GMRF_CANDIDATES = ["full", "project", "gmrf_project", "mvn_project", "separable", "projection"]
+FAMILY_CANDIDATES = ["default", "gaussian"]
+
+DEP_SPECIES = ["Pollock", "Pacific cod"]
+BSAI_MAINSPP = [
+    "Pollock",
+    "Yellowfin sole",
+    "Pacific cod",
+    "Atka mackerel",
+    "Northern rock sole",
+    "Flathead sole",
+    "Pacific ocean perch",
+]
+
+OUTPUT_FILES = ["summary.csv", "pred.csv", "loo.csv", "scaling.csv"]
+
+
+def region_spec(region):
+    """Dependent/independent species and yearly series as used in the report."""
+    series = yearly_series(load_region(region), DEFAULT_AGGREGATION[region])
+    if region == "BSAI":
+        indep = BSAI_MAINSPP
+    else:
+        indep = top_groups_by_tac(species_panel(series), n=7)
+    return series[series["Species"].isin(indep)], DEP_SPECIES, indep
+
+
+def dsem_frame(series, dep_species, indep_species):
+    wide = series.pivot_table(index="Year", columns="Species", values=["TAC", "ABC"], aggfunc="sum")
+    cols = {}
+    for sp in dep_species:
+        cols[f"TAC_{safe_names([sp])[0]}"] = wide["TAC"][sp] if sp in wide["TAC"] else float("nan")
+    for sp in indep_species:
+        cols[f"ABC_{safe_names([sp])[0]}"] = wide["ABC"][sp] if sp in wide["ABC"] else float("nan")
+    out = pd.DataFrame(cols, index=wide.index).reset_index()
+    out["Year"] = out["Year"].astype(int)
+    return out.sort_values("Year").reset_index(drop=True)
+
+
+def sem_string(dep_species, indep_species):
+    dep_safe = safe_names(dep_species)
+    y_cols = [f"TAC_{d}" for d in dep_safe]
+    x_cols = [f"ABC_{i}" for i in safe_names(indep_species)]
+    lines = [f"{y} -> {y}, 1, ar_{d}" for y, d in zip(y_cols, dep_safe)]
+    for y in y_cols:
+        for x in x_cols:
+            lines.append(f"{x} -> {y}, 0, b_{x[len('ABC_'):]}_to_{y[len('TAC_'):]}")
+    return "\n".join(lines)
+
+
+def make_job(name, frame, sem, future=None, compute_loo=True):
+    h = hashlib.sha256()
+    h.update(frame.to_csv(index=False, float_format="%.10g").encode("utf-8"))
+    h.update(sem.encode("utf-8"))
+    if future is not None:
+        h.update(future.to_csv(index=False, float_format="%.10g").encode("utf-8"))
+    h.update(b"loo" if compute_loo else b"noloo")
+    return {
+        "name": name,
+        "frame": frame,
+        "sem": sem,
+        "future": future,
+        "compute_loo": compute_loo,
+        "key": h.hexdigest()[:20],
+    }
+
+
+def region_jobs(region, retro_start=None):
+    series, dep, indep = region_spec(region)
+    frame = dsem_frame(series, dep, indep)
+    sem = sem_string(dep, indep)
+    jobs = [make_job(region, frame, sem)]
+    if retro_start is not None:
+        x_cols = [c for c in frame.columns if c.startswith("ABC_")]
+        for year in frame.loc[frame["Year"] >= retro_start, "Year"]:
+            target = frame[frame["Year"] == year]
+            if target[x_cols].isna().any(axis=None):
+                continue
+            jobs.append(make_job(
+                f"{region}_retro_{year}",
+                frame[frame["Year"] < year].reset_index(drop=True),
+                sem,
+                future=target[["Year"] + x_cols].reset_index(drop=True),
+                compute_loo=False,
+            ))
+    return jobs
+
+
+def cached(job, cache_dir):
+    meta = os.path.join(cache_dir, job["key"], "meta.json")
+    if not os.path.exists(meta):
+        return None
+    with open(meta) as fh:
+        return json.load(fh)
+
+
+def _write_inputs(job, job_dir):
+    os.makedirs(job_dir, exist_ok=True)
+    job["frame"].to_csv(os.path.join(job_dir, "tsdata.csv"), index=False)
+    with open(os.path.join(job_dir, "sem.txt"), "w") as fh:
+        fh.write(job["sem"] + "\n")
+    if job["future"] is not None:
+        job["future"].to_csv(os.path.join(job_dir, "future.csv"), index=False)
+
+
+def _store(job, cand_dir, gmrf, family, notes, cache_dir):
+    dest = os.path.join(cache_dir, job["key"])
+    tmp = dest + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for f in OUTPUT_FILES:
+        src = os.path.join(cand_dir, f)
+        if os.path.exists(src):
+            shutil.copy2(src, os.path.join(tmp, f))
+    shutil.copy2(os.path.join(os.path.dirname(cand_dir), "tsdata.csv"), os.path.join(tmp, "tsdata.csv"))
+    shutil.copy2(os.path.join(os.path.dirname(cand_dir), "sem.txt"), os.path.join(tmp, "sem.txt"))
+    meta = {
+        "name": job["name"],
+        "key": job["key"],
+        "gmrf": gmrf,
+        "family": family,
+        "fit_notes": notes,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as fh:
+        json.dump(meta, fh, indent=2)
+    shutil.rmtree(dest, ignore_errors=True)
+    os.replace(tmp, dest)
+    return meta
+
+
+def run_jobs(jobs, cache_dir=CACHE_DIR, workers=4, timeout=600, work_dir=None, poll=0.1):
+    """Fit all jobs with a bounded pool of Rscript workers.
+
+    Candidates for every job are queued in fallback order and run
+    concurrently.  A job resolves once its best-ranked success is known,
+    i.e. every earlier candidate has failed; later candidates still running
+    are killed and the rest of that job's queue is dropped.
+    """
+    results = {}
+    pending = []
+    for job in jobs:
+        meta = cached(job, cache_dir)
+        if meta is not None:
+            results[job["name"]] = dict(meta, cached=True)
+        else:
+            pending.append(job)
+    if not pending:
+        return results
+
+    work_dir = work_dir or os.path.join(cache_dir, "_work")
+    candidates = [(g, f) for g in GMRF_CANDIDATES for f in FAMILY_CANDIDATES]
+    state = {}
+    queue = []
+    for job in pending:
+        job_dir = os.path.join(work_dir, job["key"])
+        _write_inputs(job, job_dir)
+        state[job["name"]] = {"job": job, "dir": job_dir, "status": [None] * len(candidates), "notes": [""] * len(candidates)}
+        queue.extend((job["name"], i) for i in range(len(candidates)))
+
+    running = {}
+
+    def resolve(name):
+        st = state[name]
+        for i, status in enumerate(st["status"]):
+            if status is None:
+                return False
+            if status == "ok":
+                g, f = candidates[i]
+                notes = [n for n in st["notes"] if n]
+                meta = _store(st["job"], os.path.join(st["dir"], f"{g}_{f}"), g, f, notes, cache_dir)
+                results[name] = dict(meta, cached=False)
+                return True
+        results[name] = {"name": name, "key": st["job"]["key"], "gmrf": None, "family": None,
+                         "fit_notes": st["notes"], "cached": False}
+        return True
+
+    def finish(name, i, ok, note):
+        st = state[name]
+        st["status"][i] = "ok" if ok else "failed"
+        g, f = candidates[i]
+        st["notes"][i] = f"fit {'succeeded' if ok else 'failed'} with gmrf={g}, family={f}{': ' + note if note else ''}"
+        if ok:
+            # Anything ranked after a success can no longer be chosen.
+            for j in range(i + 1, len(candidates)):
+                if st["status"][j] is None:
+                    st["status"][j] = "skipped"
+            for proc_key, (proc, _, _, log) in list(running.items()):
+                if proc_key[0] == name and proc_key[1] > i:
+                    proc.kill()
+                    proc.wait()
+                    log.close()
+                    del running[proc_key]
+        if name not in results and resolve(name):
+            shutil.rmtree(st["dir"], ignore_errors=True)
+
+    while queue or running:
+        while queue and len(running) < workers:
+            name, i = queue.pop(0)
+            if name in results or state[name]["status"][i] is not None:
+                continue
+            g, f = candidates[i]
+            st = state[name]
+            cmd = [RSCRIPT, WORKER, st["dir"], os.path.join(st["dir"], f"{g}_{f}"), g, f,
+                   "1" if st["job"]["compute_loo"] else "0"]
+            # stderr goes to a file: a pipe read only at exit fills up on
+            # chatty R warnings and stalls the worker until the timeout.
+            log = open(os.path.join(st["dir"], f"{g}_{f}.stderr.log"), "w+")
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=log, text=True)
+            running[(name, i)] = (proc, time.monotonic(), cmd, log)
+
+        time.sleep(poll)
+        for proc_key, (proc, started, _, log) in list(running.items()):
+            if proc_key not in running:
+                continue
+            name, i = proc_key
+            rc = proc.poll()
+            if rc is None and time.monotonic() - started > timeout:
+                proc.kill()
+                proc.wait()
+                log.close()
+                del running[proc_key]
+                finish(name, i, False, f"timed out after {timeout}s")
+            elif rc is not None:
+                log.seek(0)
+                err = log.read()
+                log.close()
+                del running[proc_key]
+                lines = [l for l in err.strip().splitlines() if l.strip()]
+                finish(name, i, rc == 0, "" if rc == 0 else (lines[-1] if lines else f"exit code {rc}"))
+
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parallel, cached DSEM fits over the gmrf/family fallback grid.")
+    ap.add_argument("--region", action="append", choices=["BSAI", "GOA"], help="Region(s) to fit (default: both).")
+    ap.add_argument("--retro-start", type=int, default=None, help="Also fit rolling one-step-ahead refits from this year (report uses 2015).")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--timeout", type=float, default=600, help="Seconds per Rscript worker.")
+    ap.add_argument("--cache-dir", default=CACHE_DIR)
+    args = ap.parse_args(argv)
+
+    jobs = []
+    for region in args.region or ["BSAI", "GOA"]:
+        jobs.extend(region_jobs(region, retro_start=args.retro_start))
+
+    t0 = time.monotonic()
+    results = run_jobs(jobs, cache_dir=args.cache_dir, workers=args.workers, timeout=args.timeout)
+    manifest = {}
+    failed = 0
+    for job in jobs:
+        res = results[job["name"]]
+        ok = res.get("gmrf") is not None
+        failed += not ok
+        manifest[job["name"]] = {
+            "dir": os.path.join(args.cache_dir, job["key"]) if ok else None,
+            "gmrf": res.get("gmrf"),
+            "family": res.get("family"),
+            "cached": res.get("cached", False),
+        }
+        tag = "cached" if res.get("cached") else ("ok" if ok else "FAILED")
+        print(f"[{job['name']}] {tag} gmrf={res.get('gmrf')} family={res.get('family')}")
+        if not ok:
+            for note in res.get("fit_notes", []):
+                if note:
+                    print(f"  {note}")
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    with open(os.path.join(args.cache_dir, "manifest.json"), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    print(f"{len(jobs)} jobs in {time.monotonic() - t0:.1f}s; manifest at {os.path.join(args.cache_dir, 'manifest.json')}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,557 @@
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dsem_fit_driver import BSAI_MAINSPP, DEP_SPECIES, dsem_frame
+from tac_abc_regression import (
+    DEFAULT_AGGREGATION,
+    REGION_PATHS,
+    load_region,
+    safe_names,
+    species_panel,
+    top_groups_by_tac,
+    yearly_series,
+    _year_range,
+)
+
+OUT_PATH = "data/dsem_kalman_screen.csv"
+
+# "fixed" matches the DSEM default family (TAC observed without error);
+# "gaussian" adds an estimated measurement variance, the report's fallback.
+FAMILIES = ["fixed", "gaussian"]
+
+# Coarse profile-likelihood grid for the AR coefficient and the
+# measurement/process variance ratio; the best cell is refined locally.
+AR_GRID = np.linspace(-0.96, 0.96, 25)
+RATIO_GRID = np.concatenate([[0.0], np.logspace(-3, 1, 9)])
+AR_FINE = 17
+RATIO_FINE = 7
+
+# Prior variance (in units of q) on the first state when filtering with
+# fixed parameters; large enough to act as the diffuse start used in fitting.
+KAPPA = 1e6
+
+# Upper bound on B x G x T x K elements per profile chunk.
+CHUNK_ELEMENTS = 8_000_000
+
+
+# An item is one dependent TAC series with its ABC regressors, i.e. one
+# "TAC -> TAC, 1" path plus the "ABC -> TAC, 0" paths of the report's SEM:
+#
+#     z_t = ar * z_{t-1} + b . x_t + w_t,   w_t ~ N(0, q)
+#     y_t = z_t + v_t,                      v_t ~ N(0, r)
+#
+# Series are scaled on the training rows as R's scale() does.  The dependent
+# TAC series are independent given the ABCs, so the joint DSEM likelihood
+# splits into one univariate filter per item and many items (species,
+# subsets, windows, retrospective origins) are fitted as one batch.
+
+def _scale(values):
+    center = np.nanmean(values, axis=0) if np.isfinite(values).any() else 0.0
+    n = np.isfinite(values).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.sqrt(np.nansum((values - center) ** 2, axis=0) / (n - 1))
+    center = np.where(np.isfinite(center), center, 0.0)
+    scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+    return center, scale
+
+
+def _item(name, dep, indep, years, y_raw, x_raw, n_train):
+    y_center, y_scale = _scale(y_raw[:n_train])
+    x_center, x_scale = _scale(x_raw[:n_train])
+    X = (x_raw - x_center) / x_scale
+    y = (y_raw - y_center) / y_scale
+    y[n_train:] = np.nan
+    return {
+        "name": name,
+        "dep": dep,
+        "indep": list(indep),
+        "years": years,
+        "n_train": n_train,
+        "y": y,
+        "X": np.where(np.isfinite(X), X, 0.0),
+        "y_center": float(y_center),
+        "y_scale": float(y_scale),
+    }
+
+
+def _columns(frame, dep, indep):
+    y_col = f"TAC_{safe_names([dep])[0]}"
+    x_cols = [f"ABC_{s}" for s in safe_names(indep)]
+    return y_col, x_cols
+
+
+def make_item(name, frame, dep, indep, future=None):
+    """Scaled arrays for one dependent series.
+
+    `frame` is a dsem_frame() style table (Year, TAC_*, ABC_*); `future`
+    optionally holds Year plus ABC_* rows appended with missing TAC, as in
+    fit_dsem_region().  Missing scaled ABCs are set to 0, the series mean.
+    """
+    y_col, x_cols = _columns(frame, dep, indep)
+    years = frame["Year"].to_numpy(dtype=int)
+    y_raw = frame[y_col].to_numpy(dtype=float)
+    x_raw = frame[x_cols].to_numpy(dtype=float).reshape(len(frame), len(x_cols))
+    n_train = len(frame)
+    if future is not None and len(future):
+        years = np.concatenate([years, future["Year"].to_numpy(dtype=int)])
+        y_raw = np.concatenate([y_raw, np.full(len(future), np.nan)])
+        x_raw = np.vstack([x_raw, future[x_cols].to_numpy(dtype=float)])
+    return _item(name, dep, indep, years, y_raw, x_raw, n_train)
+
+
+def stack_items(items):
+    """Left-aligned (B, T) / (B, T, K) arrays; padding is missing y, zero x."""
+    B = len(items)
+    T = max(len(it["years"]) for it in items)
+    K = max(it["X"].shape[1] for it in items)
+    Y = np.full((B, T), np.nan)
+    X = np.zeros((B, T, K))
+    kmask = np.zeros((B, K), dtype=bool)
+    for i, it in enumerate(items):
+        n, k = it["X"].shape
+        Y[i, :n] = it["y"]
+        X[i, :n, :k] = it["X"]
+        kmask[i, :k] = True
+    return Y, X, kmask
+
+
+def _profile(Y, X, kmask, ar, ratio):
+    """Concentrated log-likelihood on a (B, G) grid of (ar, r/q).
+
+    Runs an augmented Kalman filter with q = 1: the state mean is carried as
+    alpha + g . b, so the regression coefficients b come out of one GLS solve
+    and q = sigma2 is profiled out.  The filter starts exactly at each
+    series' first observation (diffuse initial state, as estimate_delta0).
+    Returns (loglik, b, sigma2, n), each with leading shape (B, G).
+    """
+    B, T, K = X.shape
+    G = ar.shape[1]
+    obs = np.isfinite(Y)
+    started = np.zeros((B, G), dtype=bool)
+    alpha = np.zeros((B, G))
+    g = np.zeros((B, G, K))
+    P = np.zeros((B, G))
+    g_all = np.zeros((B, G, T, K))
+    w_all = np.zeros((B, G, T))
+    e_all = np.zeros((B, G, T))
+    log_f = np.zeros((B, G))
+    n = np.zeros((B, G))
+    for t in range(T):
+        y = np.where(obs[:, t], Y[:, t], 0.0)[:, None]
+        o = np.broadcast_to(obs[:, t][:, None], (B, G))
+        alpha_p = ar * alpha
+        g_p = ar[..., None] * g + X[:, t][:, None, :]
+        P_p = ar * ar * P + 1.0
+        F = P_p + ratio
+        upd = started & o
+        e = np.where(upd, y - alpha_p, 0.0)
+        g_all[:, :, t] = g_p
+        w_all[:, :, t] = np.where(upd, 1.0 / F, 0.0)
+        e_all[:, :, t] = e
+        log_f += np.where(upd, np.log(F), 0.0)
+        n += upd
+        gain = P_p / F
+        init = ~started & o
+        # Before the first observation alpha, g and P stay at zero.
+        keep = np.where(upd, 1.0 - gain, started.astype(float))
+        alpha = np.where(init, y, alpha_p + gain * e)
+        g = g_p * keep[..., None]
+        P = np.where(init, ratio, keep * P_p)
+        started |= o
+
+    # GLS cross-products over time as one batched matmul.
+    gw = g_all * w_all[..., None]
+    S = np.matmul(gw.transpose(0, 1, 3, 2), g_all)
+    s = np.matmul(gw.transpose(0, 1, 3, 2), e_all[..., None])[..., 0]
+    ee = (w_all * e_all * e_all).sum(axis=-1)
+
+    # Padded regressor columns get a unit diagonal so their coefficient is 0.
+    pad = np.eye(K) * (~kmask)[:, None, :]
+    ridge = 1e-10 * np.eye(K)
+    b = np.linalg.solve(S + pad[:, None] + ridge, s[..., None])[..., 0]
+    rss = ee - (s * b).sum(axis=-1)
+    k_active = kmask.sum(axis=1)[:, None]
+    valid = (n > k_active + 1) & (rss > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = np.where(valid, rss / n, np.nan)
+        loglik = np.where(valid, -0.5 * (log_f + n * np.log(2 * np.pi * sigma2) + n), -np.inf)
+    return loglik, b, sigma2, n
+
+
+def _profile_chunked(Y, X, kmask, ar, ratio):
+    B, T, K = X.shape
+    G = ar.shape[1]
+    step = max(1, CHUNK_ELEMENTS // max(1, G * T * K))
+    parts = [_profile(Y[i:i + step], X[i:i + step], kmask[i:i + step], ar[i:i + step], ratio[i:i + step])
+             for i in range(0, B, step)]
+    return tuple(np.concatenate(p, axis=0) for p in zip(*parts))
+
+
+def _best(loglik):
+    return np.argmax(np.where(np.isfinite(loglik), loglik, -np.inf), axis=1)
+
+
+def fit_batch(items, family="fixed"):
+    """Maximum-likelihood fit of every item in one vectorized pass.
+
+    (ar, r/q) are searched on a coarse grid and then a local fine grid; b and
+    q are profiled out in closed form at every grid point.  Returns a dict of
+    arrays with leading dimension len(items).
+    """
+    Y, X, kmask = stack_items(items)
+    B = len(items)
+    ratios = RATIO_GRID if family == "gaussian" else np.zeros(1)
+    ar = np.broadcast_to(np.repeat(AR_GRID, len(ratios))[None], (B, len(AR_GRID) * len(ratios)))
+    ratio = np.broadcast_to(np.tile(ratios, len(AR_GRID))[None], ar.shape)
+    loglik, _, _, _ = _profile_chunked(Y, X, kmask, ar, ratio)
+    best = _best(loglik)
+    ar0 = ar[np.arange(B), best]
+    ratio0 = ratio[np.arange(B), best]
+
+    da = AR_GRID[1] - AR_GRID[0]
+    ar_fine = np.clip(ar0[:, None] + np.linspace(-da, da, AR_FINE)[None], -0.995, 0.995)
+    if family == "gaussian":
+        span = np.log10(RATIO_GRID[2] / RATIO_GRID[1])
+        ratio_fine = np.where(
+            ratio0[:, None] > 0,
+            ratio0[:, None] * 10 ** np.linspace(-span, span, RATIO_FINE)[None],
+            np.concatenate([[0.0], np.logspace(-4, np.log10(RATIO_GRID[1]), RATIO_FINE - 1)])[None],
+        )
+    else:
+        ratio_fine = np.zeros((B, 1))
+    R = ratio_fine.shape[1]
+    ar = np.repeat(ar_fine, R, axis=1)
+    ratio = np.tile(ratio_fine, (1, AR_FINE))
+    loglik, _, _, _ = _profile_chunked(Y, X, kmask, ar, ratio)
+    rows = np.arange(B)
+    best = _best(loglik)
+    ia, ir = best // R, best % R
+
+    # Parabolic step in ar through the best fine-grid point and its neighbours.
+    ll = loglik.reshape(B, AR_FINE, R)[rows, :, ir]
+    lo, hi = np.clip(ia - 1, 0, AR_FINE - 1), np.clip(ia + 1, 0, AR_FINE - 1)
+    l0, l1, l2 = ll[rows, lo], ll[rows, ia], ll[rows, hi]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curv = l0 - 2 * l1 + l2
+        shift = np.where((lo < ia) & (ia < hi) & np.isfinite(curv) & (curv < 0), 0.5 * (l0 - l2) / curv, 0.0)
+    step = ar_fine[:, 1] - ar_fine[:, 0]
+    ar_best = np.clip(ar_fine[rows, ia] + shift * step, -0.995, 0.995)[:, None]
+    ratio_best = ratio_fine[rows, ir][:, None]
+    loglik, b, sigma2, n = (a[:, 0] for a in _profile_chunked(Y, X, kmask, ar_best, ratio_best))
+    worse = ~(loglik >= l1)
+    if worse.any():
+        ar_best[worse, 0] = ar_fine[rows, ia][worse]
+        redo = _profile_chunked(Y[worse], X[worse], kmask[worse], ar_best[worse], ratio_best[worse])
+        loglik[worse], b[worse], sigma2[worse], n[worse] = (a[:, 0] for a in redo)
+
+    k = kmask.sum(axis=1)
+    n_par = 1 + k + 1 + (family == "gaussian")
+    return {
+        "family": family,
+        "ar": ar_best[:, 0],
+        "b": b,
+        "q": sigma2,
+        "r": ratio_best[:, 0] * sigma2,
+        "loglik": loglik,
+        "n": n.astype(int),
+        "k": k,
+        "aic": np.where(np.isfinite(loglik), 2 * n_par - 2 * loglik, np.nan),
+    }
+
+
+def filter_smooth(Y, C, ar, q, r):
+    """Scalar Kalman filter plus RTS smoother with known parameters.
+
+    `C` is the (B, T) exogenous state mean b . x_t.  Returns predicted
+    (one-step) and smoothed state means and variances, each (B, T).
+    Steps with missing y only predict, so appended future rows come out as
+    multi-step forecasts.
+    """
+    B, T = Y.shape
+    ar = ar[:, None] if ar.ndim == 1 else ar
+    q = q[:, None] if q.ndim == 1 else q
+    r = r[:, None] if r.ndim == 1 else r
+    pm = np.zeros((B, T))
+    pv = np.zeros((B, T))
+    fm = np.zeros((B, T))
+    fv = np.zeros((B, T))
+    m = np.zeros(B)
+    P = np.zeros(B)
+    for t in range(T):
+        if t == 0:
+            mp = C[:, 0].copy()
+            Pp = KAPPA * q[:, 0]
+        else:
+            mp = ar[:, 0] * m + C[:, t]
+            Pp = ar[:, 0] ** 2 * P + q[:, 0]
+        pm[:, t], pv[:, t] = mp, Pp
+        o = np.isfinite(Y[:, t])
+        gain = np.where(o, Pp / (Pp + r[:, 0]), 0.0)
+        m = mp + gain * np.where(o, Y[:, t] - mp, 0.0)
+        P = (1.0 - gain) * Pp
+        fm[:, t], fv[:, t] = m, P
+
+    sm = fm.copy()
+    sv = fv.copy()
+    for t in range(T - 2, -1, -1):
+        J = ar[:, 0] * fv[:, t] / pv[:, t + 1]
+        sm[:, t] = fm[:, t] + J * (sm[:, t + 1] - pm[:, t + 1])
+        sv[:, t] = fv[:, t] + J ** 2 * (sv[:, t + 1] - pv[:, t + 1])
+    return pm, pv, sm, np.maximum(sv, 0.0)
+
+
+def _exogenous(X, b):
+    return np.einsum("btk,bk->bt", X, b)
+
+
+def predictions(items, fit):
+    """Observed, one-step-ahead and smoothed TAC per item-year, raw units.
+
+    One-step predictions are undefined up to each series' first observation
+    (diffuse start); rows past the training data are forecasts with
+    Horizon 1, 2, ...
+    """
+    Y, X, _ = stack_items(items)
+    pm, pv, sm, sv = filter_smooth(Y, _exogenous(X, fit["b"]), fit["ar"], fit["q"], fit["r"])
+    frames = []
+    for i, it in enumerate(items):
+        n = len(it["years"])
+        first = np.argmax(np.isfinite(it["y"][:it["n_train"]]))
+        one_step = pm[i, :n].copy()
+        one_step[:first + 1] = np.nan
+        se = np.sqrt(pv[i, :n] + fit["r"][i])
+        se[:first + 1] = np.nan
+        horizon = np.maximum(np.arange(n) - it["n_train"] + 1, 0)
+        c, sc = it["y_center"], it["y_scale"]
+        frames.append(pd.DataFrame({
+            "Model": it["name"],
+            "Dep": it["dep"],
+            "Year": it["years"],
+            "Horizon": horizon,
+            "Observed": it["y"] * sc + c,
+            "OneStep": one_step * sc + c,
+            "OneStep_SE": se * sc,
+            "Smoothed": sm[i, :n] * sc + c,
+            "Smoothed_SE": np.sqrt(sv[i, :n]) * sc,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def loo_residuals(items, fit):
+    """Leave-one-year-out residuals by refiltering with fixed parameters.
+
+    Every observed year of every item becomes one copy of that item with the
+    year masked; all copies are filtered and smoothed together, and the
+    smoothed state at the masked year is the prediction from the other
+    years (the analogue of dsem::loo_residuals(what = "loo")).
+    """
+    Y, X, _ = stack_items(items)
+    C = _exogenous(X, fit["b"])
+    src, col = np.nonzero(np.isfinite(Y))
+    Yl = Y[src].copy()
+    Yl[np.arange(len(src)), col] = np.nan
+    _, _, sm, sv = filter_smooth(Yl, C[src], fit["ar"][src], fit["q"][src], fit["r"][src])
+    pred = sm[np.arange(len(src)), col]
+    se = np.sqrt(sv[np.arange(len(src)), col] + fit["r"][src])
+    obs = Y[src, col]
+    scale = np.array([items[i]["y_scale"] for i in src])
+    center = np.array([items[i]["y_center"] for i in src])
+    return pd.DataFrame({
+        "Model": [items[i]["name"] for i in src],
+        "Dep": [items[i]["dep"] for i in src],
+        "Year": [int(items[i]["years"][t]) for i, t in zip(src, col)],
+        "Observed": obs * scale + center,
+        "LOO_Predicted": pred * scale + center,
+        "LOO_SE": se * scale,
+        "Std_Resid": (obs - pred) / se,
+    })
+
+
+def retro_items(name, frame, dep, indep, targets, horizons=(1, 2)):
+    """Rolling-origin items: train on years before target - h + 1, forecast target.
+
+    The intervening ABC rows are appended as future rows, so horizon 2 uses
+    the realized ABC for both forecast years, as the report's one-step
+    refits do for horizon 1.
+    """
+    y_col, x_cols = _columns(frame, dep, indep)
+    years = frame["Year"].to_numpy(dtype=int)
+    y_raw = frame[y_col].to_numpy(dtype=float)
+    x_raw = frame[x_cols].to_numpy(dtype=float).reshape(len(frame), len(x_cols))
+    x_ok = np.isfinite(x_raw).all(axis=1)
+    pos = {int(y): i for i, y in enumerate(years)}
+    out = []
+    for h in horizons:
+        for year in targets:
+            stop = pos.get(int(year))
+            if stop is None:
+                continue
+            origin = stop - h + 1
+            # Needs consecutive forecast years with every ABC known.
+            if origin < len(indep) + 4 or years[stop] - years[origin] != h - 1 or not x_ok[origin:stop + 1].all():
+                continue
+            it = _item(f"{name}_retro_h{h}_{year}", dep, indep, years[:stop + 1],
+                       y_raw[:stop + 1], x_raw[:stop + 1], origin)
+            it["target"] = (int(year), h, float(y_raw[stop]))
+            out.append(it)
+    return out
+
+
+def retro_errors(items, fit):
+    """Absolute percent error of each retrospective item's target forecast."""
+    Y, X, _ = stack_items(items)
+    pm, _, _, _ = filter_smooth(Y, _exogenous(X, fit["b"]), fit["ar"], fit["q"], fit["r"])
+    rows = []
+    for i, it in enumerate(items):
+        year, h, actual = it["target"]
+        pred = pm[i, len(it["years"]) - 1] * it["y_scale"] + it["y_center"]
+        rows.append({"Year": year, "Horizon": h, "Observed": actual, "Predicted": pred,
+                     "APE": abs(pred - actual) / actual if actual > 0 else np.nan})
+    return pd.DataFrame(rows)
+
+
+def region_frames(region):
+    """Wide TAC/ABC frame over every species, plus species ranked by TAC."""
+    series = yearly_series(load_region(region), DEFAULT_AGGREGATION[region])
+    ranked = top_groups_by_tac(species_panel(series), n=len(series["Species"].unique()))
+    report = BSAI_MAINSPP if region == "BSAI" else ranked[:7]
+    return dsem_frame(series, DEP_SPECIES, ranked), ranked, report
+
+
+def species_subsets(ranked, report, kinds=("report", "drop_one", "top_n"), top_n=range(3, 11)):
+    """Independent-species sets: the report's, report minus one, top-n by TAC."""
+    subsets = []
+    if "report" in kinds:
+        subsets.append(("report", list(report)))
+    if "drop_one" in kinds:
+        subsets.extend((f"drop:{sp}", [s for s in report if s != sp]) for sp in report)
+    if "top_n" in kinds:
+        subsets.extend((f"top{n}", ranked[:n]) for n in top_n if n <= len(ranked))
+    seen = set()
+    out = []
+    for label, indep in subsets:
+        if tuple(indep) not in seen:
+            seen.add(tuple(indep))
+            out.append((label, indep))
+    return out
+
+
+def screen(regions, start_years, families=("fixed",), kinds=("report", "drop_one", "top_n"),
+           retro_start=None):
+    """Fit, LOO-score and optionally backtest every variant in one batch per family."""
+    variants = []
+    items = []
+    retro = []
+    for region in regions:
+        frame, ranked, report = region_frames(region)
+        for start in start_years:
+            window = frame[frame["Year"] >= start].reset_index(drop=True)
+            for label, indep in species_subsets(ranked, report, kinds):
+                for dep in DEP_SPECIES:
+                    v = {"Region": region, "StartYear": int(window["Year"].min()),
+                         "EndYear": int(window["Year"].max()), "Subset": label,
+                         "Indep": "|".join(indep), "nIndep": len(indep), "Dep": dep}
+                    name = f"{region}_{start}_{label}_{dep}"
+                    items.append(make_item(name, window, dep, indep))
+                    if retro_start is not None:
+                        targets = window.loc[window["Year"] >= retro_start, "Year"]
+                        r_items = retro_items(name, window, dep, indep, targets)
+                        retro.append((len(variants), r_items))
+                    variants.append(v)
+
+    retro_flat = [it for _, its in retro for it in its]
+    rows = []
+    for family in families:
+        fit = fit_batch(items, family)
+        loo = loo_residuals(items, fit)
+        loo["APE"] = (loo["Observed"] - loo["LOO_Predicted"]).abs() / loo["Observed"].where(loo["Observed"] > 0)
+        loo_stats = loo.groupby("Model", sort=False).agg(
+            LOO_RMSE_scaled=("Std_Resid", lambda z: float(np.sqrt(np.mean(z ** 2)))),
+            LOO_MAPE=("APE", "mean"),
+        )
+        retro_mape = {}
+        if retro_flat:
+            r_fit = fit_batch(retro_flat, family)
+            errs = retro_errors(retro_flat, r_fit)
+            pos = 0
+            for vi, its in retro:
+                e = errs.iloc[pos:pos + len(its)]
+                pos += len(its)
+                retro_mape[vi] = {h: e.loc[e["Horizon"] == h, "APE"].mean() for h in (1, 2)}
+        for i, (v, it) in enumerate(zip(variants, items)):
+            row = dict(v, Family=family, n=int(fit["n"][i]), ar=fit["ar"][i], q=fit["q"][i], r=fit["r"][i],
+                       loglik=fit["loglik"][i], AIC=fit["aic"][i])
+            if it["name"] in loo_stats.index:
+                row.update(loo_stats.loc[it["name"]].to_dict())
+            if i in retro_mape:
+                row["Retro1_MAPE"] = retro_mape[i][1]
+                row["Retro2_MAPE"] = retro_mape[i][2]
+            for sp, coef in zip(safe_names(it["indep"]), fit["b"][i]):
+                row[f"b_{sp}"] = coef
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def report_predictions(region, family="fixed", horizon=2):
+    """Fitted, LOO and `horizon`-year forecasts for the report's specification.
+
+    Future ABCs are not known in advance, so the last observed ABCs are
+    carried forward for the forecast years.
+    """
+    frame, _, report = region_frames(region)
+    x_cols = [f"ABC_{s}" for s in safe_names(report)]
+    last = frame[x_cols].ffill().iloc[[-1]]
+    last_year = int(frame["Year"].max())
+    future = pd.concat([last] * horizon, ignore_index=True)
+    future.insert(0, "Year", np.arange(last_year + 1, last_year + horizon + 1))
+    items = [make_item(f"{region}_{dep}", frame, dep, report, future=future) for dep in DEP_SPECIES]
+    fit = fit_batch(items, family)
+    pred = predictions(items, fit)
+    loo = loo_residuals(items, fit)
+    out = pred.merge(loo[["Model", "Year", "LOO_Predicted", "LOO_SE"]], on=["Model", "Year"], how="left")
+    out.insert(0, "Region", region)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Batched Kalman-filter screen of DSEM-style TAC~ABC variants (AR(1) TAC, contemporaneous ABC).",
+    )
+    ap.add_argument("--region", action="append", choices=sorted(REGION_PATHS), help="Region(s) to screen (default: all).")
+    ap.add_argument("--start-years", default="1986", help="Window start year or range, e.g. 1986-2005.")
+    ap.add_argument("--family", action="append", choices=FAMILIES, help="Observation family (default: fixed).")
+    ap.add_argument("--subsets", action="append", choices=["report", "drop_one", "top_n"],
+                    help="Independent-species subsets to screen (default: all).")
+    ap.add_argument("--retro-start", type=int, default=None, help="Also score 1- and 2-year rolling forecasts from this year.")
+    ap.add_argument("--pred-out", default=None, help="Write fitted/LOO/two-year forecasts for the report specification here.")
+    ap.add_argument("--out", default=OUT_PATH)
+    args = ap.parse_args(argv)
+
+    regions = args.region or sorted(REGION_PATHS)
+    families = args.family or ["fixed"]
+    t0 = time.monotonic()
+    out = screen(regions, _year_range(args.start_years), families=families,
+                 kinds=args.subsets or ("report", "drop_one", "top_n"), retro_start=args.retro_start)
+    if out.empty:
+        print("No variants to screen.")
+        sys.exit(1)
+    out.to_csv(args.out, index=False)
+    print(f"Screened {len(out)} models in {time.monotonic() - t0:.1f}s; wrote {args.out}")
+    cols = [c for c in ["Region", "Dep", "Family", "StartYear", "Subset", "AIC", "LOO_MAPE", "Retro1_MAPE", "Retro2_MAPE"]
+            if c in out.columns]
+    # AIC is only comparable within a window; LOO error ranks across windows.
+    best = out.sort_values("LOO_MAPE").groupby(["Region", "Dep", "Family"], sort=False).head(3)
+    print(best[cols].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.pred_out:
+        pred = pd.concat([report_predictions(r, families[0]) for r in regions], ignore_index=True)
+        pred.to_csv(args.pred_out, index=False)
+        print(f"Wrote report-specification predictions to {args.pred_out}")
+
+
+if __name__ == "__main__":
+    main()
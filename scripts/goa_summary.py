@@ -0,0 +1,200 @@
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from harvest_specs_store import TABLES, to_num
+from scrape_goa_fedreg import NATURAL_KEY, SOURCE_PRIORITY, OUT_PATH as SCRAPE_PATH
+
+SUMMARY_PATH = TABLES["goa_summary"][0]
+VALUE_COLS = ["OFL", "ABC", "TAC"]
+# Provenance that decides which of a key's source rows is authoritative.
+RANK_COLS = ["SourceType", "PublicationDate"]
+OUT_COLS = NATURAL_KEY + VALUE_COLS
+CHECKSUM_COLS = NATURAL_KEY + ["Rows", "Checksum"]
+
+
+def checksum_path(summary_path):
+    stem, _ = os.path.splitext(summary_path)
+    return stem + ".checksums.csv"
+
+
+def key_frame(df):
+    """Natural-key columns with stable dtypes, blank areas as ''."""
+    out = pd.DataFrame({
+        "AssmentYr": pd.to_numeric(df["AssmentYr"], errors="coerce").astype("Int64"),
+        "ProjYear": pd.to_numeric(df["ProjYear"], errors="coerce").astype("Int64"),
+        "lag": pd.to_numeric(df["lag"], errors="coerce").astype("Int64"),
+        "Species": df["Species"].fillna("").astype(str).str.strip(),
+        "Area": df["Area"].fillna("").astype(str).str.strip(),
+    }, index=df.index)
+    return out
+
+
+def source_rows(df):
+    """Scraper output reduced to key, numeric values and provenance.
+
+    One row per input row.  Comma-grouped strings and n/a decode through
+    to_num (the legacy summary concatenated the raw strings).  Rows without
+    a complete year key cannot be placed and are dropped.
+    """
+    out = key_frame(df)
+    for c in VALUE_COLS:
+        out[c] = to_num(df[c]) if c in df else np.nan
+    for c in RANK_COLS:
+        out[c] = df[c].fillna("").astype(str) if c in df else ""
+    out = out.dropna(subset=["AssmentYr", "ProjYear", "lag"])
+    return out.reset_index(drop=True)
+
+
+def _group_codes(rows):
+    return rows.groupby(NATURAL_KEY, sort=False, dropna=False).ngroup().to_numpy()
+
+
+def group_checksums(rows):
+    """Per-group row count and an order-independent checksum of its rows.
+
+    Each row is hashed once (hash_pandas_object over key and values); a
+    group's checksum is the wrapping uint64 sum of its row hashes, so it
+    changes when any row of the group is added, removed or corrected but
+    not when the scrape reorders rows.
+    """
+    if rows.empty:
+        return pd.DataFrame(columns=CHECKSUM_COLS)
+    h = pd.util.hash_pandas_object(rows[OUT_COLS + RANK_COLS], index=False).to_numpy(dtype=np.uint64)
+    codes = _group_codes(rows)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+    sums = np.add.reduceat(h[order], starts)
+    counts = np.diff(np.r_[starts, len(order)])
+    out = rows.iloc[order[starts]][NATURAL_KEY].reset_index(drop=True)
+    out["Rows"] = counts
+    out["Checksum"] = [f"{s:016x}" for s in sums]
+    return out
+
+
+def aggregate(rows):
+    """One authoritative source row per key; duplicates are never summed.
+
+    A key published more than once (overlapping notices, corrections, a
+    source that kept duplicates) takes the row from the best SourceType
+    (the scraper's SOURCE_PRIORITY), then with the most values, then the
+    latest PublicationDate, then the first in the source.
+    """
+    if rows.empty:
+        return pd.DataFrame(columns=OUT_COLS)
+    ranked = rows.assign(
+        _priority=rows["SourceType"].map(SOURCE_PRIORITY).fillna(len(SOURCE_PRIORITY)),
+        _missing=rows[VALUE_COLS].isna().sum(axis=1),
+        _date=pd.to_datetime(rows["PublicationDate"], errors="coerce"),
+    ).sort_values(["_priority", "_missing", "_date"], ascending=[True, True, False], na_position="last", kind="stable")
+    return ranked.drop_duplicates(NATURAL_KEY, keep="first")[OUT_COLS].reset_index(drop=True)
+
+
+def _sorted(df):
+    return df.sort_values(NATURAL_KEY, kind="stable").reset_index(drop=True)
+
+
+def build_summary(rows):
+    """Full rebuild: (summary, checksums) from every source row."""
+    return _sorted(aggregate(rows)), _sorted(group_checksums(rows))
+
+
+def _isin(df, keys):
+    """Boolean mask of `df` rows whose natural key appears in `keys`."""
+    hits = df[NATURAL_KEY].merge(keys[NATURAL_KEY].drop_duplicates(), how="left", indicator=True)
+    return hits["_merge"].eq("both").to_numpy()
+
+
+def update_summary(rows, summary, checksums):
+    """Recompute and upsert only the groups whose checksum changed.
+
+    `summary` and `checksums` are the stored tables (key_frame dtypes).
+    Groups new to the source or with a different checksum are re-aggregated
+    from their own rows; groups no longer in the source are deleted; every
+    other summary row is kept as stored.  A summary row without a stored
+    checksum (e.g. the legacy file) counts as changed, so the first run
+    replaces it.  Returns (summary, checksums, counts).
+    """
+    new_ck = group_checksums(rows)
+    old = new_ck[NATURAL_KEY].merge(checksums[NATURAL_KEY + ["Checksum"]], on=NATURAL_KEY, how="left")
+    in_summary = _isin(new_ck, summary)
+    changed = new_ck["Checksum"].ne(old["Checksum"]).to_numpy() | ~in_summary
+    affected = new_ck.loc[changed, NATURAL_KEY]
+
+    fresh = aggregate(rows[_isin(rows, affected)])
+    keep = _isin(summary, new_ck) & ~_isin(summary, affected)
+    counts = {
+        "insert": int((changed & ~in_summary).sum()),
+        "update": int((changed & in_summary).sum()),
+        "delete": int((~_isin(summary, new_ck)).sum()),
+        "unchanged": int((~changed).sum()),
+    }
+    out = pd.concat([summary[keep], fresh], ignore_index=True)
+    return _sorted(out[OUT_COLS]), _sorted(new_ck), counts
+
+
+def read_summary(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    out = key_frame(df)
+    for c in VALUE_COLS:
+        out[c] = to_num(df[c])
+    return out
+
+
+def read_checksums(path):
+    """Stored per-group checksums; empty (every group changed) if missing."""
+    if os.path.exists(path):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    else:
+        df = pd.DataFrame({c: pd.Series(dtype=str) for c in CHECKSUM_COLS})
+    out = key_frame(df)
+    out["Rows"] = pd.to_numeric(df["Rows"]).astype(int)
+    out["Checksum"] = df["Checksum"]
+    return out
+
+
+def _write(df, path):
+    # Summary and checksums must agree, so each is swapped in whole.
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def write_summary(summary, checksums, out_path):
+    out = summary.copy()
+    for c in VALUE_COLS:
+        out[c] = out[c].round().astype("Int64")
+    _write(checksums, checksum_path(out_path))
+    _write(out, out_path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build or incrementally update the GOA species x area x year x lag summary.")
+    ap.add_argument("source", nargs="?", default=SCRAPE_PATH, help="Scraper output to aggregate.")
+    ap.add_argument("--out", default=SUMMARY_PATH)
+    ap.add_argument("--rebuild", action="store_true", help="Ignore stored checksums and rebuild every group.")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        print(f"Source not found: {args.source}")
+        sys.exit(1)
+    rows = source_rows(pd.read_csv(args.source, dtype=str, keep_default_na=False, encoding="utf-8-sig"))
+
+    ck_path = checksum_path(args.out)
+    if args.rebuild or not os.path.exists(args.out):
+        summary, checksums = build_summary(rows)
+        print(f"Rebuilt {len(summary)} groups from {len(rows)} rows")
+    else:
+        summary, checksums, counts = update_summary(rows, read_summary(args.out), read_checksums(ck_path))
+        print(f"Upserted {counts['insert']} new and {counts['update']} changed groups, deleted {counts['delete']}, "
+              f"kept {counts['unchanged']} unchanged")
+    write_summary(summary, checksums, args.out)
+    print(f"Wrote {len(summary)} rows to {args.out} (checksums in {ck_path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import os
+import sys
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Harvest-spec tables that share the long AssmentYr/ProjYear/lag/Species/Area
+# layout.  Region is implied by the file for the single-region tables.
+TABLES = {
+    "bsai": ("data/BSAI_OFL_ABC_TAC.csv", "BSAI"),
+    "goa_specs": ("data/GOA_OFL_ABC_TAC_specs.csv", "GOA"),
+    "goa_full": ("data/GOA_OFL_ABC_TAC_2yr_full.csv", "GOA"),
+    "goa_2yr": ("data/GOA_OFL_ABC_TAC_2yr.csv", "GOA"),
+    "goa_summary": ("data/summary_goa_species_area_by_year_lag.csv", "GOA"),
+}
+
+INDEX_COLS = ["Region", "Species", "Area", "AssmentYr", "ProjYear", "lag"]
+CATEGORY_COLS = ["Region", "Species", "Area", "SourceType"]
+VALUE_COLS = ["OFL", "ABC", "TAC"]
+
+# Loaded tables keyed by (absolute path, region): (mtime_ns, size, sha1, table).
+_CACHE = {}
+
+
+def to_num(series):
+    s = series.astype(str).str.replace(",", "", regex=False).str.strip()
+    s = s.replace({"": pd.NA, "na": pd.NA, "n/a": pd.NA, "N/A": pd.NA, "None": pd.NA, "nan": pd.NA})
+    return pd.to_numeric(s, errors="coerce")
+
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _spans(keys):
+    """Map each distinct key of a sorted key list to its (start, stop) slice."""
+    out = {}
+    start = 0
+    for i in range(1, len(keys) + 1):
+        if i == len(keys) or keys[i] != keys[start]:
+            out[keys[start]] = (start, i)
+            start = i
+    return out
+
+
+class HarvestSpecTable:
+    """Typed, sorted harvest-spec table with a composite key index.
+
+    Rows are sorted on (Region, Species, Area, AssmentYr, ProjYear, lag), so
+    every key prefix maps to one contiguous slice.  Point lookups are dict
+    hits on the full key or on the (Region, Species, Area, ProjYear, lag)
+    key; range scans slice the prefix span and mask the year columns.
+    """
+
+    def __init__(self, df, name=None):
+        self.name = name
+        df = df.sort_values(INDEX_COLS, kind="stable").reset_index(drop=True)
+        self.df = df
+        self._cols = {c: df[c].to_numpy() for c in df.columns}
+        self._years = {c: df[c].to_numpy(dtype=np.int64) for c in ("AssmentYr", "ProjYear", "lag")}
+
+        region = df["Region"].astype(str).tolist()
+        species = df["Species"].astype(str).tolist()
+        area = df["Area"].astype(str).tolist()
+        ay = self._years["AssmentYr"].tolist()
+        py = self._years["ProjYear"].tolist()
+        lag = self._years["lag"].tolist()
+
+        self._key_index = _spans(list(zip(region, species, area, ay, py, lag)))
+        self._series_index = _spans(list(zip(region, species, area)))
+        self._species_index = _spans(list(zip(region, species)))
+        self._region_index = _spans(region)
+        proj_index = {}
+        for i, k in enumerate(zip(region, species, area, py, lag)):
+            proj_index.setdefault(k, []).append(i)
+        self._proj_index = {k: np.asarray(v) for k, v in proj_index.items()}
+
+    def __len__(self):
+        return len(self.df)
+
+    def _row(self, i):
+        return {c: v[i] for c, v in self._cols.items()}
+
+    def get(self, region, species, area, proj_year, lag, assment_year=None):
+        """Return the first matching row as a dict, or None."""
+        if assment_year is not None:
+            span = self._key_index.get((region, species, area, assment_year, proj_year, lag))
+            return self._row(span[0]) if span else None
+        pos = self._proj_index.get((region, species, area, proj_year, lag))
+        return self._row(pos[0]) if pos is not None else None
+
+    def value(self, region, species, area, proj_year, lag, metric="ABC", assment_year=None):
+        row = self.get(region, species, area, proj_year, lag, assment_year=assment_year)
+        return None if row is None else row.get(metric)
+
+    def positions(self, region=None, species=None, area=None, years=None, lag=None, year_col="ProjYear"):
+        """Row positions for a prefix scan, optionally masked by year range and lag."""
+        if region is None:
+            lo, hi = 0, len(self.df)
+        elif species is None:
+            lo, hi = self._region_index.get(region, (0, 0))
+        elif area is None:
+            lo, hi = self._species_index.get((region, species), (0, 0))
+        else:
+            lo, hi = self._series_index.get((region, species, area), (0, 0))
+        idx = np.arange(lo, hi)
+        # Species and area are only implied by the span when every column
+        # before them in the sort order was given too.
+        if species is not None and region is None:
+            idx = idx[self._cols["Species"][idx] == species]
+        if area is not None and (region is None or species is None):
+            idx = idx[self._cols["Area"][idx] == area]
+        if years is not None:
+            y = self._years[year_col][idx]
+            y_lo, y_hi = years
+            idx = idx[(y >= y_lo) & (y <= y_hi)]
+        if lag is not None:
+            idx = idx[self._years["lag"][idx] == lag]
+        return idx
+
+    def scan(self, region=None, species=None, area=None, years=None, lag=None, year_col="ProjYear"):
+        return self.df.iloc[self.positions(region, species, area, years, lag, year_col)]
+
+    def pivot(self, metric="ABC", region=None, species=None, lag=1, index="ProjYear", columns="Area", years=None):
+        """Wide table of `metric` (first value per cell) for a scanned slice."""
+        sub = self.scan(region=region, species=species, years=years, lag=lag)
+        if sub.empty:
+            return pd.DataFrame()
+        return sub.pivot_table(index=index, columns=columns, values=metric, aggfunc="first", observed=True)
+
+
+def prepare_table(df, region=None):
+    df = df.copy()
+    if "Region" not in df.columns:
+        df["Region"] = region or ""
+    if "AssmentYr" not in df.columns:
+        df["AssmentYr"] = df["ProjYear"]
+    df["Area"] = df["Area"].fillna("").astype(str)
+    df["Species"] = df["Species"].fillna("").astype(str)
+    # Rows without a year cannot be keyed; dropping them keeps year 0 out of
+    # the index.
+    for c in ("AssmentYr", "ProjYear", "lag"):
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    df = df.dropna(subset=["AssmentYr", "ProjYear", "lag"])
+    for c in ("AssmentYr", "ProjYear", "lag"):
+        df[c] = df[c].astype(np.int16)
+    for c in VALUE_COLS:
+        if c in df.columns:
+            df[c] = to_num(df[c]).astype(np.float64)
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+
+def load_table(name_or_path, region=None, use_cache=True):
+    """Load a harvest-spec CSV as an indexed table, reusing the cached copy.
+
+    The cache entry is reused while the file's mtime and size are unchanged;
+    when they differ the content hash decides, so a touched-but-identical
+    file (e.g. after a checkout) is not re-parsed.
+    """
+    if name_or_path in TABLES:
+        path, region = TABLES[name_or_path][0], region or TABLES[name_or_path][1]
+        name = name_or_path
+    else:
+        path, name = name_or_path, os.path.basename(name_or_path)
+    abspath = os.path.abspath(path)
+    key = (abspath, region)
+    st = os.stat(abspath)
+
+    entry = _CACHE.get(key) if use_cache else None
+    if entry is not None:
+        mtime_ns, size, sha1, table = entry
+        if (mtime_ns, size) == (st.st_mtime_ns, st.st_size):
+            return table
+        digest = _file_sha1(abspath)
+        if digest == sha1:
+            _CACHE[key] = (st.st_mtime_ns, st.st_size, sha1, table)
+            return table
+    else:
+        digest = _file_sha1(abspath) if use_cache else None
+
+    table = HarvestSpecTable(prepare_table(pd.read_csv(abspath, encoding="utf-8-sig"), region=region), name=name)
+    if use_cache:
+        _CACHE[key] = (st.st_mtime_ns, st.st_size, digest, table)
+    return table
+
+
+def clear_cache():
+    _CACHE.clear()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query a harvest-spec table by key, range or pivot.")
+    ap.add_argument("table", help=f"Table name ({', '.join(TABLES)}) or CSV path.")
+    ap.add_argument("--region")
+    ap.add_argument("--species")
+    ap.add_argument("--area")
+    ap.add_argument("--year", type=int, help="ProjYear for a point lookup.")
+    ap.add_argument("--years", help="ProjYear range for a scan, e.g. 2010-2020.")
+    ap.add_argument("--lag", type=int)
+    ap.add_argument("--metric", default="ABC", choices=VALUE_COLS)
+    ap.add_argument("--pivot", action="store_true", help="Print a ProjYear x Area pivot of --metric.")
+    args = ap.parse_args(argv)
+
+    table = load_table(args.table)
+    region = args.region or (TABLES[args.table][1] if args.table in TABLES else None)
+
+    if args.year is not None and args.species and args.area is not None and args.lag is not None:
+        row = table.get(region, args.species, args.area, args.year, args.lag)
+        if row is None:
+            print("No matching row.")
+            sys.exit(1)
+        print(row.get(args.metric))
+        return
+
+    years = None
+    if args.years:
+        lo, _, hi = args.years.partition("-")
+        years = (int(lo), int(hi or lo))
+    if args.pivot:
+        out = table.pivot(args.metric, region=region, species=args.species, lag=args.lag or 1, years=years)
+    else:
+        out = table.scan(region=region, species=args.species, area=args.area, years=years, lag=args.lag)
+    print(out.to_string())
+
+
+if __name__ == "__main__":
+    main()
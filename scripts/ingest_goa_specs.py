@@ -0,0 +1,253 @@
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+from harvest_specs_store import HarvestSpecTable, prepare_table
+from scrape_goa_fedreg import (
+    NATURAL_KEY,
+    REGION_VOCAB,
+    canonicalize_species,
+    change_counts,
+    changeset,
+    normalize_area,
+    write_changeset,
+)
+
+IN_PATH = "data/GOA_harvest specs_1986-2024.xlsx"
+SHEET = "GOA harvest specs 1986-present"
+OUT_PATH = "data/GOA_OFL_ABC_TAC_specs.csv"
+
+# Same layout and order as R/munge_goa_harvest_specs.R writes.
+OUT_COLS = ["AssmentYr", "ProjYear", "lag", "Area", "Species", "ABC", "OFL", "TAC", "OY", "Order"]
+METRICS = ["OFL", "ABC", "TAC"]
+NA_STRINGS = {"", "n/a", "na", "N/A", "NA"}
+
+# Species and area columns precede the year blocks.
+FIRST_BLOCK_COL = 2
+
+
+def to_number(value):
+    """Cell value as a float, decoding 'n/a' and comma-grouped strings."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = str(value).replace(",", "").strip()
+    if s in NA_STRINGS:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _year(value):
+    v = to_number(value)
+    return int(v) if v is not None and float(v).is_integer() and 1900 < v < 2200 else None
+
+
+def column_blocks(years_row, labels_row, first_col=FIRST_BLOCK_COL):
+    """Map the header rows to [(year, {metric: column index}), ...] once.
+
+    A block starts at every column whose row-1 cell holds a year (merged
+    year cells only carry the value in their first column) and runs to the
+    next one.  Metrics come from the row-2 labels, falling back to the
+    OFL/ABC/TAC position the R script assumes.  Blocks without a year or
+    with fewer than three columns are dropped, as in the R script.
+    """
+    width = max(len(years_row), len(labels_row))
+    years_row = list(years_row) + [None] * (width - len(years_row))
+    labels_row = list(labels_row) + [None] * (width - len(labels_row))
+    starts = [j for j in range(first_col, width) if _year(years_row[j]) is not None]
+    blocks = []
+    for i, j in enumerate(starts):
+        stop = starts[i + 1] if i + 1 < len(starts) else width
+        cols = list(range(j, min(stop, j + len(METRICS))))
+        if len(cols) < len(METRICS):
+            continue
+        labels = [str(labels_row[c] or "").strip().upper() for c in cols]
+        if sorted(labels) == sorted(METRICS):
+            mapping = {lab: c for lab, c in zip(labels, cols)}
+        else:
+            mapping = dict(zip(METRICS, cols))
+        blocks.append((_year(years_row[j]), mapping))
+    return blocks
+
+
+def _label(value):
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s or None
+
+
+def label_matchers(canonicalize=True, stats=None):
+    """Memoized species/area canonicalizers over the scraper's GOA vocabulary.
+
+    Each distinct label is matched once.  Labels the matchers cannot
+    resolve (e.g. the grand "Total" species row) are kept as written and
+    listed in `stats`.
+    """
+    species_canon, area_canon = REGION_VOCAB["GOA"]
+    species_memo, area_memo = {}, {}
+    unmatched = stats.setdefault("unmatched_species", set()) if stats is not None else set()
+    unmatched_area = stats.setdefault("unmatched_areas", set()) if stats is not None else set()
+
+    def species(label):
+        if label is None or not canonicalize:
+            return label
+        if label not in species_memo:
+            name, matched = canonicalize_species(label, canon=species_canon)
+            species_memo[label] = name if matched else label
+            if not matched:
+                unmatched.add(label)
+        return species_memo[label]
+
+    def area(label):
+        if label is None or not canonicalize:
+            return label
+        if label not in area_memo:
+            name = normalize_area(label, canon=area_canon)
+            area_memo[label] = name or label
+            if not name:
+                unmatched_area.add(label)
+        return area_memo[label]
+
+    return species, area
+
+
+def iter_spec_rows(path=IN_PATH, sheet=SHEET, canonicalize=True, stats=None):
+    """Yield lag-1 rows in the shared schema from the workbook, streaming.
+
+    The sheet is opened read-only and walked once with values_only rows, so
+    only the header mapping and the current row are held in memory.  Species
+    is filled down over merged cells; a row is yielded per year block with
+    at least one value.  `stats` (a dict) receives the header years in
+    sheet order plus row and unmatched-label counts.  Order is left to
+    spec_frame(), which needs every row.
+    """
+    import openpyxl
+
+    stats = {} if stats is None else stats
+    species_of, area_of = label_matchers(canonicalize, stats)
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet in wb.sheetnames else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        years_row = next(rows, ())
+        labels_row = next(rows, ())
+        blocks = column_blocks(years_row, labels_row)
+        stats["years"] = [year for year, _ in blocks]
+        stats["sheet_rows"] = 0
+        stats["rows"] = 0
+        species = None
+        for cells in rows:
+            stats["sheet_rows"] += 1
+            cells = cells or ()
+            raw_species = _label(cells[0]) if len(cells) > 0 else None
+            if raw_species is not None:
+                species = species_of(raw_species)
+            area = area_of(_label(cells[1]) if len(cells) > 1 else None)
+            for year, cols in blocks:
+                vals = {m: to_number(cells[c]) if c < len(cells) else None for m, c in cols.items()}
+                if all(v is None for v in vals.values()):
+                    continue
+                stats["rows"] += 1
+                yield {
+                    "AssmentYr": year,
+                    "ProjYear": year,
+                    "lag": 1,
+                    "Area": area,
+                    "Species": species,
+                    "ABC": vals["ABC"],
+                    "OFL": vals["OFL"],
+                    "TAC": vals["TAC"],
+                    "OY": 1,
+                }
+    finally:
+        wb.close()
+
+
+def spec_frame(rows, years=None):
+    """Collect rows into the R script's table: Order and sort included.
+
+    Order is species first appearance scanning the year blocks in sheet
+    order (`years`, from iter_spec_rows stats), then rows; output is sorted
+    by ProjYear, Order and Area with blank areas last.
+    """
+    df = pd.DataFrame(list(rows), columns=OUT_COLS[:-1])
+    if df.empty:
+        return pd.DataFrame(columns=OUT_COLS)
+    block = {y: i for i, y in enumerate(years or sorted(df["ProjYear"].unique()))}
+    scan = df.assign(_block=df["ProjYear"].map(block), _seq=range(len(df)))
+    scan = scan.sort_values(["_block", "_seq"], kind="stable")
+    order = {sp: i + 1 for i, sp in enumerate(dict.fromkeys(scan["Species"]))}
+    df["Order"] = df["Species"].map(order)
+    df = df.sort_values(["ProjYear", "Order", "Area"], kind="stable", na_position="last")
+    return df.reset_index(drop=True)[OUT_COLS]
+
+
+def spec_table(path=IN_PATH, sheet=SHEET, canonicalize=True):
+    """The workbook as an indexed HarvestSpecTable, with no CSV in between."""
+    stats = {}
+    rows = list(iter_spec_rows(path, sheet, canonicalize=canonicalize, stats=stats))
+    df = spec_frame(rows, years=stats.get("years"))
+    return HarvestSpecTable(prepare_table(df, region="GOA"), name="goa_specs")
+
+
+def _format_number(v):
+    if pd.isna(v):
+        return ""
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def write_specs(df, out_path):
+    """Write like readr::write_csv: blanks for NA, integral values without '.0'."""
+    out = df.copy()
+    for c in ("ABC", "OFL", "TAC"):
+        out[c] = out[c].map(_format_number)
+    out.to_csv(out_path, index=False)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stream the GOA harvest-specs workbook into the long OFL/ABC/TAC table.")
+    ap.add_argument("xlsx", nargs="?", default=IN_PATH)
+    ap.add_argument("--sheet", default=SHEET)
+    ap.add_argument("--out", default=OUT_PATH)
+    ap.add_argument("--raw-labels", action="store_true",
+                    help="Keep workbook species/area labels (matches R/munge_goa_harvest_specs.R output).")
+    ap.add_argument("--no-changes", action="store_true", help="Skip the changeset against the previous output.")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.xlsx):
+        print(f"Workbook not found: {args.xlsx}")
+        sys.exit(1)
+    stats = {}
+    rows = list(iter_spec_rows(args.xlsx, args.sheet, canonicalize=not args.raw_labels, stats=stats))
+    df = spec_frame(rows, years=stats.get("years"))
+    if df.empty:
+        print(f"No rows read from {args.xlsx} [{args.sheet}]")
+        sys.exit(1)
+
+    if not args.no_changes and os.path.exists(args.out):
+        old = pd.read_csv(args.out, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+        new = df.copy()
+        for c in ("ABC", "OFL", "TAC"):
+            new[c] = new[c].map(_format_number)
+        changes = changeset(old, new.astype(str).where(new.notna(), ""), key=NATURAL_KEY)
+        counts = change_counts(changes)
+        csv_path, _ = write_changeset(changes, args.out)
+        print(f"Changes vs previous {args.out}: {counts['insert']} inserted, {counts['delete']} deleted, "
+              f"{counts['update']} updated ({csv_path})")
+
+    write_specs(df, args.out)
+    print(f"Wrote {args.out} ({len(df)} rows from {stats['sheet_rows']} sheet rows, {len(stats['years'])} year blocks)")
+    for key, label in (("unmatched_species", "species"), ("unmatched_areas", "area")):
+        if stats.get(key):
+            print(f"  Kept unmatched {label} labels: " + ", ".join(sorted(stats[key])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from backtest_baselines import DEFAULT_DATA, build_panel, load_long
+
+OUT_PATH = "data/interim_policy_scores.csv"
+
+# Default policy grid: 11 x 11 x 9 = 1089 variants.
+DEFAULT_STEPS = np.linspace(0.0, 1.0, 11)
+DEFAULT_BLENDS = np.linspace(0.0, 1.0, 11)
+DEFAULT_CAPS = [np.inf, 0.05, 0.10, 0.15, 0.20, 0.25, 0.30, 0.40, 0.50]
+
+# Upper bound on K x Y x S elements per simulation chunk.
+CHUNK_ELEMENTS = 8_000_000
+
+SCORE_COLS = ["n", "Snap", "Snap_p90", "MAPE", "MeanChange", "MaxChange", "AAV"]
+
+
+# A policy replays the advice for year t from what was known at t - 1 and
+# the assessment finished for t:
+#
+#     prior_t  = blend * projection_t + (1 - blend) * advice_{t-1}
+#     advice_t = prior_t + step * (final_t - prior_t)
+#     advice_t = clip(advice_t, advice_{t-1} * (1 - cap), advice_{t-1} * (1 + cap))
+#
+# projection_t is the lag-2 value published the year before and final_t the
+# lag-1 value.  step = 1 with no cap is the current system (advice = final);
+# step = 0 with blend = 1 keeps the two-year projection, blend = 0 a pure
+# rollover.  The "snap" is the revision advice_t - prior_t that users see
+# between the expected and the adopted value.
+
+def policy_grid(steps=None, caps=None, blends=None):
+    """Every step x cap x blend combination as a Policy-indexed frame."""
+    steps = DEFAULT_STEPS if steps is None else np.asarray(steps, dtype=float)
+    caps = DEFAULT_CAPS if caps is None else caps
+    blends = DEFAULT_BLENDS if blends is None else np.asarray(blends, dtype=float)
+    s, c, b = np.meshgrid(steps, np.asarray(caps, dtype=float), blends, indexing="ij")
+    out = pd.DataFrame({"Step": s.ravel(), "Cap": c.ravel(), "Blend": b.ravel()})
+    out.insert(0, "Policy", np.arange(len(out)))
+    return out
+
+
+def simulate(final, projection, policies):
+    """Advice and prior arrays, shape (n_policies, n_years, n_series).
+
+    `final` and `projection` are the panel's year x series lag-1 and lag-2
+    arrays.  Policies are vectorized; only the recursion over years is a
+    loop.  A missing projection falls back to the rollover and vice versa;
+    a missing final value leaves the prior in place.  A series with no
+    advice in a year restarts from its next final value.
+    """
+    step = policies["Step"].to_numpy(dtype=float)[:, None]
+    cap = policies["Cap"].to_numpy(dtype=float)[:, None]
+    capped = np.isfinite(cap)
+    cap = np.where(capped, cap, 0.0)
+    blend = policies["Blend"].to_numpy(dtype=float)[:, None]
+    K = len(policies)
+    Y, S = final.shape
+    advice = np.full((K, Y, S), np.nan)
+    prior = np.full((K, Y, S), np.nan)
+    prev = np.full((K, S), np.nan)
+    for t in range(Y):
+        u = final[t][None]
+        p = projection[t][None]
+        has_prev = np.isfinite(prev)
+        pr = np.where(has_prev & np.isfinite(p), blend * p + (1 - blend) * prev, np.where(has_prev, prev, p))
+        adv = np.where(np.isfinite(pr), pr + step * (u - pr), u)
+        adv = np.where(np.isfinite(u), adv, pr)
+        bound = has_prev & capped
+        adv = np.where(bound, np.clip(adv, prev * (1 - cap), prev * (1 + cap)), adv)
+        advice[:, t] = adv
+        prior[:, t] = pr
+        prev = adv
+    return advice, prior
+
+
+def _rel(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, np.abs(num) / den, np.nan)
+
+
+def _mean(x, axis):
+    n = np.isfinite(x).sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, np.nansum(x, axis=axis) / np.where(n > 0, n, 1), np.nan), n
+
+
+def score_arrays(advice, prior, final, scored):
+    """Snap, error and stability terms per policy x year x series.
+
+    `scored` masks the target years.  Snap is |advice - prior| / prior, error
+    is |advice - final| / final and change is the relative year-to-year move
+    in advice.  Cells without a positive final value are not scored.
+    """
+    keep = scored[None, :, None] & (final > 0)[None]
+    snap = np.where(keep, _rel(advice - prior, prior), np.nan)
+    ape = np.where(keep, _rel(advice - final[None], final[None]), np.nan)
+    change = np.full(advice.shape, np.nan)
+    change[:, 1:] = _rel(advice[:, 1:] - advice[:, :-1], advice[:, :-1])
+    change = np.where(keep, change, np.nan)
+    moved = np.where(np.isfinite(change), np.abs(advice - np.roll(advice, 1, axis=1)), np.nan)
+    level = np.where(np.isfinite(change), advice, np.nan)
+    return snap, ape, change, moved, level
+
+
+def _summaries(snap, ape, change, moved, level, axis):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        snap_mean = _mean(snap, axis)[0]
+        mape, n = _mean(ape, axis)
+        aav = np.where(np.nansum(level, axis=axis) > 0, np.nansum(moved, axis=axis) / np.nansum(level, axis=axis), np.nan)
+        all_nan = ~np.isfinite(change).any(axis=axis)
+        max_change = np.where(all_nan, np.nan, np.nanmax(np.where(np.isfinite(change), change, -np.inf), axis=axis))
+        snap_p90 = _nanquantile(snap, 0.9, axis)
+    return {
+        "n": n,
+        "Snap": snap_mean,
+        "Snap_p90": snap_p90,
+        "MAPE": mape,
+        "MeanChange": _mean(change, axis)[0],
+        "MaxChange": max_change,
+        "AAV": aav,
+    }
+
+
+def _nanquantile(x, q, axis):
+    """Linear-interpolation quantile ignoring NaN, as one sort (np.nanquantile
+    loops over rows in Python)."""
+    if isinstance(axis, tuple):
+        x = x.reshape(x.shape[0], -1)
+        axis = 1
+    srt = np.sort(np.moveaxis(x, axis, -1), axis=-1)
+    n = np.isfinite(srt).sum(axis=-1)
+    pos = q * np.maximum(n - 1, 0)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+    vlo = np.take_along_axis(srt, lo[..., None], axis=-1)[..., 0]
+    vhi = np.take_along_axis(srt, hi[..., None], axis=-1)[..., 0]
+    return np.where(n > 0, vlo + (pos - lo) * (vhi - vlo), np.nan)
+
+
+def run_policies(panel, policies, metric="TAC", start_year=None, end_year=None, by_series=False):
+    """Simulate and score every policy for one metric, chunked over policies.
+
+    Returns (policy summary, per-series scores or None).  The summary pools
+    every scored (year, series) cell; AAV is sum |change| / sum advice.
+    """
+    final = panel["used"][metric]
+    projection = panel["proj"][metric]
+    years = panel["years"]
+    scored = np.ones(len(years), dtype=bool)
+    if start_year is not None:
+        scored &= years >= start_year
+    if end_year is not None:
+        scored &= years <= end_year
+
+    Y, S = final.shape
+    step = max(1, CHUNK_ELEMENTS // max(1, Y * S))
+    pooled, per_series = [], []
+    for i in range(0, len(policies), step):
+        chunk = policies.iloc[i:i + step]
+        advice, prior = simulate(final, projection, chunk)
+        terms = score_arrays(advice, prior, final, scored)
+        pooled.append(_summaries(*terms, axis=(1, 2)))
+        if by_series:
+            per_series.append(_summaries(*terms, axis=1))
+
+    summary = policies.copy()
+    summary.insert(1, "Metric", metric)
+    for col in SCORE_COLS:
+        summary[col] = np.concatenate([p[col] for p in pooled])
+
+    series = None
+    if by_series:
+        K = len(policies)
+        species = [s[0] for s in panel["series"]]
+        areas = [s[1] for s in panel["series"]]
+        series = pd.DataFrame({
+            "Policy": np.repeat(policies["Policy"].to_numpy(), S),
+            "Metric": metric,
+            "Species": np.tile(species, K),
+            "Area": np.tile(areas, K),
+        })
+        for col in SCORE_COLS:
+            series[col] = np.concatenate([p[col] for p in per_series], axis=0).ravel()
+        series = series[series["n"] > 0].reset_index(drop=True)
+    return summary, series
+
+
+def frontier(summary, snap="Snap", error="MAPE"):
+    """Policies not dominated on (snap, error) within each metric."""
+    keep = []
+    for _, g in summary.dropna(subset=[snap, error]).groupby("Metric", sort=False):
+        g = g.sort_values([snap, error], kind="stable")
+        err = g[error].to_numpy()
+        best_before = np.r_[np.inf, np.minimum.accumulate(err)[:-1]]
+        keep.append(g[err < best_before])
+    out = pd.concat(keep) if keep else summary.iloc[:0]
+    return out.reset_index(drop=True)
+
+
+def _float_list(text):
+    return [float("inf") if x.strip().lower() in ("inf", "none") else float(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay historical ABC/TAC advice under interim-update policies.")
+    ap.add_argument("--data", default=DEFAULT_DATA, help="Long harvest-spec CSV with lag 1 and lag 2 rows.")
+    ap.add_argument("--metric", action="append", choices=["OFL", "ABC", "TAC"], help="Metric(s) to replay (default: ABC and TAC).")
+    ap.add_argument("--area", action="append", help="Only these Area values (e.g. Total); default all series.")
+    ap.add_argument("--steps", type=_float_list, default=None, help="Comma list of interim step sizes in [0, 1].")
+    ap.add_argument("--caps", type=_float_list, default=None, help="Comma list of year-to-year change caps; 'inf' for none.")
+    ap.add_argument("--blends", type=_float_list, default=None, help="Comma list of projection weights in the prior.")
+    ap.add_argument("--start-year", type=int, default=2001, help="First target year scored (report uses 2001+).")
+    ap.add_argument("--end-year", type=int, default=None)
+    ap.add_argument("--all-rows", action="store_true", help="Keep OY == 0 rows.")
+    ap.add_argument("--series-out", default=None, help="Also write per Species x Area scores here.")
+    ap.add_argument("--out", default=OUT_PATH)
+    args = ap.parse_args(argv)
+
+    df = load_long(args.data, oy_only=not args.all_rows)
+    if args.area:
+        df = df[df["Area"].isin(args.area)]
+    if df.empty:
+        print(f"No rows in {args.data}.")
+        sys.exit(1)
+    metrics = [m for m in (args.metric or ["ABC", "TAC"]) if m in df.columns]
+    panel = build_panel(df, metrics)
+    policies = policy_grid(args.steps, args.caps, args.blends)
+
+    summaries, series = [], []
+    for m in metrics:
+        summary, per_series = run_policies(panel, policies, m, args.start_year, args.end_year,
+                                           by_series=args.series_out is not None)
+        summaries.append(summary)
+        if per_series is not None:
+            series.append(per_series)
+    out = pd.concat(summaries, ignore_index=True)
+    out.to_csv(args.out, index=False)
+    print(f"Replayed {len(policies)} policies over {len(panel['series'])} series and {len(metrics)} metric(s); wrote {args.out}")
+    if series:
+        pd.concat(series, ignore_index=True).to_csv(args.series_out, index=False)
+        print(f"Wrote per-series scores to {args.series_out}")
+
+    current = out[(out["Step"] == 1) & ~np.isfinite(out["Cap"]) & (out["Blend"] == 1)]
+    print("Current system (step 1, no cap, snap measured from the lag-2 projection):")
+    print(current[["Metric"] + SCORE_COLS].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print("Snap/MAPE frontier:")
+    cols = ["Metric", "Step", "Cap", "Blend"] + SCORE_COLS
+    print(frontier(out)[cols].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
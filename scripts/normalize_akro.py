@@ -0,0 +1,153 @@
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scrape_goa_fedreg import (
+    ASSESSMENT_OFFSET,
+    REGION_VOCAB,
+    canonicalize_species,
+    normalize_area,
+)
+
+AKRO_SOURCES = {
+    "GOA": "data/goa-historic-akro.csv",
+    "BSAI": "data/bsai-historic-akro.csv",
+}
+OUT_PATH = "data/AKRO_OFL_ABC_TAC.csv"
+
+AKRO_VALUE_COLUMNS = {
+    "OVERFISHING_LEVEL": "OFL",
+    "ACCEPTABLE_BIOLOGICAL_CATCH": "ABC",
+    "TOTAL_ALLOWABLE_CATCH": "TAC",
+}
+
+# AKRO labels the fuzzy matchers cannot (or should not) resolve.  None drops
+# the row, e.g. State GHL lines that are not federal specifications.
+AKRO_SPECIES_ALIASES = {
+    "GOA": {},
+    "BSAI": {
+        "Rock sole": "Northern rock sole",
+        "Rougheye rockfish": "Blackspotted/Rougheye rockfish",
+    },
+}
+AKRO_AREA_ALIASES = {
+    "GOA": {"GOA": "Total", "State GHL": None},
+    "BSAI": {"Combined BS and AI": "BSAI", "State GHL": None},
+}
+
+OUT_COLS = ["AssmentYr", "ProjYear", "lag", "Species", "Area", "OFL", "ABC", "TAC", "Region", "SourceType"]
+
+
+def canonical_codes(values, canon_fn):
+    """Apply `canon_fn` once per distinct label and broadcast the result.
+
+    Labels are factorized to integer codes, the unique labels are
+    canonicalized, and the result is gathered back with one take, so the
+    cost scales with the number of distinct labels rather than rows.
+    Missing labels map to None.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    for i, label in enumerate(uniques):
+        mapped[i] = canon_fn(label)
+    mapped[-1] = None
+    return mapped[codes], len(uniques)
+
+
+def species_matcher(region):
+    canon = REGION_VOCAB[region][0]
+    aliases = AKRO_SPECIES_ALIASES[region]
+
+    def match(label):
+        if label in aliases:
+            return aliases[label]
+        sp, matched = canonicalize_species(label, canon=canon)
+        return sp if matched else None
+    return match
+
+
+def area_matcher(region):
+    canon = REGION_VOCAB[region][1]
+    aliases = AKRO_AREA_ALIASES[region]
+
+    def match(label):
+        if label in aliases:
+            return aliases[label]
+        area = normalize_area(label, canon=canon)
+        return area if area else None
+    return match
+
+
+def normalize_akro(df, region):
+    """AKRO historic rows in the shared AssmentYr/ProjYear/lag/... schema.
+
+    Returns (normalized frame, stats dict).  Rows whose species or area label
+    does not resolve are dropped and counted in the stats.
+    """
+    species, n_species = canonical_codes(df["SPECIES_GROUP_LABEL"], species_matcher(region))
+    area, n_area = canonical_codes(df["AREA_LABEL"], area_matcher(region))
+
+    proj_year = df["YEAR"].to_numpy(dtype=int)
+    out = pd.DataFrame({
+        "AssmentYr": proj_year - ASSESSMENT_OFFSET[region],
+        "ProjYear": proj_year,
+        "lag": 1,
+        "Species": species,
+        "Area": area,
+    })
+    for src, dst in AKRO_VALUE_COLUMNS.items():
+        out[dst] = pd.to_numeric(df[src], errors="coerce").to_numpy()
+    out["Region"] = region
+    out["SourceType"] = "AKRO"
+
+    keep = pd.notna(species) & pd.notna(area)
+    stats = {
+        "rows": len(df),
+        "kept": int(keep.sum()),
+        "species_labels": n_species,
+        "area_labels": n_area,
+        "unmatched_species": sorted(df.loc[pd.isna(species), "SPECIES_GROUP_LABEL"].dropna().unique()),
+        "unmatched_areas": sorted(df.loc[pd.isna(area), "AREA_LABEL"].dropna().unique()),
+    }
+    out = out[keep].sort_values(["ProjYear", "Species", "Area"], kind="stable").reset_index(drop=True)
+    return out[OUT_COLS], stats
+
+
+def load_akro(region, path=None):
+    return pd.read_csv(path or AKRO_SOURCES[region], encoding="utf-8-sig")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Normalize AKRO historic OFL/ABC/TAC labels to the scraper vocabulary.")
+    ap.add_argument("--region", action="append", choices=sorted(AKRO_SOURCES), help="Region(s) to normalize (default: all).")
+    ap.add_argument("--out", default=OUT_PATH)
+    args = ap.parse_args(argv)
+
+    frames = []
+    for region in args.region or sorted(AKRO_SOURCES):
+        out, stats = normalize_akro(load_akro(region), region)
+        print(
+            f"[{region}] rows={stats['rows']} kept={stats['kept']} "
+            f"species_labels={stats['species_labels']} area_labels={stats['area_labels']}"
+        )
+        if stats["unmatched_species"]:
+            print("  Unmatched species labels: " + ", ".join(stats["unmatched_species"]))
+        if stats["unmatched_areas"]:
+            print("  Unmatched/dropped area labels: " + ", ".join(stats["unmatched_areas"]))
+        frames.append(out)
+
+    out_df = pd.concat(frames, ignore_index=True)
+    if out_df.empty:
+        print("No AKRO rows normalized.")
+        sys.exit(1)
+    out_df["OFL"] = out_df["OFL"].round().astype("Int64")
+    out_df["ABC"] = out_df["ABC"].round().astype("Int64")
+    out_df["TAC"] = out_df["TAC"].round().astype("Int64")
+    out_df.to_csv(args.out, index=False)
+    print(f"Wrote {len(out_df)} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,75 @@
+import io
 import re
 import sys
 import json
 import time
-import io
 import os
+import mmap
 import difflib
-from datetime import datetime
+import hashlib
+import argparse
+import importlib
+import tempfile
+from datetime import datetime, timezone
 from urllib.parse import urlencode
 
-import requests
-import pandas as pd
-from lxml import etree
 
-try:
-    import pdfplumber
-except Exception:
-    pdfplumber = None
+class _LazyModule:
+    """Module proxy that imports on first attribute access.
+
+    pandas, lxml, pdfplumber and requests are only needed once a document is
+    fetched or parsed, so `plan` (and importers of the vocabulary lists)
+    start without paying for them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def available(self):
+        try:
+            self._load()
+        except Exception:
+            return False
+        return True
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+requests = _LazyModule("requests")
+pd = _LazyModule("pandas")
+np = _LazyModule("numpy")
+etree = _LazyModule("lxml.etree")
+pdfplumber = _LazyModule("pdfplumber")
+pdftypes = _LazyModule("pdfminer.pdftypes")
 
 BASE = "https://www.federalregister.gov/api/v1/documents.json"
 
 START_YEAR = int(os.getenv("GOA_FR_START_YEAR", "1986"))
-END_YEAR = int(os.getenv("GOA_FR_END_YEAR", str(datetime.utcnow().year + 1)))
+END_YEAR = int(os.getenv("GOA_FR_END_YEAR", str(datetime.now(timezone.utc).year + 1)))
 PILOT_START = 2018
 PILOT_END = 2026
 
 OUT_PATH = "data/GOA_OFL_ABC_TAC_2yr_full.csv"
 EXISTING_GOA = "data/GOA_OFL_ABC_TAC.csv"
 
+# FR API metadata (search pages and document details) is cached on disk so
+# `plan` and repeat runs need no network.  Searches for publication years
+# more than a year back are treated as settled; newer ones expire after
+# METADATA_TTL_HOURS.
+METADATA_CACHE_DIR = os.getenv("GOA_FR_CACHE_DIR", ".goa_fr_cache")
+METADATA_TTL_HOURS = float(os.getenv("GOA_FR_METADATA_TTL_HOURS", "24"))
+
+# Append-only record of finished crawl years, so `run --resume` restarts at
+# the first unfinished year instead of the beginning.
+JOURNAL_PATH = os.getenv("GOA_FR_JOURNAL", os.path.join(METADATA_CACHE_DIR, "crawl_journal.jsonl"))
+
 SPECIES_CANON = [
     "Arrowtooth Flounder",
     "Atka Mackerel",
@@ -88,7 +131,99 @@ AREA_CANON = [
 SPECIES_CANON_SET = set(SPECIES_CANON)
 AREA_CANON_SET = set(AREA_CANON)
 
+# BSAI vocabulary, as used in data/BSAI_OFL_ABC_TAC.csv.
+BSAI_SPECIES_CANON = [
+    "Alaska plaice",
+    "Arrowtooth flounder",
+    "Atka mackerel",
+    "Blackspotted/Rougheye rockfish",
+    "Flathead sole",
+    "Greenland turbot",
+    "Kamchatka flounder",
+    "Northern rock sole",
+    "Northern rockfish",
+    "Octopuses",
+    "Other flatfish",
+    "Other Red rockfish",
+    "Other rockfish",
+    "Other species",
+    "Pacific cod",
+    "Pacific ocean perch",
+    "Pollock",
+    "Sablefish",
+    "Sculpins",
+    "Sharks",
+    "Sharpchin/Northern",
+    "Shortraker rockfish",
+    "Skates",
+    "Squids",
+    "Yellowfin sole",
+]
+
+BSAI_AREA_CANON = [
+    "AI",
+    "BS",
+    "BS/EAI",
+    "BSAI",
+    "Bogoslof",
+    "CAI",
+    "CAI/WAI",
+    "EAI",
+    "EAI/BS",
+    "EBS",
+    "EBS/EAI",
+    "WAI",
+    "",
+]
+
 BSAI_AREA_TOKENS = {"bs", "ai", "ebs", "bsai", "eai", "cai", "wai"}
+BSAI_AREA_HINTS = ["bering", "aleutian", "bogoslof"]
+GOA_AREA_TOKENS = {"goa", "gw", "w", "c", "e", "wyk", "seo", "eyk"}
+GOA_AREA_HINTS = [
+    "gulf of alaska", "610", "620", "630", "640", "650",
+    "shumagin", "chirikof", "kodiak", "shelikof", "yakutat", "southeast outside",
+    "western", "central", "eastern",
+]
+
+# Region dimension.  Combined BSAI+GOA rules are parsed once and their rows
+# split by region, each with its own canonical vocabulary and output file.
+# BSAI_OFL_ABC_TAC.csv is maintained separately, so the scraped BSAI rows
+# go to their own file.
+REGIONS = ("GOA", "BSAI")
+REGION_VOCAB = {
+    "GOA": (SPECIES_CANON, AREA_CANON),
+    "BSAI": (BSAI_SPECIES_CANON, BSAI_AREA_CANON),
+}
+REGION_DEFAULT_AREA = {"GOA": "GOA", "BSAI": "BSAI"}
+REGION_OUT_PATHS = {
+    "GOA": OUT_PATH,
+    "BSAI": "data/BSAI_OFL_ABC_TAC_fedreg.csv",
+}
+REGION_ORDER_SOURCES = {
+    "GOA": EXISTING_GOA,
+    "BSAI": "data/BSAI_OFL_ABC_TAC.csv",
+}
+# AssmentYr is the rule's first year for GOA; BSAI tables key both lags to
+# the prior year's assessment (AssmentYr = ProjYear - lag).
+ASSESSMENT_OFFSET = {"GOA": 0, "BSAI": 1}
+
+# Response bodies are streamed to spooled temp files: kept in memory up to
+# SPOOL_BYTES, then rolled to disk.  Downloads larger than MAX_BYTES are
+# abandoned.
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+DOWNLOAD_SPOOL_BYTES = int(os.getenv("GOA_FR_SPOOL_BYTES", str(8 << 20)))
+DOWNLOAD_MAX_BYTES = int(os.getenv("GOA_FR_MAX_BYTES", str(256 << 20)))
+
+# Marker on FR pages served instead of content to throttled clients.
+ACCESS_WALL_MARKER = b"Request Access"
+
+# PDF pages worth full layout analysis: a TABLE 1/2 caption with OFL/ABC/TAC
+# headers and at least one tonnage, plus the tonnage-dense pages that follow
+# it (tables continued without a caption).
+PDF_TABLE_CAPTION_RE = re.compile(r"TABLE\s*[12]")
+PDF_SPEC_HEADER_RE = re.compile(r"OFL|ABC|TAC")
+PDF_TONNAGE_RE = re.compile(r"\d,\d{3}")
+PDF_MIN_TONNAGES = 6
 
 SEARCH_TERMS = [
     "harvest specifications",
@@ -116,7 +251,156 @@ def get_with_retries(url, timeout=30, retries=4, backoff=1.5):
     return None
 
 
+def download_to_spool(url, timeout=30, max_bytes=None, spool_bytes=None, reject_marker=None):
+    """Stream a response body into a SpooledTemporaryFile positioned at 0.
+
+    Returns None on HTTP errors, when the body exceeds `max_bytes`, or when
+    `reject_marker` (bytes) appears in it.  Only one copy of the payload is
+    held, in memory or on disk.
+    """
+    max_bytes = DOWNLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    spool_bytes = DOWNLOAD_SPOOL_BYTES if spool_bytes is None else spool_bytes
+    try:
+        resp = requests.get(url, timeout=timeout, stream=True)
+    except Exception:
+        return None
+    with resp:
+        if resp.status_code != 200:
+            return None
+        length = resp.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            return None
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        total = 0
+        tail = b""
+        keep = len(reject_marker) - 1 if reject_marker else 0
+        try:
+            for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                if not chunk:
+                    continue
+                total += len(chunk)
+                if total > max_bytes:
+                    spool.close()
+                    return None
+                if reject_marker:
+                    window = tail + chunk
+                    if reject_marker in window:
+                        spool.close()
+                        return None
+                    tail = window[-keep:] if keep else b""
+                spool.write(chunk)
+        except Exception:
+            spool.close()
+            return None
+    spool.seek(0)
+    return spool
+
+
+def spool_contains(spool, needle, ignore_case=True):
+    """Chunked substring search over a spooled body; restores position 0."""
+    needle = needle.lower() if ignore_case else needle
+    keep = len(needle) - 1
+    tail = b""
+    spool.seek(0)
+    found = False
+    while True:
+        chunk = spool.read(DOWNLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        if ignore_case:
+            chunk = chunk.lower()
+        if needle in tail + chunk:
+            found = True
+            break
+        tail = chunk[-keep:] if keep else b""
+    spool.seek(0)
+    return found
+
+
+def parse_xml_root(src):
+    """Parse XML from a str, bytes, file object or already-parsed element."""
+    if isinstance(src, etree._Element):
+        return src
+    if isinstance(src, str):
+        return etree.fromstring(src.encode("utf-8"))
+    if isinstance(src, (bytes, bytearray)):
+        return etree.fromstring(bytes(src))
+    src.seek(0)
+    return etree.parse(src).getroot()
+
+
+def mapped_file(spool):
+    """Read-only memory map of a spooled download (forces it to disk)."""
+    spool.seek(0, os.SEEK_END)
+    if spool.tell() == 0:
+        return None
+    spool.seek(0)
+    return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _metadata_path(kind, key):
+    return os.path.join(METADATA_CACHE_DIR, kind, f"{key}.json")
+
+
+def _read_metadata(path, max_age_hours=None):
+    try:
+        if max_age_hours is not None and time.time() - os.path.getmtime(path) > max_age_hours * 3600:
+            return None
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_metadata(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def search_docs(year, term, use_cache=True, offline=False):
+    """fetch_docs() through the metadata cache.
+
+    Returns None when the search failed, or when `offline` and the search
+    is not cached.
+    """
+    key = f"{year}_{hashlib.sha1(term.encode('utf-8')).hexdigest()[:12]}"
+    path = _metadata_path("search", key)
+    settled = year < datetime.now(timezone.utc).year - 1
+    if use_cache or offline:
+        docs = _read_metadata(path, max_age_hours=None if (settled or offline) else METADATA_TTL_HOURS)
+        if docs is not None or offline:
+            return docs
+    docs = fetch_docs(year=year, term=term)
+    if docs is None:
+        return None
+    # An empty result is cached too, so offline plans do not re-query it.
+    _write_metadata(path, docs)
+    return docs
+
+
+def fetch_doc_detail(doc_num, use_cache=True, offline=False):
+    """FR API document detail, cached indefinitely; None if unavailable."""
+    path = _metadata_path("documents", doc_num)
+    if use_cache or offline:
+        detail = _read_metadata(path)
+        if detail is not None or offline:
+            return detail
+    try:
+        resp = requests.get(f"https://www.federalregister.gov/api/v1/documents/{doc_num}.json", timeout=30)
+        if resp.status_code != 200:
+            return None
+        detail = resp.json()
+    except Exception:
+        return None
+    _write_metadata(path, detail)
+    return detail
+
+
 def fetch_docs(year=None, term=None):
+    """All FR API search results for `term`; None if any page failed."""
     params = {
         "conditions[term]": term or "harvest specifications",
         "conditions[type]": "RULE",
@@ -135,7 +419,7 @@ def fetch_docs(year=None, term=None):
         resp = get_with_retries(url, timeout=30, retries=4, backoff=1.0)
         if resp is None:
             print(f"Warning: fetch_docs failed for URL: {url}")
-            break
+            return None
         data = resp.json()
         docs.extend(data.get("results", []))
         url = data.get("next_page_url")
@@ -223,19 +507,19 @@ def _norm_key(x):
     return s
 
 
-def normalize_species(name, cutoff=0.85):
-    canon, matched = canonicalize_species(name, cutoff=cutoff)
+def normalize_species(name, cutoff=0.85, canon=None):
+    canon, matched = canonicalize_species(name, cutoff=cutoff, canon=canon)
     return canon if matched else name
 
 
-def canonicalize_species(name, cutoff=0.85):
+def canonicalize_species(name, cutoff=0.85, canon=None):
     if name is None:
         return name, False
     key = _norm_key(name)
     if key == "":
         return name, False
 
-    canon_keys = {_norm_key(c): c for c in SPECIES_CANON}
+    canon_keys = {_norm_key(c): c for c in (canon or SPECIES_CANON)}
     if key in canon_keys:
         return canon_keys[key], True
 
@@ -249,17 +533,27 @@ def canonicalize_species(name, cutoff=0.85):
     return name, False
 
 
-def normalize_area(area, cutoff=0.8):
+def normalize_area(area, cutoff=0.8, canon=None):
     if area is None:
         return area
     key = _norm_key(area)
     if key == "":
         return ""
 
-    canon_keys = {_norm_key(c): c for c in AREA_CANON}
+    canon_keys = {_norm_key(c): c for c in (canon or AREA_CANON)}
     if key in canon_keys:
         return canon_keys[key]
 
+    if canon is BSAI_AREA_CANON:
+        bsai = bsai_area(area, key)
+        if bsai:
+            return bsai
+
+    if canon is not None and canon is not AREA_CANON:
+        # Statistical-area rules below are GOA-specific.
+        matches = difflib.get_close_matches(key, canon_keys.keys(), n=1, cutoff=cutoff)
+        return canon_keys[matches[0]] if matches else clean_text(area)
+
     # try digit-based mapping
     if "610" in key and "620" in key and "630" in key:
         return "610/620/630 (subtotal)"
@@ -293,6 +587,33 @@ def normalize_area(area, cutoff=0.8):
     return ""
 
 
+def bsai_area(area, key):
+    """BSAI subarea code for a spelled-out label, or None.
+
+    "Bering Sea (BS)" and "Eastern Aleutian District" name their subarea in
+    words, which difflib does not match to the short codes.
+    """
+    code = re.search(r"\(([A-Za-z/ ]+)\)", str(area))
+    if code:
+        code = re.sub(r"\s+", "", code.group(1)).upper()
+        if code in BSAI_AREA_CANON:
+            return code
+    if "bogoslof" in key:
+        return "Bogoslof"
+    if "bering" in key and "aleutian" in key:
+        return "BSAI"
+    if "bering" in key:
+        return "EBS" if "eastern" in key else "BS"
+    if "aleutian" in key:
+        if "central" in key and "western" in key:
+            return "CAI/WAI"
+        for d, c in (("eastern", "EAI"), ("central", "CAI"), ("western", "WAI")):
+            if d in key:
+                return c
+        return "AI"
+    return None
+
+
 def is_probably_goa_area(area):
     """Heuristic filter to keep GOA rows in combined BSAI+GOA tables."""
     key = _norm_key(area or "")
@@ -303,16 +624,135 @@ def is_probably_goa_area(area):
         return False
     if "total" in tokens:
         return True
-    # GOA area cues used in FR tables.
-    goa_hints = [
-        "goa", "gulf of alaska", "610", "620", "630", "640", "650",
-        "shumagin", "chirikof", "kodiak", "shelikof", "wyk", "seo",
-        "gw", "w c wyk", "w c wyk combined", "w and c",
+    return area_region(area) == "GOA"
+
+
+def area_region(area):
+    """Region cued by a raw table area label; None when it names neither.
+
+    "Total", blank and unknown labels carry no cue; callers take the region
+    from the table's caption or section instead.
+    """
+    key = _norm_key(area or "")
+    tokens = set(key.split())
+    if tokens & BSAI_AREA_TOKENS or any(h in key for h in BSAI_AREA_HINTS):
+        return "BSAI"
+    if tokens & GOA_AREA_TOKENS or any(h in key for h in GOA_AREA_HINTS):
+        return "GOA"
+    return None
+
+
+def title_region(title):
+    """Region named by a table title, or None when it names neither or both."""
+    t = (title or "").lower()
+    goa = "gulf of alaska" in t or re.search(r"\bgoa\b", t) is not None
+    bsai = "bering sea" in t or "aleutian" in t or re.search(r"\bbsai\b", t) is not None
+    if goa == bsai:
+        return None
+    return "GOA" if goa else "BSAI"
+
+
+def section_region(el, *tags):
+    """Region named by the nearest preceding heading (any of `tags`), or None."""
+    path = " | ".join(f"preceding::{t}" for t in tags)
+    for heading in reversed(el.xpath(path)):
+        region = title_region(" ".join(heading.itertext()))
+        if region:
+            return region
+    return None
+
+
+def keep_region_rows(rows, regions):
+    """Rows in `regions`; GOA rows must also pass is_probably_goa_area()."""
+    return [
+        r for r in rows
+        if r.get("Region", "GOA") in regions
+        and (r.get("Region", "GOA") != "GOA" or is_probably_goa_area(r.get("Area", "")))
     ]
-    return any(h in key for h in goa_hints)
 
 
-def parse_table(df, year1, year2, allow_single_year=False):
+def table_fingerprint(header, cells, year1, year2, regions=("GOA",)):
+    """Content hash of a spec table: normalized header and cells plus the year pair.
+
+    The year pair and regions are part of the key because the same table
+    parsed for a different (year1, year2) or region set yields different
+    rows.
+    """
+    def norm(x):
+        return "" if x is None else re.sub(r"\s+", " ", str(x)).strip().lower()
+    h = hashlib.sha1(f"{year1}|{year2}|{','.join(sorted(regions))}".encode("utf-8"))
+    for line in [header] + list(cells):
+        h.update(b"\x1e" + "\x1f".join(norm(c) for c in line).encode("utf-8"))
+    return h.hexdigest()
+
+
+def frame_fingerprint(df, year1, year2, regions=("GOA",)):
+    return table_fingerprint(list(df.columns), df.astype(str).values.tolist(), year1, year2, regions)
+
+
+class TableFingerprints:
+    """Spec tables already taken from an earlier document in this run.
+
+    Amendments and corrections often republish the final rule's tables
+    unchanged.  Parsers check each table here before building rows: a table
+    whose fingerprint an earlier document supplied is skipped and recorded
+    in `repeats`, and `finish_document` lists the document as "also
+    published in" for it.  Rows from new tables carry their fingerprint in
+    `_fp`.
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self.repeats = set()
+
+    def start_document(self):
+        self.repeats = set()
+
+    def seen(self, fp):
+        if fp in self.sources:
+            self.repeats.add(fp)
+            return True
+        return False
+
+    def finish_document(self, rows, source_url):
+        for fp in {r["_fp"] for r in rows if r.get("_fp")}:
+            self.sources.setdefault(fp, [source_url])
+        for fp in self.repeats:
+            if source_url not in self.sources[fp]:
+                self.sources[fp].append(source_url)
+
+    def also_published_in(self, fp):
+        urls = self.sources.get(fp, [])[1:]
+        return "; ".join(u for u in urls if u) or None
+
+
+def _tag_rows(rows, fp):
+    for r in rows:
+        r["_fp"] = fp
+    return rows
+
+
+def parse_table_once(df, year1, year2, fingerprints=None, allow_single_year=False, regions=("GOA",), region_hint=None):
+    """parse_table() unless an earlier document already supplied this table."""
+    kwargs = dict(allow_single_year=allow_single_year, regions=regions, region_hint=region_hint)
+    if fingerprints is None:
+        return parse_table(df, year1, year2, **kwargs)
+    fp = frame_fingerprint(df, year1, year2, regions)
+    if fingerprints.seen(fp):
+        return []
+    return _tag_rows(parse_table(df, year1, year2, **kwargs), fp)
+
+
+def parse_table(df, year1, year2, allow_single_year=False, regions=("GOA",), region_hint=None, region_context=None):
+    """Rows from one spec table, tagged with their Region.
+
+    Each row's region is `region_hint` (e.g. from the table title) or else
+    inferred from its raw area label.  A label with no region cue ("Total",
+    blank) takes the region of the last cued row above it, starting from
+    `region_context`; rows still without a region are dropped and reported.
+    Rows outside `regions` are dropped and the rest are canonicalized
+    against their region's vocabulary.
+    """
     df = normalize_columns(df)
     col_map = {}
     for col in df.columns:
@@ -360,15 +800,27 @@ def parse_table(df, year1, year2, allow_single_year=False):
         return []
 
     rows = []
+    unplaced = []
     for _, row in df.iterrows():
         species = clean_text(row.get(species_col))
         if pd.isna(species) or str(species).strip() == "":
             continue
-        area = clean_text(row.get(area_col)) if area_col else "GOA"
-        species, matched = canonicalize_species(species)
+        area = clean_text(row.get(area_col)) if area_col else None
+        region_context = area_region(None if pd.isna(area) else area) or region_context
+        region = region_hint or region_context
+        if region is None:
+            if any(canonicalize_species(species, canon=REGION_VOCAB[r][0])[1] for r in regions):
+                unplaced.append(f"{species}/{area or ''}")
+            continue
+        if region not in regions:
+            continue
+        species_canon, area_canon = REGION_VOCAB[region]
+        if area is None:
+            area = REGION_DEFAULT_AREA[region]
+        species, matched = canonicalize_species(species, canon=species_canon)
         if not matched:
             continue
-        area = normalize_area(area)
+        area = normalize_area(area, canon=area_canon)
 
         for yr in (year1, year2):
             if yr not in col_map:
@@ -384,18 +836,28 @@ def parse_table(df, year1, year2, allow_single_year=False):
             rows.append({
                 "ProjYear": yr,
                 "Species": str(species).strip(),
-                "Area": str(area).strip() if not pd.isna(area) else "GOA",
+                "Area": str(area).strip() if not pd.isna(area) else REGION_DEFAULT_AREA[region],
                 "OFL": ofl,
                 "ABC": abc,
                 "TAC": tac,
+                "Region": region,
             })
+    if unplaced:
+        print(f"    dropped {len(unplaced)} row(s) with no region cue: {', '.join(unplaced[:5])}")
     return rows
 
 
-def parse_xml_tables(xml_text, year1, year2, require_goa=True):
+def parse_xml_tables(xml_text, year1, year2, regions=("GOA",), fingerprints=None, region_hint=None):
+    """Rows from GPOTABLE blocks.
+
+    A table's region comes from its title, else `region_hint` (the
+    document's region for single-region rules), else each row's area label,
+    with the nearest section heading (HD) naming a region for rows whose
+    label has no cue.
+    """
     rows = []
     try:
-        root = etree.fromstring(xml_text.encode("utf-8"))
+        root = parse_xml_root(xml_text)
     except Exception:
         return rows
 
@@ -411,6 +873,10 @@ def parse_xml_tables(xml_text, year1, year2, require_goa=True):
 
         year_match = re.findall(r"\b(19\d{2}|20\d{2})\b", title)
         table_year = int(year_match[0]) if year_match else None
+        table_region = title_region(title) or region_hint
+        if table_region is not None and table_region not in regions:
+            continue
+        context = None if table_region else section_region(table, "HD")
 
         # headers
         headers = []
@@ -424,14 +890,25 @@ def parse_xml_tables(xml_text, year1, year2, require_goa=True):
             # Not a harvest spec data table.
             continue
 
+        table_rows = [[" ".join(ent.itertext()).strip() for ent in row.findall(".//ENT")]
+                      for row in table.findall(".//ROW")]
+        fp = None
+        if fingerprints is not None:
+            fp = table_fingerprint(headers, table_rows, year1, year2, regions)
+            if fingerprints.seen(fp):
+                continue
+        n_before = len(rows)
+
+        area_header = next((h for h in headers if "AREA" in h.upper() or "REGION" in h.upper()),
+                           headers[1] if len(headers) > 1 else None)
         prev_species = None
-        for row in table.findall(".//ROW"):
-            ents = [" ".join(ent.itertext()).strip() for ent in row.findall(".//ENT")]
+        for ents in table_rows:
             if not ents or all(e == "" for e in ents):
                 continue
             if len(ents) < 2:
                 continue
             row_dict = dict(zip(headers[: len(ents)], ents))
+            context = area_region(clean_text(row_dict.get(area_header))) or context
 
             # carry forward species if blank or separator
             sp_val = clean_text(row_dict.get(headers[0], ""))
@@ -445,7 +922,8 @@ def parse_xml_tables(xml_text, year1, year2, require_goa=True):
             df = pd.DataFrame([row_dict])
             # First try the generic parser, which can map explicit year
             # columns (e.g., "2003 OFL", "2004 ABC", etc.).
-            parsed_rows = parse_table(df, year1, year2, allow_single_year=True)
+            parsed_rows = parse_table(df, year1, year2, allow_single_year=True, regions=regions, region_hint=table_region,
+                                      region_context=context)
             if parsed_rows:
                 rows.extend(parsed_rows)
                 continue
@@ -453,27 +931,35 @@ def parse_xml_tables(xml_text, year1, year2, require_goa=True):
             # Fallback for single-year rows with plain OFL/ABC/TAC headers.
             if table_year:
                 for _, r in df.iterrows():
-                    sp_canon, matched = canonicalize_species(clean_text(r[headers[0]]))
+                    raw_area = clean_text(r.get(headers[1], None))
+                    region = table_region or context
+                    if region not in regions:
+                        continue
+                    species_canon, area_canon = REGION_VOCAB[region]
+                    sp_canon, matched = canonicalize_species(clean_text(r[headers[0]]), canon=species_canon)
                     if not matched:
                         continue
+                    default_area = REGION_DEFAULT_AREA[region]
                     rows.append({
                         "ProjYear": table_year,
                         "Species": sp_canon,
-                        "Area": normalize_area(clean_text(r.get(headers[1], "GOA")) or "GOA"),
+                        "Area": normalize_area(raw_area or default_area, canon=area_canon),
                         "OFL": r.get("OFL"),
                         "ABC": r.get("ABC"),
                         "TAC": r.get("TAC"),
+                        "Region": region,
                     })
+        if fp is not None:
+            _tag_rows(rows[n_before:], fp)
 
-        if require_goa and rows:
-            rows = [r for r in rows if is_probably_goa_area(r.get("Area", ""))]
+        rows = keep_region_rows(rows, regions)
     return rows
 
 
-def parse_xml_tables_alt(xml_text, year1, year2, require_goa=True):
+def parse_xml_tables_alt(xml_text, year1, year2, regions=("GOA",), fingerprints=None, region_hint=None):
     rows = []
     try:
-        root = etree.fromstring(xml_text.encode("utf-8"))
+        root = parse_xml_root(xml_text)
     except Exception:
         return rows
 
@@ -483,23 +969,159 @@ def parse_xml_tables_alt(xml_text, year1, year2, require_goa=True):
         title_l = title.lower()
         if title and not any(x in title_l for x in ["ofl", "abc", "tac", "harvest specification"]):
             continue
+        table_region = title_region(title) or region_hint or section_region(table, "HD")
+        if table_region is not None and table_region not in regions:
+            continue
 
         try:
             html_str = etree.tostring(table, encoding="unicode", method="html")
-            tables = pd.read_html(html_str)
+            tables = pd.read_html(io.StringIO(html_str))
         except Exception:
             tables = []
 
         for tbl in tables:
-            rows.extend(parse_table(tbl, year1, year2, allow_single_year=True))
+            rows.extend(parse_table_once(tbl, year1, year2, fingerprints, allow_single_year=True,
+                                         regions=regions, region_hint=table_region))
+
+    return keep_region_rows(rows, regions)
+
+
+HTML_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+
+def html_table_title(table):
+    """Caption of an HTML table, else the text of the block just above it."""
+    caption = table.find("caption")
+    if caption is not None:
+        return " ".join(caption.itertext())
+    above = table.xpath("preceding::*[self::p or self::div or self::span or self::h1 or self::h2 or self::h3 "
+                        "or self::h4 or self::h5 or self::h6][normalize-space()][1]")
+    return " ".join(above[0].itertext()) if above else ""
 
-    if require_goa and rows:
-        rows = [r for r in rows if is_probably_goa_area(r.get("Area", ""))]
 
+def parse_html_tables(src, year1, year2, regions=("GOA",), fingerprints=None, region_hint=None):
+    """Rows from the tables of an HTML rule document.
+
+    Like parse_xml_tables_alt: a table's region comes from its caption (or
+    the title line above it), else `region_hint`, else the nearest heading
+    naming a region, else each row's area label.
+    """
+    src.seek(0)
+    try:
+        root = etree.parse(src, etree.HTMLParser()).getroot()
+    except Exception:
+        return []
+    if root is None:
+        return []
+
+    rows = []
+    for table in root.iter("table"):
+        table_region = title_region(html_table_title(table)) or region_hint or section_region(table, *HTML_HEADINGS)
+        if table_region is not None and table_region not in regions:
+            continue
+        try:
+            tables = pd.read_html(io.StringIO(etree.tostring(table, encoding="unicode", method="html")))
+        except Exception:
+            continue
+        for tbl in tables:
+            rows.extend(parse_table_once(tbl, year1, year2, fingerprints, allow_single_year=True,
+                                         regions=regions, region_hint=table_region))
     return rows
 
 
-def parse_pdf_text_tables(pdf, year1, year2=None):
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+def _unescape_pdf_string(raw):
+    def sub(m):
+        esc = m.group(1)
+        if esc[:1].isdigit():
+            return bytes([int(esc, 8) & 0xFF])
+        return _PDF_ESCAPES.get(esc, esc)
+    return re.sub(rb"\\([0-7]{1,3}|.)", sub, raw, flags=re.DOTALL)
+
+
+def page_stream_text(page):
+    """Show-string text straight from a page's content streams.
+
+    No glyph positioning or font decoding is done, so this is orders of
+    magnitude cheaper than pdfplumber's layout analysis.  Strings are joined
+    without separators; embedded-font (CID) text comes out as noise.
+    """
+    try:
+        data = b"".join(pdftypes.resolve1(s).get_data() for s in page.page_obj.contents)
+    except Exception:
+        return ""
+    parts = []
+    for m in re.finditer(rb"\(((?:\\.|[^\\)])*)\)|<([0-9A-Fa-f\s]+)>", data, flags=re.DOTALL):
+        if m.group(1) is not None:
+            parts.append(_unescape_pdf_string(m.group(1)))
+        else:
+            try:
+                parts.append(bytes.fromhex(m.group(2).decode("ascii")))
+            except ValueError:
+                continue
+    return b"".join(parts).decode("latin-1")
+
+
+class PdfPageCache:
+    """Per-document cache of page text and tables.
+
+    The table pass and both text passes of the PDF fallback read pages
+    through this cache, so each page is laid out at most once per kind of
+    extraction.  `pages` lists the candidate page indices (see
+    `candidate_pages`); every page when none look like spec tables.
+    """
+
+    def __init__(self, pdf, prefilter=True):
+        self.pdf = pdf
+        self._text = {}
+        self._tables = {}
+        self.pages = candidate_pages(pdf) if prefilter else []
+        if not self.pages:
+            self.pages = list(range(len(pdf.pages)))
+
+    def layout_text(self, i):
+        key = (i, True)
+        if key not in self._text:
+            self._text[key] = self.pdf.pages[i].extract_text(layout=True) or ""
+        return self._text[key]
+
+    def plain_text(self, i):
+        key = (i, False)
+        if key not in self._text:
+            self._text[key] = self.pdf.pages[i].extract_text() or ""
+        return self._text[key]
+
+    def tables(self, i):
+        if i not in self._tables:
+            self._tables[i] = self.pdf.pages[i].extract_tables() or []
+        return self._tables[i]
+
+
+def candidate_pages(pdf):
+    """Indices of pages that look like harvest-spec tables or their continuations.
+
+    A caption with spec headers starts a table even before any tonnage
+    (the body may begin on the next page); once started, the table runs
+    until a page with fewer than PDF_MIN_TONNAGES tonnages.
+    """
+    out = []
+    in_table = False
+    for i, page in enumerate(pdf.pages):
+        text = page_stream_text(page)
+        u = text.upper()
+        n = len(PDF_TONNAGE_RE.findall(text))
+        if PDF_TABLE_CAPTION_RE.search(u) and PDF_SPEC_HEADER_RE.search(u):
+            in_table = True
+        elif in_table and n < PDF_MIN_TONNAGES:
+            in_table = False
+        if in_table:
+            out.append(i)
+    return out
+
+
+def parse_pdf_text_tables(pdf, year1, year2=None, cache=None):
     area_norm_set = {_norm_key(a) for a in AREA_CANON if a is not None}
 
     def is_area_like(text):
@@ -548,14 +1170,22 @@ def parse_pdf_text_tables(pdf, year1, year2=None):
             return current_species, s
         return None, None
 
+    cache = cache or PdfPageCache(pdf)
+
     # Pass 1: parse modern table-like PDF text where rows look like
     # "Species Area OFL ABC TAC" (often with OCR artifacts).
     rows = []
     in_table = False
     current_species = None
     current_proj_year = year1
-    for page in pdf.pages:
-        text = page.extract_text(layout=True) or page.extract_text() or ""
+    prev = None
+    for i in cache.pages:
+        if prev is not None and i != prev + 1:
+            # Skipped pages hold no table rows; don't carry table state over.
+            in_table = False
+            current_species = None
+        prev = i
+        text = cache.layout_text(i) or cache.plain_text(i)
         lines = [l.strip() for l in text.split("\n") if l.strip()]
         for line in lines:
             u = line.upper()
@@ -629,6 +1259,7 @@ def parse_pdf_text_tables(pdf, year1, year2=None):
                 "ABC": abc,
                 "TAC": tac,
                 "FromPDFText": True,
+                "Region": "GOA",
             })
 
     if rows:
@@ -640,8 +1271,13 @@ def parse_pdf_text_tables(pdf, year1, year2=None):
     current_species = None
 
     current_proj_year = year1
-    for page in pdf.pages:
-        text = page.extract_text(layout=True) or ""
+    prev = None
+    for i in cache.pages:
+        if prev is not None and i != prev + 1:
+            in_table = False
+            current_species = None
+        prev = i
+        text = cache.layout_text(i)
         lines = [l.strip() for l in text.split("\n") if l.strip()]
         for line in lines:
             tm = re.search(r"\bTABLE\s*([12])\b", line.upper())
@@ -700,59 +1336,77 @@ def parse_pdf_text_tables(pdf, year1, year2=None):
                     "ABC": abc,
                     "TAC": tac,
                     "FromPDFText": True,
+                    "Region": "GOA",
                 })
 
     return rows
 
 
-def parse_pdf_tables(pdf_url, year1, year2, require_goa=True):
-    if pdfplumber is None:
+def parse_pdf_tables(pdf_url, year1, year2, regions=("GOA",), fingerprints=None, region_hint=None):
+    """Spec rows from a rule PDF.
+
+    Ruled tables are split by region like the XML/HTML paths: `region_hint`
+    (the document's region for single-region rules), else the table caption
+    on the page, carried over to continuation pages, else each row's area
+    label.  The text fallback only understands GOA layouts and yields GOA
+    rows.
+    """
+    if not pdfplumber.available():
         return []
 
-    try:
-        resp = requests.get(pdf_url, timeout=30)
-        resp.raise_for_status()
-    except Exception:
+    spool = download_to_spool(pdf_url, timeout=30)
+    if spool is None:
         return []
 
     rows = []
     try:
-        with pdfplumber.open(io.BytesIO(resp.content)) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables() or []
+        with spool, mapped_file(spool) as buf, pdfplumber.open(buf) as pdf:
+            cache = PdfPageCache(pdf)
+            page_region = region_hint
+            for i in cache.pages:
+                tables = cache.tables(i)
+                if tables and region_hint is None:
+                    # A caption may wrap; its region words are within three lines.
+                    lines = cache.plain_text(i).splitlines()
+                    captions = [" ".join(lines[k:k + 3]) for k, ln in enumerate(lines) if PDF_TABLE_CAPTION_RE.search(ln.upper())]
+                    if captions:
+                        page_region = title_region(" ".join(captions))
                 for table in tables:
                     if not table or len(table) < 2:
                         continue
                     header = table[0]
                     data = table[1:]
                     df = pd.DataFrame(data, columns=header)
-                    rows.extend(parse_table(df, year1, year2, allow_single_year=True))
+                    rows.extend(parse_table_once(df, year1, year2, fingerprints, allow_single_year=True,
+                                                 regions=regions, region_hint=page_region))
 
-            if not rows:
-                rows = parse_pdf_text_tables(pdf, year1, year2=year2)
+            if not rows and not (fingerprints and fingerprints.repeats) and "GOA" in regions:
+                rows = parse_pdf_text_tables(pdf, year1, year2=year2, cache=cache)
     except Exception:
         return rows
 
     return rows
 
 
-def build_order_map():
+def build_order_map(path=EXISTING_GOA):
     try:
-        df = pd.read_csv(EXISTING_GOA)
+        df = pd.read_csv(path, encoding="utf-8-sig")
         return df.groupby("Species")["Order"].first().to_dict()
     except Exception:
         return {}
 
 
 def fetch_govinfo_xml(pub_date):
+    """Parsed root of the govinfo daily FR issue, or None."""
+    url = f"https://www.govinfo.gov/content/pkg/FR-{pub_date}/xml/FR-{pub_date}.xml"
+    spool = download_to_spool(url, timeout=30)
+    if spool is None:
+        return None
     try:
-        url = f"https://www.govinfo.gov/content/pkg/FR-{pub_date}/xml/FR-{pub_date}.xml"
-        resp = requests.get(url, timeout=30)
-        if resp.status_code == 200:
-            return resp.text
+        with spool:
+            return parse_xml_root(spool)
     except Exception:
         return None
-    return None
 
 
 # Known FR document numbers for combined BSAI+GOA or hard-to-find GOA
@@ -774,97 +1428,437 @@ KNOWN_DOCS_BY_PUB_YEAR = {
 }
 
 
-def main():
-    order_map = build_order_map()
-
-    all_rows = []
-    for year in range(START_YEAR, END_YEAR + 1):
-        year_before = len(all_rows)
-        docs = []
-        seen = set()
-        for term in SEARCH_TERMS:
-            for doc in fetch_docs(year=year, term=term):
-                key = doc.get("document_number") or doc.get("id") or doc.get("html_url")
-                if key in seen:
-                    continue
-                seen.add(key)
-                docs.append(doc)
+def candidate_docs(year, use_cache=True, offline=False):
+    """Search hits plus known hard-to-find documents for a publication year.
 
-        # Inject known hard-to-find documents for this publication year.
-        for doc_num in KNOWN_DOCS_BY_PUB_YEAR.get(year, []):
-            if doc_num in seen:
+    Returns (docs, complete); `complete` is False when some search or known
+    document failed, or is not in the metadata cache when running offline.
+    """
+    docs = []
+    seen = set()
+    complete = True
+    for term in SEARCH_TERMS:
+        hits = search_docs(year, term, use_cache=use_cache, offline=offline)
+        if hits is None:
+            complete = False
+            continue
+        for doc in hits:
+            key = doc.get("document_number") or doc.get("id") or doc.get("html_url")
+            if key in seen:
                 continue
+            seen.add(key)
+            docs.append(doc)
+
+    # Inject known hard-to-find documents for this publication year.
+    for doc_num in KNOWN_DOCS_BY_PUB_YEAR.get(year, []):
+        if doc_num in seen:
+            continue
+        doc = fetch_doc_detail(doc_num, use_cache=use_cache, offline=offline)
+        if doc is None:
+            complete = False
+            continue
+        seen.add(doc_num)
+        docs.append(doc)
+    return docs, complete
+
+
+def doc_year_pair(doc, year):
+    """(y1, y2, doc_regions) for a harvest-spec rule, or None to skip `doc`.
+
+    `doc_regions` is ("GOA",) or ("BSAI",) for single-region rules and
+    both for combined "Groundfish Fisheries Off Alaska" rules.
+    """
+    title = doc.get("title", "")
+    abstract = doc.get("abstract", "") or ""
+    text_blob = f"{title} {abstract}"
+
+    title_l = title.lower()
+    blob_l = text_blob.lower()
+
+    # Accept documents that are either:
+    # (a) GOA-specific harvest specs (post-~2005 pattern), or
+    # (b) combined BSAI+GOA harvest specs (2001-2004 pattern,
+    #     e.g. "Steller Sea Lion Protection Measures ... Final 2001
+    #     Harvest Specifications ... Groundfish Fisheries Off Alaska")
+    is_goa_specific = "gulf of alaska" in title_l
+    is_bsai_specific = "bering sea" in title_l and not is_goa_specific
+    is_combined_alaska = (
+        "groundfish fisheries off alaska" in title_l
+        or "groundfish fisheries off alaska" in blob_l
+    )
+    has_harvest_spec = (
+        "harvest specification" in title_l
+        or "groundfish specification" in title_l
+        or "harvest specification" in blob_l
+    )
+
+    is_known_doc = doc.get("document_number") in set(KNOWN_DOCS_BY_PUB_YEAR.get(year, []))
+
+    if not (is_goa_specific or is_bsai_specific or is_combined_alaska or is_known_doc):
+        return None
+    if not has_harvest_spec and not is_known_doc:
+        return None
+    if "interim" in title_l:
+        return None
+
+    pub = doc.get("publication_date")
+    pub_year = None
+    if pub:
+        try:
+            pub_year = int(pub.split("-")[0])
+        except Exception:
+            pub_year = None
+
+    y1, y2 = extract_years(title, abstract, pub_year=pub_year)
+    if not y1 or not y2:
+        if pub:
             try:
-                resp = requests.get(
-                    f"https://www.federalregister.gov/api/v1/documents/{doc_num}.json",
-                    timeout=30,
-                )
-                if resp.status_code == 200:
-                    doc = resp.json()
-                    seen.add(doc_num)
-                    docs.append(doc)
+                y1 = int(pub.split("-")[0])
+                y2 = y1 + 1
             except Exception:
-                pass
-
+                y1, y2 = None, None
+    if not y1 or not y2:
+        return None
+    if is_goa_specific:
+        return y1, y2, ("GOA",)
+    if is_bsai_specific:
+        return y1, y2, ("BSAI",)
+    return y1, y2, REGIONS
+
+
+def doc_sources(doc, detail=None):
+    """Source URLs in the order the crawl tries them: [(SourceType, url), ...]."""
+    detail = detail or {}
+    html_url = detail.get("html_url") or doc.get("html_url")
+    xml_url = detail.get("full_text_xml_url") or doc.get("full_text_xml_url")
+    pdf_url = detail.get("pdf_url") or doc.get("pdf_url")
+    pub = doc.get("publication_date")
+    doc_num = doc.get("document_number")
+    out = []
+    if xml_url:
+        out.append(("XML", xml_url))
+    if html_url:
+        out.append(("HTML", html_url))
+    if pub:
+        out.append(("GOVINFO_XML", f"https://www.govinfo.gov/content/pkg/FR-{pub}/xml/FR-{pub}.xml"))
+        if not pdf_url and doc_num:
+            pdf_url = f"https://www.govinfo.gov/content/pkg/FR-{pub}/pdf/{doc_num}.pdf"
+    if pdf_url:
+        out.append(("PDF", pdf_url))
+    return out
+
+
+def existing_row_counts(path):
+    """Rows per (AssmentYr, SourceURL) in a previous scrape output, via csv."""
+    import csv
+    counts = {}
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            for row in csv.DictReader(fh):
+                try:
+                    key = (int(float(row.get("AssmentYr") or "")), row.get("SourceURL") or "")
+                except ValueError:
+                    continue
+                counts[key] = counts.get(key, 0) + 1
+    except OSError:
+        return None
+    return counts
+
+
+def plan(start_year, end_year, use_cache=True, offline=False, regions=REGIONS):
+    """Report what a crawl would fetch, from FR metadata alone.
+
+    For each publication year: the accepted candidate documents, their
+    extract_years() pair and regions, the source order the crawl would try,
+    and the rows the previous outputs hold for that document.  Ends with
+    the rule years no candidate covers.
+    """
+    counts = {region: existing_row_counts(REGION_OUT_PATHS[region]) for region in regions}
+    covered = set()
+    for year in range(start_year, end_year + 1):
+        docs, complete = candidate_docs(year, use_cache=use_cache, offline=offline)
+        planned = []
         for doc in docs:
-            title = doc.get("title", "")
-            abstract = doc.get("abstract", "") or ""
-            text_blob = f"{title} {abstract}"
-
-            title_l = title.lower()
-            blob_l = text_blob.lower()
-
-            # Accept documents that are either:
-            # (a) GOA-specific harvest specs (post-~2005 pattern), or
-            # (b) combined BSAI+GOA harvest specs (2001-2004 pattern,
-            #     e.g. "Steller Sea Lion Protection Measures ... Final 2001
-            #     Harvest Specifications ... Groundfish Fisheries Off Alaska")
-            is_goa_specific = "gulf of alaska" in title_l
-            is_combined_alaska = (
-                "groundfish fisheries off alaska" in title_l
-                or "groundfish fisheries off alaska" in blob_l
-            )
-            has_harvest_spec = (
-                "harvest specification" in title_l
-                or "groundfish specification" in title_l
-                or "harvest specification" in blob_l
-            )
-
-            is_known_doc = doc.get("document_number") in set(KNOWN_DOCS_BY_PUB_YEAR.get(year, []))
-
-            if not (is_goa_specific or is_combined_alaska or is_known_doc):
+            pair = doc_year_pair(doc, year)
+            if pair is None:
                 continue
-            if not has_harvest_spec and not is_known_doc:
-                continue
-            if "interim" in title_l:
+            y1, y2, doc_regions = pair
+            doc_regions = [r for r in doc_regions if r in regions]
+            if not doc_regions:
                 continue
+            covered.add(y1)
+            doc_num = doc.get("document_number")
+            detail = fetch_doc_detail(doc_num, offline=True) if doc_num else None
+            sources = doc_sources(doc, detail)
+            html_url = (detail or {}).get("html_url") or doc.get("html_url")
+            urls = {html_url, *dict(sources).values()}
+            prev = []
+            for region in doc_regions:
+                if counts[region] is None:
+                    prev.append(f"{region}:-")
+                    continue
+                ay = y1 - ASSESSMENT_OFFSET[region]
+                prev.append(f"{region}:{sum(n for (a, url), n in counts[region].items() if a == ay and url in urls)}")
+            planned.append((doc_num or "?", doc.get("publication_date") or "?", y1, y2, sources, " ".join(prev)))
+
+        status = "" if complete else " (searches failed or not cached; incomplete)"
+        print(f"[{year}] candidates={len(docs)} planned={len(planned)}{status}")
+        for doc_num, pub, y1, y2, sources, prev in planned:
+            order = " > ".join(t for t, _ in sources) or "none"
+            print(f"  {doc_num} {pub} years={y1}/{y2} sources={order} prev_rows={prev}")
+
+    missing = sorted(set(range(start_year, end_year + 1)) - covered)
+    if missing:
+        print("Rule years without a candidate document:")
+        print("  " + ", ".join(str(y) for y in missing))
+    return missing
+
+
+# Natural key of the scrape output; the changeset joins runs on it.
+NATURAL_KEY = ["AssmentYr", "ProjYear", "lag", "Species", "Area"]
+CHANGE_VALUE_COLS = ["OFL", "ABC", "TAC", "SourceURL"]
+
+
+def _as_text(df):
+    """Cells as the strings the CSV holds, so old and new compare exactly."""
+    return df.astype(object).where(df.notna(), "").astype(str)
+
+
+def _index_rows(df, key):
+    out = {}
+    for rec in df.to_dict("records"):
+        out.setdefault(tuple(rec[k] for k in key), []).append(rec)
+    return out
+
+
+def changeset(old_df, new_df, key=NATURAL_KEY):
+    """Inserted, deleted and updated rows between two scrape outputs.
+
+    Rows are hash-joined on `key`.  A row is updated when any shared
+    non-key column differs; `Changed` lists those columns.  When a key
+    repeats (overlapping documents can disagree), identical rows pair off
+    first, the rest pair in file order as updates and any surplus is an
+    insert or delete.  Each change carries the key, old/new OFL, ABC, TAC
+    and SourceURL.
+    """
+    old = _index_rows(_as_text(old_df), key)
+    new = _index_rows(_as_text(new_df), key)
+    compare = [c for c in new_df.columns if c in old_df.columns and c not in key]
+
+    def record(change, k, o, n, changed=()):
+        rec = {"Change": change}
+        rec.update(zip(key, k))
+        for c in CHANGE_VALUE_COLS:
+            rec[f"{c}_old"] = o.get(c, "") if o else ""
+            rec[f"{c}_new"] = n.get(c, "") if n else ""
+        rec["Changed"] = ";".join(changed)
+        return rec
+
+    def sig(rec):
+        return tuple(rec[c] for c in compare)
+
+    out = []
+    for k, new_rows in new.items():
+        old_rows = list(old.get(k, []))
+        unmatched = []
+        for n in new_rows:
+            same = next((i for i, o in enumerate(old_rows) if sig(o) == sig(n)), None)
+            if same is None:
+                unmatched.append(n)
+            else:
+                old_rows.pop(same)
+        for o, n in zip(old_rows, unmatched):
+            out.append(record("update", k, o, n, [c for c in compare if o[c] != n[c]]))
+        out.extend(record("insert", k, None, n) for n in unmatched[len(old_rows):])
+        out.extend(record("delete", k, o, None) for o in old_rows[len(unmatched):])
+    for k, old_rows in old.items():
+        if k not in new:
+            out.extend(record("delete", k, o, None) for o in old_rows)
+    return out
+
+
+def change_counts(changes):
+    return {c: sum(1 for r in changes if r["Change"] == c) for c in ("insert", "delete", "update")}
+
+
+def write_changeset(changes, out_path, key=NATURAL_KEY):
+    """Write `<out>.changes.csv` and `<out>.changes.json` next to the output."""
+    stem = os.path.splitext(out_path)[0]
+    csv_path, json_path = f"{stem}.changes.csv", f"{stem}.changes.json"
+    cols = ["Change"] + key + [f"{c}_{s}" for c in CHANGE_VALUE_COLS for s in ("old", "new")] + ["Changed"]
+    write_csv_atomic(pd.DataFrame(changes, columns=cols), csv_path)
+    write_json_atomic({
+        "output": out_path,
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "key": key,
+        "counts": change_counts(changes),
+        "changes": changes,
+    }, json_path)
+    return csv_path, json_path
+
+
+class CrawlJournal:
+    """Durable JSON-lines checkpoint of a crawl.
+
+    A `start` record holds the run's regions.  Each document appends a `doc`
+    record with its parse status, and each finished year a `year` record
+    with that year's rows and the table fingerprints seen so far.  Every
+    record is flushed and fsynced before the crawl moves on, so a crash
+    loses at most the year in progress.  A partial last line from a killed
+    process is ignored on load.  A `year` record also holds a digest of the
+    year's candidate documents; a resumed run re-crawls any year whose
+    search results changed after it was journaled.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+
+    @staticmethod
+    def _json_value(value):
+        # numpy scalars from parsed frames keep their type; pd.NA becomes null.
+        if hasattr(value, "item"):
+            return value.item()
+        if value is pd.NA:
+            return None
+        return str(value)
+
+    def _append(self, record):
+        with open(self.path, "a") as fh:
+            fh.write(json.dumps(record, default=self._json_value) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def records(self):
+        out = []
+        try:
+            with open(self.path) as fh:
+                for line in fh:
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        break
+        except OSError:
+            pass
+        return out
+
+    def _rewrite(self, records):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            for record in records:
+                fh.write(json.dumps(record, default=self._json_value) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+
+    def start(self, regions):
+        self._rewrite([{"type": "start", "regions": list(regions),
+                        "started": datetime.now(timezone.utc).isoformat(timespec="seconds")}])
+
+    def resume(self, regions):
+        """Completed years as {year: (rows, fingerprint sources, docs digest)}.
+
+        Starts a fresh journal when there is none or it was written for
+        other regions.
+        """
+        records = self.records()
+        if not records or records[0].get("type") != "start" or records[0].get("regions") != list(regions):
+            if records:
+                print(f"Journal {self.path} is for regions {records[0].get('regions')}; starting over.")
+            self.start(regions)
+            return {}
+        # Drop a torn last line before appending after it.
+        self._rewrite(records)
+        return {r["year"]: (r["rows"], r["fingerprints"], r.get("docs")) for r in records if r.get("type") == "year"}
+
+    def document(self, year, doc_num, status, source_type=None, rows=0):
+        self._append({"type": "doc", "year": year, "document_number": doc_num, "status": status,
+                      "source_type": source_type, "rows": rows})
+
+    def finish_year(self, year, rows, fingerprints, docs=None):
+        self._append({"type": "year", "year": year, "rows": rows, "fingerprints": fingerprints.sources,
+                      "docs": docs})
+
+
+def _write_atomic(path, write):
+    """Call `write(fh)` on a temp file in the same directory, fsync, rename.
+
+    The bytes are on disk before the rename, so a crash leaves either the
+    old file or the complete new one.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as fh:
+            write(fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
 
-            pub = doc.get("publication_date")
-            pub_year = None
-            if pub:
-                try:
-                    pub_year = int(pub.split("-")[0])
-                except Exception:
-                    pub_year = None
 
-            y1, y2 = extract_years(title, abstract, pub_year=pub_year)
-            if not y1 or not y2:
-                if pub:
-                    try:
-                        y1 = int(pub.split("-")[0])
-                        y2 = y1 + 1
-                    except Exception:
-                        y1, y2 = None, None
-            if not y1 or not y2:
+def write_csv_atomic(df, path):
+    _write_atomic(path, lambda fh: df.to_csv(fh, index=False))
+
+
+def write_json_atomic(obj, path):
+    _write_atomic(path, lambda fh: json.dump(obj, fh, indent=1))
+
+
+def docs_digest(docs):
+    """Short digest of a year's candidate documents (number and date)."""
+    keys = sorted(f"{d.get('document_number') or d.get('html_url')}|{d.get('publication_date')}" for d in docs)
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+def crawl(start_year=START_YEAR, end_year=END_YEAR, use_cache=True, regions=REGIONS, resume=False, journal_path=JOURNAL_PATH):
+    order_maps = {region: build_order_map(REGION_ORDER_SOURCES[region]) for region in regions}
+    fingerprints = TableFingerprints()
+    journal = CrawlJournal(journal_path)
+    if resume:
+        completed = journal.resume(regions)
+    else:
+        journal.start(regions)
+        completed = {}
+
+    all_rows = []
+    for year in range(start_year, end_year + 1):
+        docs, complete = candidate_docs(year, use_cache=use_cache)
+        # No digest when a search failed: the document list is unknown.
+        digest = docs_digest(docs) if complete else None
+        if year in completed:
+            rows, sources, journaled = completed[year]
+            # A failed search or an older journal without digests cannot
+            # show the year is stale, so the journaled rows stand.
+            if digest is None or journaled is None or journaled == digest:
+                all_rows.extend(rows)
+                fingerprints.sources = {fp: list(urls) for fp, urls in sources.items()}
+                unchecked = "" if digest and journaled else " (documents not re-checked)"
+                print(f"[{year}] resumed from journal rows={len(rows)}{unchecked}")
+                continue
+            # Later years were deduplicated against this year's old tables.
+            print(f"[{year}] candidate documents changed since the journal; re-crawling from here")
+            completed = {}
+        year_before = len(all_rows)
+        year_repeats = 0
+
+        for doc in docs:
+            pair = doc_year_pair(doc, year)
+            if pair is None:
+                continue
+            y1, y2, doc_regions = pair
+            is_combined = len(doc_regions) > 1
+            # Single-region rules label every table with their region, so
+            # "Total" and unlabeled areas are not left to area_region().
+            doc_hint = None if is_combined else doc_regions[0]
+            # One fetch and parse per document covers every wanted region.
+            doc_regions = tuple(r for r in doc_regions if r in regions)
+            if not doc_regions:
                 continue
 
             doc_num = doc.get("document_number")
-            detail = None
-            if doc_num:
-                try:
-                    detail = requests.get(f"https://www.federalregister.gov/api/v1/documents/{doc_num}.json", timeout=30).json()
-                except Exception:
-                    detail = None
+            detail = fetch_doc_detail(doc_num, use_cache=use_cache) if doc_num else None
 
             html_url = (detail or {}).get("html_url") or doc.get("html_url")
             xml_url = (detail or {}).get("full_text_xml_url") or doc.get("full_text_xml_url")
@@ -874,18 +1868,25 @@ def main():
             rows = []
             source_url = None
             source_type = None
+            # A document whose tables all repeat an earlier document's counts
+            # as parsed: it contributes provenance, not rows.
+            fingerprints.start_document()
             if xml_url:
                 try:
-                    xml_text = requests.get(xml_url, timeout=30).text
-                    if "Request Access" not in xml_text:
-                        rows = parse_xml_tables(xml_text, y1, y2)
-                        if rows:
+                    spool = download_to_spool(xml_url, timeout=30, reject_marker=ACCESS_WALL_MARKER)
+                    if spool is not None:
+                        with spool:
+                            xml_root = parse_xml_root(spool)
+                        rows = parse_xml_tables(xml_root, y1, y2, regions=doc_regions, fingerprints=fingerprints,
+                                                region_hint=doc_hint)
+                        if rows or fingerprints.repeats:
                             parsed = True
                             source_url = html_url or xml_url
                             source_type = "XML"
                         else:
-                            rows = parse_xml_tables_alt(xml_text, y1, y2, require_goa=True)
-                            if rows:
+                            rows = parse_xml_tables_alt(xml_root, y1, y2, regions=doc_regions, fingerprints=fingerprints,
+                                                        region_hint=doc_hint)
+                            if rows or fingerprints.repeats:
                                 parsed = True
                                 source_url = html_url or xml_url
                                 source_type = "XML_ALT"
@@ -894,27 +1895,18 @@ def main():
 
             if not parsed and html_url:
                 try:
-                    html_text = requests.get(html_url, timeout=30).text
-                    if "Request Access" not in html_text:
-                        # For combined BSAI+GOA documents, only keep tables
-                        # that appear in GOA sections.  We check the HTML for
-                        # "Gulf of Alaska" near each table as a heuristic.
-                        html_lower = html_text.lower()
-                        is_combined = is_combined_alaska and not is_goa_specific
-                        if is_combined and "gulf of alaska" not in html_lower:
-                            # Document body doesn't mention GOA at all — skip.
-                            pass
-                        else:
-                            tables = pd.read_html(html_text)
-                            for tbl in tables:
-                                rows.extend(parse_table(tbl, y1, y2, allow_single_year=True))
-                        if rows and is_combined:
-                            # Filter to rows whose Area looks like a GOA area
-                            # (not BSAI codes like BS, AI, EBS, BSAI).
-                            bsai_areas = {"BS", "AI", "EBS", "BSAI", "EAI", "CAI", "WAI"}
-                            rows = [r for r in rows
-                                    if r.get("Area", "").upper() not in bsai_areas]
-                        if rows:
+                    spool = download_to_spool(html_url, timeout=30, reject_marker=ACCESS_WALL_MARKER)
+                    if spool is not None:
+                        # Rows of combined BSAI+GOA documents are split by
+                        # table caption, section heading or area label.
+                        with spool:
+                            if is_combined and doc_regions == ("GOA",) and not spool_contains(spool, b"gulf of alaska"):
+                                # Document body doesn't mention GOA at all — skip.
+                                pass
+                            else:
+                                rows = parse_html_tables(spool, y1, y2, regions=doc_regions, fingerprints=fingerprints,
+                                                         region_hint=doc_hint)
+                        if rows or fingerprints.repeats:
                             parsed = True
                             source_url = html_url
                             source_type = "HTML"
@@ -925,15 +1917,15 @@ def main():
                 pub = doc.get("publication_date")
                 if pub:
                     gov_xml = fetch_govinfo_xml(pub)
-                    if gov_xml:
-                        rows = parse_xml_tables(gov_xml, y1, y2, require_goa=True)
-                        if rows:
+                    if gov_xml is not None:
+                        rows = parse_xml_tables(gov_xml, y1, y2, regions=doc_regions, fingerprints=fingerprints)
+                        if rows or fingerprints.repeats:
                             parsed = True
                             source_url = html_url or f"https://www.govinfo.gov/content/pkg/FR-{pub}/html/FR-{pub}.htm"
                             source_type = "XML"
                         else:
-                            rows = parse_xml_tables_alt(gov_xml, y1, y2, require_goa=True)
-                            if rows:
+                            rows = parse_xml_tables_alt(gov_xml, y1, y2, regions=doc_regions, fingerprints=fingerprints)
+                            if rows or fingerprints.repeats:
                                 parsed = True
                                 source_url = html_url or f"https://www.govinfo.gov/content/pkg/FR-{pub}/html/FR-{pub}.htm"
                                 source_type = "XML_ALT"
@@ -944,48 +1936,225 @@ def main():
                 if not pdf_url and pub and doc_num:
                     pdf_url = f"https://www.govinfo.gov/content/pkg/FR-{pub}/pdf/{doc_num}.pdf"
                 if pdf_url:
-                    rows = parse_pdf_tables(pdf_url, y1, y2, require_goa=True)
-                    if rows:
+                    rows = parse_pdf_tables(pdf_url, y1, y2, regions=doc_regions, fingerprints=fingerprints,
+                                            region_hint=doc_hint)
+                    if rows or fingerprints.repeats:
                         parsed = True
                         source_url = html_url or pdf_url
                         source_type = "PDF"
 
             if rows:
                 for r in rows:
-                    r["AssmentYr"] = y1
+                    region = r.setdefault("Region", "GOA")
+                    r["AssmentYr"] = y1 - ASSESSMENT_OFFSET[region]
                     r["lag"] = 1 if r["ProjYear"] == y1 else 2
                     r["OY"] = 1
-                    r["Order"] = order_map.get(r["Species"], None)
+                    r["Order"] = order_maps[region].get(r["Species"], None)
                     r["IsTotal"] = f"{r['Species']}{re.sub(r'[^A-Za-z0-9]+', '', str(r['Area']))}"
                     r["SourceURL"] = html_url or source_url
                     r["SourceType"] = source_type
+                    r["PublicationDate"] = doc.get("publication_date")
                     r["FromPDFText"] = bool(r.get("FromPDFText", False))
                     all_rows.append(r)
+            if parsed:
+                fingerprints.finish_document(rows, html_url or source_url)
+                year_repeats += len(fingerprints.repeats)
+            journal.document(year, doc_num, "parsed" if parsed else "unparsed", source_type, len(rows))
             time.sleep(0.2)
+        if complete:
+            journal.finish_year(year, all_rows[year_before:], fingerprints, digest)
+        else:
+            # Not checkpointed, so --resume searches this year again.
+            print(f"[{year}] some searches failed; year not checkpointed")
         year_added = len(all_rows) - year_before
-        print(f"[{year}] docs={len(docs)} rows_added={year_added}")
+        print(f"[{year}] docs={len(docs)} rows_added={year_added} repeated_tables={year_repeats}")
 
     if not all_rows:
         print("No rows parsed.")
         sys.exit(1)
 
-    out_df = pd.DataFrame(all_rows)
-    out_df = out_df[out_df["Species"].isin(SPECIES_CANON_SET)]
-    cols = ["AssmentYr", "ProjYear", "lag", "Species", "Area", "OFL", "ABC", "TAC", "Order", "OY", "IsTotal", "SourceURL", "SourceType", "FromPDFText"]
-    out_df = out_df[cols]
-
-    # Remove exact duplicate data rows generated from overlapping document
-    # sources/corrections.
-    dedup_key = ["AssmentYr", "ProjYear", "lag", "Species", "Area", "OFL", "ABC", "TAC"]
-    out_df = out_df.drop_duplicates(subset=dedup_key, keep="first").copy()
+    for region in regions:
+        region_rows = [r for r in all_rows if r["Region"] == region]
+        if not region_rows:
+            print(f"[{region}] No rows parsed.")
+            continue
+        offset = ASSESSMENT_OFFSET[region]
+        out_df, rejected = finalize_rows(pd.DataFrame(region_rows), region, fingerprints)
+        write_output(out_df, REGION_OUT_PATHS[region], range(start_year - offset, end_year - offset + 1), rejected)
+
+
+# Record linkage of rows that describe the same specification.  Candidates
+# are blocked on LINK_BLOCK; within a block, area labels that normalize to
+# the same key (or nearly so) are one cluster, and each cluster keeps its
+# best row by source quality.  Lower rank wins.  Derived totals are added
+# after linkage and never compete here.
+LINK_BLOCK = ["AssmentYr", "ProjYear", "lag", "Species"]
+SOURCE_PRIORITY = {"XML": 0, "XML_ALT": 1, "HTML": 2, "PDF": 3}
+LINK_AREA_CUTOFF = 0.9
+LINK_VALUE_RTOL = 0.005
+LINK_LOG_VALUES = ["Area", "OFL", "ABC", "TAC", "SourceType", "SourceURL", "PublicationDate"]
+LINK_LOG_COLS = LINK_BLOCK + LINK_LOG_VALUES + ["Match"] + [f"Kept_{c}" for c in LINK_LOG_VALUES]
+
+
+def to_num(series):
+    s = series.astype(str).str.replace(",", "", regex=False).str.strip()
+    s = s.replace({"": pd.NA, "na": pd.NA, "n/a": pd.NA, "N/A": pd.NA, "None": pd.NA, "nan": pd.NA})
+    return pd.to_numeric(s, errors="coerce")
+
+
+def area_link_key(area):
+    """Area label reduced for linkage: "SEO (650)" and "SEO" share a key."""
+    a = str(area or "").lower()
+    a = re.sub(r"\(\s*\d{3}\s*\)", " ", a)
+    a = re.sub(r"\b(subtotal|combined)\b", " ", a)
+    return re.sub(r"[^a-z0-9]+", "", a)
+
+
+def area_link_codes(areas, cutoff=LINK_AREA_CUTOFF):
+    """Integer code per row; rows with linkable area labels share a code.
+
+    Keys are compared once per distinct label pair (a handful of labels),
+    merged when equal or when their difflib ratio reaches `cutoff`, and
+    gathered back to rows with one take.
+    """
+    labels, uniques = pd.factorize(areas.fillna("").astype(str), use_na_sentinel=False)
+    keys, key_of = np.unique([area_link_key(a) for a in uniques], return_inverse=True)
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            if keys[i] and keys[j] and difflib.SequenceMatcher(None, keys[i], keys[j]).ratio() >= cutoff:
+                parent[find(j)] = find(i)
+    roots = np.array([find(i) for i in range(len(keys))], dtype=int)
+    return roots[np.asarray(key_of).ravel()][labels]
+
+
+def _digit_slips(a, b, width=12):
+    """Digits that differ between equal-length non-negative integers.
+
+    A differing leading digit is a change of magnitude, not an OCR slip, and
+    counts as `width` (never a slip).
+    """
+    ai = np.where(np.isfinite(a), a, 0).astype(np.int64)
+    bi = np.where(np.isfinite(b), b, 0).astype(np.int64)
+    powers = 10 ** np.arange(width, dtype=np.int64)
+    da = (ai[:, None] // powers) % 10
+    db = (bi[:, None] // powers) % 10
+    digits = (ai[:, None] >= powers).sum(axis=1)
+    same_len = digits == (bi[:, None] >= powers).sum(axis=1)
+    differ = da != db
+    lead = np.arange(width) == (digits - 1)[:, None]
+    return np.where(same_len & ~(differ & lead).any(axis=1), differ.sum(axis=1), width)
+
+
+def _values_agree(a, b, rtol=LINK_VALUE_RTOL):
+    """Elementwise: both present and equal, within `rtol` or a one-digit OCR slip.
+
+    A missing value agrees with nothing; callers treat it as neutral.
+    """
+    with np.errstate(invalid="ignore"):
+        close = np.abs(a - b) <= rtol * np.fmax(np.abs(a), np.abs(b))
+        integral = (a == np.round(a)) & (b == np.round(b)) & (a >= 0) & (b >= 0)
+    slip = integral & (_digit_slips(a, b) <= 1)
+    return np.isfinite(a) & np.isfinite(b) & (close | slip)
+
+
+def _compare_values(a, b):
+    """Per row pair: (values agreeing, any conflict) over OFL/ABC/TAC.
+
+    Only values present in both rows are compared, so a missing value
+    neither supports nor contradicts a match.
+    """
+    shared = np.zeros(len(a), dtype=int)
+    conflict = np.zeros(len(a), dtype=bool)
+    for k in range(a.shape[1]):
+        ok = _values_agree(a[:, k], b[:, k])
+        shared += ok
+        conflict |= np.isfinite(a[:, k]) & np.isfinite(b[:, k]) & ~ok
+    return shared, conflict
+
+
+def link_records(df):
+    """One row per linked (block, area) cluster; returns (kept, rejected log).
+
+    A row with no OFL/ABC/TAC only wins a cluster of empty rows.  Otherwise
+    each cluster keeps the row from the best source (SOURCE_PRIORITY), then
+    the one with the most values filled, then the one most other members
+    agree with, then the latest PublicationDate (a correction supersedes
+    the notice it corrects), then the first parsed.  Two rows agree when
+    they share at least one matching value and no conflicting one.  Every
+    other row goes to the log with the kept row's values and a Match of
+    "exact", "near" (tolerance, OCR digit slip or a value missing on one
+    side) or "conflict".
+    """
+    if df.empty:
+        return df, pd.DataFrame(columns=LINK_LOG_COLS)
+    df = df.reset_index(drop=True)
+    cluster = df[LINK_BLOCK].assign(_area=area_link_codes(df["Area"])) \
+        .groupby(LINK_BLOCK + ["_area"], sort=False, dropna=False).ngroup().to_numpy()
+    vals = np.column_stack([to_num(df[c]).to_numpy(dtype=float) for c in ("OFL", "ABC", "TAC")])
+
+    # Pairs only within clusters, so the cost follows cluster sizes.
+    pos = pd.DataFrame({"c": cluster, "i": np.arange(len(df))})
+    pairs = pos.merge(pos, on="c", suffixes=("", "_j"))
+    pairs = pairs[pairs["i"] != pairs["i_j"]]
+    i, j = pairs["i"].to_numpy(), pairs["i_j"].to_numpy()
+    shared, conflict = _compare_values(vals[i], vals[j])
+    support = np.bincount(i[(shared > 0) & ~conflict], minlength=len(df))
+
+    priority = df["SourceType"].map(SOURCE_PRIORITY).fillna(len(SOURCE_PRIORITY)).to_numpy()
+    filled = np.isfinite(vals).sum(axis=1)
+    dates = pd.to_datetime(df["PublicationDate"], errors="coerce") if "PublicationDate" in df else pd.Series(pd.NaT, index=df.index)
+    # Days since the epoch, undated rows last.
+    age = -((dates - pd.Timestamp(0)).dt.days.to_numpy(dtype=float))
+    age = np.where(np.isfinite(age), age, np.inf)
+    order = np.lexsort((np.arange(len(df)), age, -support, -filled, priority, filled == 0, cluster))
+    first = np.r_[True, cluster[order][1:] != cluster[order][:-1]]
+    winner = np.empty(cluster.max() + 1, dtype=int)
+    winner[cluster[order][first]] = order[first]
+    winner = winner[cluster]
+    kept = np.zeros(len(df), dtype=bool)
+    kept[order[first]] = True
+
+    lost = np.flatnonzero(~kept)
+    w = winner[lost]
+    same = (vals[lost] == vals[w]) | (np.isnan(vals[lost]) & np.isnan(vals[w]))
+    exact = same.all(axis=1) & (df["Area"].fillna("").to_numpy()[lost] == df["Area"].fillna("").to_numpy()[w])
+    _, near_conflict = _compare_values(vals[lost], vals[w])
+    src = df.reindex(columns=LINK_BLOCK + LINK_LOG_VALUES)
+    log = src.loc[lost].reset_index(drop=True)
+    log["Match"] = np.where(exact, "exact", np.where(near_conflict, "conflict", "near"))
+    for c in LINK_LOG_VALUES:
+        log[f"Kept_{c}"] = src[c].to_numpy()[w]
+    return df[kept].copy(), log[LINK_LOG_COLS]
+
+
+def finalize_rows(out_df, region, fingerprints):
+    """Link duplicates, derive totals and clamp one region's parsed rows.
+
+    Returns (output rows, linkage log of the rows merged away).
+    """
+    out_df = out_df[out_df["Species"].isin(set(REGION_VOCAB[region][0]))]
+    # Documents that republished a row's table unchanged.
+    fp_col = out_df["_fp"] if "_fp" in out_df.columns else pd.Series(None, index=out_df.index, dtype=object)
+    out_df["AlsoPublishedIn"] = fp_col.map(lambda fp: fingerprints.also_published_in(fp) if isinstance(fp, str) else None)
+    cols = ["AssmentYr", "ProjYear", "lag", "Species", "Area", "OFL", "ABC", "TAC", "Order", "OY", "IsTotal", "SourceURL", "SourceType", "PublicationDate", "FromPDFText", "AlsoPublishedIn", "Region"]
+    out_df = out_df.reindex(columns=cols)
+
+    # Merge rows from overlapping document sources/corrections, including
+    # near-duplicates (OCR digit slips, "SEO" vs "SEO (650)"), keeping the
+    # best source's row for each key.
+    dedup_key = ["Region", "AssmentYr", "ProjYear", "lag", "Species", "Area", "OFL", "ABC", "TAC"]
+    out_df, rejected = link_records(out_df)
 
     # Normalize numeric harvest fields and enforce biological ordering:
     # OFL >= ABC >= TAC when those values are available.
-    def to_num(series):
-        s = series.astype(str).str.replace(",", "", regex=False).str.strip()
-        s = s.replace({"": pd.NA, "na": pd.NA, "n/a": pd.NA, "N/A": pd.NA, "None": pd.NA, "nan": pd.NA})
-        return pd.to_numeric(s, errors="coerce")
-
     ofl_n = to_num(out_df["OFL"])
     abc_n = to_num(out_df["ABC"])
     tac_n = to_num(out_df["TAC"])
@@ -995,7 +2164,8 @@ def main():
     out_df["_TAC_num"] = tac_n
 
     # Backfill missing Area == "Total" rows by species-year-lag from
-    # area-level components when totals are absent.
+    # area-level components when totals are absent.  GOA only: BSAI subarea
+    # splits overlap (AI vs CAI/WAI, EAI/BS), so their sums are not totals.
     leaf_areas = {
         "W", "C", "E", "WYK", "SEO",
         "Shumagin (610)", "Chirikof (620)", "Kodiak (630)",
@@ -1003,7 +2173,8 @@ def main():
     }
     derived_rows = []
     grp_cols = ["AssmentYr", "ProjYear", "lag", "Species", "OY"]
-    for keys, g in out_df.groupby(grp_cols, dropna=False):
+    groups = out_df.groupby(grp_cols, dropna=False) if region == "GOA" else []
+    for keys, g in groups:
         areas = g["Area"].fillna("").astype(str).str.strip()
         has_total = areas.str.startswith("Total").any()
         if has_total:
@@ -1041,7 +2212,10 @@ def main():
             "IsTotal": f"{keys[3]}Total",
             "SourceURL": first.get("SourceURL"),
             "SourceType": "DERIVED_TOTAL",
+            "PublicationDate": first.get("PublicationDate"),
             "FromPDFText": False,
+            "AlsoPublishedIn": first.get("AlsoPublishedIn"),
+            "Region": region,
             "_OFL_num": ofl_sum,
             "_ABC_num": abc_sum,
             "_TAC_num": tac_sum,
@@ -1073,8 +2247,39 @@ def main():
     out_df["TAC"] = tac_n.round().astype("Int64")
     out_df = out_df.drop(columns=["_OFL_num", "_ABC_num", "_TAC_num"])
 
-    out_df.to_csv(OUT_PATH, index=False)
-    print(f"Wrote {len(out_df)} rows to {OUT_PATH}")
+    if region == "BSAI":
+        # As in BSAI_OFL_ABC_TAC.csv, OY counts the BSAI-wide row, or the
+        # subarea rows of a species that has none.
+        is_wide = out_df["Area"].eq("BSAI")
+        has_wide = is_wide.groupby([out_df[c] for c in ("AssmentYr", "ProjYear", "lag", "Species")]).transform("any")
+        out_df["OY"] = (is_wide | ~has_wide).astype(int)
+    return out_df, rejected
+
+
+def write_output(out_df, out_path, expected_years, rejected=None):
+    """Write one region's output, after a changeset against the previous file.
+
+    `rejected` (link_records' log) goes to `<out>.linkage.csv`.
+    """
+    if os.path.exists(out_path):
+        try:
+            previous = pd.read_csv(out_path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        except Exception:
+            previous = None
+        if previous is not None:
+            changes = changeset(previous, out_df)
+            paths = write_changeset(changes, out_path)
+            n = change_counts(changes)
+            print(f"Changes vs previous output: {n['insert']} inserted, {n['delete']} deleted, "
+                  f"{n['update']} updated ({paths[0]})")
+
+    write_csv_atomic(out_df, out_path)
+    print(f"Wrote {len(out_df)} rows to {out_path}")
+    if rejected is not None:
+        log_path = f"{os.path.splitext(out_path)[0]}.linkage.csv"
+        write_csv_atomic(rejected, log_path)
+        counts = rejected["Match"].value_counts()
+        print(f"Linked away {len(rejected)} rows ({', '.join(f'{k}: {v}' for k, v in counts.items()) or 'none'}; {log_path})")
     if "SourceType" in out_df.columns:
         counts = out_df["SourceType"].value_counts(dropna=False)
         print("SourceType counts:")
@@ -1082,7 +2287,7 @@ def main():
             print(f"  {k}: {v}")
     if "AssmentYr" in out_df.columns:
         years = sorted(out_df["AssmentYr"].dropna().astype(int).unique())
-        expected = set(range(START_YEAR, END_YEAR + 1))
+        expected = set(expected_years)
         missing = sorted(expected - set(years))
         print(f"Assessment years in output: {years[0]}-{years[-1]} ({len(years)} years)")
         if missing:
@@ -1090,5 +2295,28 @@ def main():
             print("  " + ", ".join(str(y) for y in missing))
 
 
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Scrape GOA OFL/ABC/TAC harvest specifications from the Federal Register.")
+    ap.add_argument("command", nargs="?", default="run", choices=["run", "plan"],
+                    help="run: crawl and write the CSV (default); plan: report what a run would fetch, from metadata only.")
+    ap.add_argument("--start-year", type=int, default=START_YEAR)
+    ap.add_argument("--end-year", type=int, default=END_YEAR)
+    ap.add_argument("--no-cache", action="store_true", help="Refetch FR API metadata instead of using the cache.")
+    ap.add_argument("--offline", action="store_true", help="plan only: use cached metadata, no network.")
+    ap.add_argument("--region", action="append", choices=list(REGIONS),
+                    help="Region(s) to extract (default: both; combined rules are fetched once for both).")
+    ap.add_argument("--resume", action="store_true",
+                    help="run only: reuse years finished in the crawl journal and crawl the rest.")
+    ap.add_argument("--journal", default=JOURNAL_PATH, help="Crawl checkpoint journal (JSON lines).")
+    args = ap.parse_args(argv)
+    regions = tuple(r for r in REGIONS if r in (args.region or REGIONS))
+
+    if args.command == "plan":
+        plan(args.start_year, args.end_year, use_cache=not args.no_cache, offline=args.offline, regions=regions)
+    else:
+        crawl(args.start_year, args.end_year, use_cache=not args.no_cache, regions=regions,
+              resume=args.resume, journal_path=args.journal)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,574 @@
+import os
+import sys
+import json
+import time
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Ensemble store: biomass.npy holds a float32 (model, scenario, species, year)
+# array opened with mmap_mode="r"; axes.json lists the axis labels plus an
+# optional model -> model class map.
+STORE_ARRAY = "biomass.npy"
+STORE_AXES = "axes.json"
+LONG_COLS = ["Model", "Scenario", "Species", "Year", "Biomass"]
+
+LIGHTS = np.array(["green", "yellow", "red"])
+NOT_EVALUATED = -1
+
+HINDCAST_END = 2023
+TREND_YEARS = 10
+ARTIFACT_YEARS = 5
+SIGNAL_YEARS = 20
+LOW_SCENARIO = "ssp126"
+HIGH_SCENARIO = "ssp585"
+
+# Thresholds from the hindcast and projection tables in
+# doc/stoplight_criteria_framework.qmd.  The document fixes the green line;
+# the yellow band beyond it is a default for the working group to tune.
+THRESHOLDS = {
+    # Final (or minimum projected) biomass below this fraction of the first
+    # hindcast year counts as an extinction: a hard stop in both tiers.
+    "extinct_frac": 0.01,
+    # Tier 1: |log10(model / assessment)| within an order of magnitude.
+    "biomass_t1": (1.0, np.log10(20.0)),
+    # Tier 2: distance outside the assessment CI, in CI half-widths.
+    "biomass_t2_ci": (0.0, 1.0),
+    # Log-scale slope treated as "stable" when classifying trend direction.
+    "stable_slope": 0.01,
+    # Tier 2: |model slope - assessment slope| relative to the larger of
+    # |assessment slope| and stable_slope.
+    "trend_t2": (0.5, 1.0),
+    # Max |B_t / B_first - 1| over the first ARTIFACT_YEARS hindcast years.
+    "artifact_t1": 0.5,
+    "artifact_t2": 0.25,
+    # Tier 1 borderline band around the reference point (B/Bref = 1).
+    "status_t1_band": 0.1,
+    # Tier 2: |model status / assessment status - 1|.
+    "status_t2": (0.2, 0.4),
+    # Multispecies / single-species F_ref.
+    "fref_t1": (1.0, 1.2),
+    "fref_t2": ((0.3, 1.0), (0.2, 1.2)),
+    # Tier 2 ranking: max |log(model share / consensus share)|.
+    "ranking_share": np.log(1.5),
+    # Climate signal: |mean log-biomass difference| that counts as detectable
+    # (Tier 1) and the Welch t statistic for distinguishable (Tier 2).
+    "signal_t1": 0.05,
+    "signal_t2_t": 2.0,
+    # Robust z (median/MAD across models) beyond which a model is an outlier.
+    "outlier_z": 3.0,
+}
+
+# Tier 2 biomass tolerance by model class when the assessment has no CI
+# (the "Defining similar" starting points).
+CLASS_BIOMASS_TOLERANCE = {"fitted": 0.2, "ecosystem": 0.5}
+DEFAULT_BIOMASS_TOLERANCE = 0.2
+# Tier 2 status tolerance, |model status - assessment status|, by model
+# class; classes not listed use THRESHOLDS["status_t2"].
+CLASS_STATUS_TOLERANCE = {"fitted": 0.1}
+
+CRITERIA = [
+    ("hindcast", "persistence"),
+    ("hindcast", "biomass"),
+    ("hindcast", "trend"),
+    ("hindcast", "artifacts"),
+    ("hindcast", "status"),
+    ("hindcast", "fref"),
+    ("projection", "persistence"),
+    ("projection", "ranking"),
+    ("projection", "climate_signal"),
+]
+
+
+def open_store(path):
+    """(memmapped biomass array, axes dict) for an ensemble store directory."""
+    with open(os.path.join(path, STORE_AXES)) as fh:
+        axes = json.load(fh)
+    arr = np.load(os.path.join(path, STORE_ARRAY), mmap_mode="r")
+    expect = tuple(len(axes[k]) for k in ("models", "scenarios", "species", "years"))
+    if arr.shape != expect:
+        raise ValueError(f"{path}: array shape {arr.shape} does not match axes {expect}")
+    axes.setdefault("model_class", {})
+    return arr, axes
+
+
+def convert_long_csv(csv_path, store_path, chunksize=1_000_000, model_class=None):
+    """Write a long Model/Scenario/Species/Year/Biomass CSV into a store.
+
+    Two chunked passes: the first collects the axis labels, the second
+    scatters each chunk into an on-disk .npy memmap, so the CSV never has
+    to fit in memory.  Cells with no row stay NaN.
+    """
+    labels = {c: set() for c in LONG_COLS[:4]}
+    for chunk in pd.read_csv(csv_path, usecols=LONG_COLS[:4], chunksize=chunksize):
+        for c in labels:
+            labels[c].update(chunk[c].dropna().unique().tolist())
+    axes = {
+        "models": sorted(map(str, labels["Model"])),
+        "scenarios": sorted(map(str, labels["Scenario"])),
+        "species": sorted(map(str, labels["Species"])),
+        "years": sorted(int(y) for y in labels["Year"]),
+        "model_class": dict(model_class or {}),
+    }
+    os.makedirs(store_path, exist_ok=True)
+    years = np.asarray(axes["years"])
+    shape = (len(axes["models"]), len(axes["scenarios"]), len(axes["species"]), len(years))
+    arr = np.lib.format.open_memmap(os.path.join(store_path, STORE_ARRAY), mode="w+", dtype=np.float32, shape=shape)
+    arr[:] = np.nan
+    index = {c: {v: i for i, v in enumerate(axes[k])}
+             for c, k in (("Model", "models"), ("Scenario", "scenarios"), ("Species", "species"))}
+    for chunk in pd.read_csv(csv_path, usecols=LONG_COLS, chunksize=chunksize):
+        chunk = chunk.dropna(subset=LONG_COLS[:4])
+        mi = chunk["Model"].astype(str).map(index["Model"]).to_numpy()
+        si = chunk["Scenario"].astype(str).map(index["Scenario"]).to_numpy()
+        pi = chunk["Species"].astype(str).map(index["Species"]).to_numpy()
+        yi = np.searchsorted(years, chunk["Year"].to_numpy(dtype=int))
+        arr[mi, si, pi, yi] = chunk["Biomass"].to_numpy(dtype=np.float32)
+    arr.flush()
+    with open(os.path.join(store_path, STORE_AXES), "w") as fh:
+        json.dump(axes, fh, indent=2)
+    return shape
+
+
+def _slope(logb, x):
+    """OLS slope along the last axis with NaN years dropped."""
+    ok = np.isfinite(logb)
+    n = ok.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xm = np.where(ok, x, 0.0).sum(axis=-1) / n
+        ym = np.where(ok, logb, 0.0).sum(axis=-1) / n
+        dx = np.where(ok, x - xm[..., None], 0.0)
+        dy = np.where(ok, logb - ym[..., None], 0.0)
+        slope = (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+    return np.where(n >= 3, slope, np.nan)
+
+
+def _log(b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b > 0, np.log(np.where(b > 0, b, 1.0)), np.nan)
+
+
+def _windows(years, hindcast_end):
+    hind = np.nonzero(years <= hindcast_end)[0]
+    proj = np.nonzero(years > hindcast_end)[0]
+    return {
+        "hind": hind,
+        "proj": proj,
+        "end": hind[-1] if len(hind) else None,
+        "trend": hind[-TREND_YEARS:],
+        "artifact": hind[:ARTIFACT_YEARS + 1],
+        "signal": proj[-SIGNAL_YEARS:],
+    }
+
+
+def features(block, years, hindcast_end):
+    """Per (model, scenario, species) summaries of one block of the array.
+
+    Every criterion works from these small arrays, so the full time series
+    is only touched once, one model block at a time.
+    """
+    w = _windows(years, hindcast_end)
+    b = np.asarray(block, dtype=np.float64)
+    nan = np.full(b.shape[:-1], np.nan)
+    out = {}
+    if len(w["hind"]):
+        first = b[..., w["hind"][0]]
+        out["b_first"] = first
+        out["b_end"] = b[..., w["end"]]
+        out["slope"] = _slope(_log(b[..., w["trend"]]), years[w["trend"]].astype(float))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rel = np.abs(b[..., w["artifact"]] / first[..., None] - 1.0)
+        out["artifact"] = np.where(np.isfinite(rel).any(axis=-1), np.nanmax(np.where(np.isfinite(rel), rel, -np.inf), axis=-1), np.nan)
+    else:
+        out.update(b_first=nan, b_end=nan, slope=nan, artifact=nan)
+    if len(w["proj"]):
+        proj = b[..., w["proj"]]
+        with np.errstate(invalid="ignore"):
+            out["b_min_proj"] = np.where(np.isfinite(proj).any(axis=-1), np.nanmin(np.where(np.isfinite(proj), proj, np.inf), axis=-1), np.nan)
+            n = np.isfinite(proj).sum(axis=-1)
+            out["proj_mean"] = np.where(n > 0, np.nansum(proj, axis=-1) / np.maximum(n, 1), np.nan)
+            sig = _log(b[..., w["signal"]])
+            ns = np.isfinite(sig).sum(axis=-1)
+            mean = np.nansum(sig, axis=-1) / np.maximum(ns, 1)
+            var = np.nansum((sig - mean[..., None]) ** 2, axis=-1) / np.maximum(ns - 1, 1)
+        out["sig_mean"] = np.where(ns > 0, mean, np.nan)
+        out["sig_var"] = np.where(ns > 1, var, np.nan)
+        out["sig_n"] = ns
+    else:
+        out.update(b_min_proj=nan, proj_mean=nan, sig_mean=nan, sig_var=nan, sig_n=np.zeros(b.shape[:-1], dtype=int))
+    return out
+
+
+def ensemble_features(arr, axes, hindcast_end=HINDCAST_END, chunk_bytes=256 << 20):
+    """features() over the whole ensemble, reading `chunk_bytes` of models at a time."""
+    years = np.asarray(axes["years"])
+    per_model = max(1, int(np.prod(arr.shape[1:])) * 8)
+    step = max(1, chunk_bytes // per_model)
+    parts = [features(arr[m:m + step], years, hindcast_end) for m in range(0, arr.shape[0], step)]
+    return {k: np.concatenate([p[k] for p in parts], axis=0) for k in parts[0]}
+
+
+def load_reference(path, species, years, hindcast_end=HINDCAST_END):
+    """Assessment benchmarks per species, aligned to the ensemble species axis.
+
+    The CSV has Species and Year plus any of Biomass, Biomass_lo, Biomass_hi
+    (time series), Status (assessment B/Bref), Fref (single-species F_ref)
+    and ClimateSign (+1/-1 expected sign of high minus low scenario).
+    Missing inputs leave the dependent criteria unevaluated.
+    """
+    df = pd.read_csv(path)
+    P = len(species)
+    sp_index = {s: i for i, s in enumerate(species)}
+    years = np.asarray(years)
+    series = {c: np.full((P, len(years)), np.nan) for c in ("Biomass", "Biomass_lo", "Biomass_hi")}
+    df = df[df["Species"].astype(str).isin(sp_index)]
+    pi = df["Species"].astype(str).map(sp_index).to_numpy()
+    if "Year" in df.columns:
+        yi = np.searchsorted(years, df["Year"].to_numpy(dtype=int))
+        ok = (yi < len(years)) & (years[np.clip(yi, 0, len(years) - 1)] == df["Year"].to_numpy(dtype=int))
+        for c in series:
+            if c in df.columns:
+                series[c][pi[ok], yi[ok]] = pd.to_numeric(df[c], errors="coerce").to_numpy()[ok]
+    ref = {"series": series}
+    w = _windows(years, hindcast_end)
+    b = series["Biomass"]
+    if w["end"] is not None:
+        ref["b_end"] = b[:, w["end"]]
+        ref["lo"] = series["Biomass_lo"][:, w["end"]]
+        ref["hi"] = series["Biomass_hi"][:, w["end"]]
+        ref["slope"] = _slope(_log(b[:, w["trend"]]), years[w["trend"]].astype(float))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rel = np.abs(b[:, w["artifact"]] / b[:, w["artifact"][:1]] - 1.0)
+        ref["artifact"] = np.where(np.isfinite(rel).any(axis=-1), np.nanmax(np.where(np.isfinite(rel), rel, -np.inf), axis=-1), np.nan)
+    for c in ("Status", "Fref", "ClimateSign"):
+        vals = np.full(P, np.nan)
+        if c in df.columns:
+            per = df.dropna(subset=[c]).groupby("Species")[c].last()
+            for s, v in per.items():
+                vals[sp_index[str(s)]] = float(v)
+        ref[c.lower()] = vals
+    return ref
+
+
+def load_model_diagnostics(path, models, species):
+    """(Bref, Fref) arrays (model, species) from a Model/Species/Bref/Fref CSV."""
+    M, P = len(models), len(species)
+    out = {"bref": np.full((M, P), np.nan), "fref": np.full((M, P), np.nan)}
+    if path is None:
+        return out
+    df = pd.read_csv(path)
+    mi = df["Model"].astype(str).map({m: i for i, m in enumerate(models)})
+    pi = df["Species"].astype(str).map({s: i for i, s in enumerate(species)})
+    ok = mi.notna() & pi.notna()
+    for c in ("Bref", "Fref"):
+        if c in df.columns:
+            out[c.lower()][mi[ok].astype(int), pi[ok].astype(int)] = pd.to_numeric(df.loc[ok, c], errors="coerce")
+    return out
+
+
+def grade(metric, green, yellow):
+    """Light codes for a smaller-is-better metric: 0 green, 1 yellow, 2 red, -1 NaN."""
+    code = np.where(metric <= green, 0, np.where(metric <= yellow, 1, 2))
+    return np.where(np.isfinite(metric), code, NOT_EVALUATED)
+
+
+def _outside(x, lo, hi):
+    return np.maximum(np.maximum(lo - x, x - hi), 0.0)
+
+
+def _trend_class(slope, stable):
+    return np.where(np.isfinite(slope), np.sign(slope) * (np.abs(slope) > stable), np.nan)
+
+
+def evaluate(feat, ref, diag, axes, thresholds=None, low=LOW_SCENARIO, high=HIGH_SCENARIO):
+    """Every criterion for every model and tier as array operations.
+
+    Returns a list of result dicts with Phase, Criterion, Tier, Level
+    ("species" or "model"), the metric array, the light-code array and the
+    scenario labels of its scenario axis.
+    """
+    th = dict(THRESHOLDS, **(thresholds or {}))
+    scenarios = list(axes["scenarios"])
+    M = len(axes["models"])
+    res = []
+
+    def add(phase, crit, tier, metric, light, level="species", scen=None):
+        res.append({"Phase": phase, "Criterion": crit, "Tier": tier, "Level": level,
+                    "metric": metric, "light": light, "scenarios": scen or scenarios})
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Persistence: hard stop, identical in both tiers.
+        for phase, b in (("hindcast", feat["b_end"]), ("projection", feat["b_min_proj"])):
+            metric = b / feat["b_first"]
+            light = np.where(np.isfinite(metric), np.where(metric >= th["extinct_frac"], 0, 2), NOT_EVALUATED)
+            for tier in (1, 2):
+                add(phase, "persistence", tier, metric, light)
+
+        # Biomass plausibility at the start of the projection period.
+        ratio = feat["b_end"] / ref["b_end"]
+        add("hindcast", "biomass", 1, ratio, grade(np.abs(np.log10(ratio)), *th["biomass_t1"]))
+        half = (ref["hi"] - ref["lo"]) / 2
+        has_ci = np.isfinite(half) & (half > 0)
+        tol = np.array([CLASS_BIOMASS_TOLERANCE.get(axes["model_class"].get(m), DEFAULT_BIOMASS_TOLERANCE)
+                        for m in axes["models"]])[:, None, None]
+        ci_metric = _outside(feat["b_end"], ref["lo"], ref["hi"]) / half
+        ci_light = grade(np.where(np.isfinite(feat["b_end"]), ci_metric, np.nan), *th["biomass_t2_ci"])
+        tol_light = grade(np.abs(ratio - 1) / tol, 1.0, 2.0)
+        add("hindcast", "biomass", 2, ratio, np.where(has_ci, ci_light, tol_light))
+
+        # Trend direction over the final TREND_YEARS hindcast years.
+        stable = th["stable_slope"]
+        cm = _trend_class(feat["slope"], stable)
+        ca = _trend_class(ref["slope"], stable)
+        add("hindcast", "trend", 1, feat["slope"], grade(np.abs(cm - ca), 0, 1))
+        rel = np.abs(feat["slope"] - ref["slope"]) / np.maximum(np.abs(ref["slope"]), stable)
+        opposite = np.sign(feat["slope"]) * np.sign(ref["slope"]) < 0
+        add("hindcast", "trend", 2, feat["slope"],
+            np.where(opposite & np.isfinite(rel), 2, grade(rel, *th["trend_t2"])))
+
+        # Steep artifacts in the first ARTIFACT_YEARS; a matching change in
+        # the assessment makes it data-supported (yellow, document it).
+        for tier, limit in ((1, th["artifact_t1"]), (2, th["artifact_t2"])):
+            a = feat["artifact"]
+            supported = np.isfinite(ref.get("artifact", np.nan)) & (ref.get("artifact", np.nan) > limit)
+            light = np.where(a <= limit, 0, np.where(supported, 1, 2))
+            add("hindcast", "artifacts", tier, a, np.where(np.isfinite(a), light, NOT_EVALUATED))
+
+        # Stock status: model B/Bref at the end of the hindcast vs assessment.
+        status = feat["b_end"] / diag["bref"][:, None, :]
+        same = np.sign(status - 1) == np.sign(ref["status"] - 1)
+        border = np.abs(status - 1) <= th["status_t1_band"]
+        t1 = np.where(np.isfinite(status * ref["status"]), np.where(same, 0, np.where(border, 1, 2)), NOT_EVALUATED)
+        add("hindcast", "status", 1, status, t1)
+        status_tol = np.array([CLASS_STATUS_TOLERANCE.get(axes["model_class"].get(m), np.nan)
+                               for m in axes["models"]])[:, None, None]
+        t2 = np.where(np.isfinite(status_tol),
+                      grade(np.abs(status - ref["status"]) / status_tol, 1.0, 2.0),
+                      grade(np.abs(status / ref["status"] - 1), *th["status_t2"]))
+        # Tier 2 is the stricter tier: a wrong category stays red.
+        add("hindcast", "status", 2, status, np.maximum(t1, t2))
+
+        # F_ref: multispecies over single-species, a setup diagnostic.
+        fr = np.broadcast_to((diag["fref"] / ref["fref"])[:, None, :], feat["b_end"].shape)
+        add("hindcast", "fref", 1, fr, grade(fr, *th["fref_t1"]))
+        (g_lo, g_hi), (y_lo, y_hi) = th["fref_t2"]
+        t2 = np.where((fr >= g_lo) & (fr <= g_hi), 0, np.where((fr >= y_lo) & (fr <= y_hi), 1, 2))
+        add("hindcast", "fref", 2, fr, np.where(np.isfinite(fr), t2, NOT_EVALUATED))
+
+        # Ranking consistency against the ensemble consensus (median log
+        # projected biomass across models) per scenario.
+        logm = _log(feat["proj_mean"])
+        complete = np.isfinite(logm).all(axis=-1)
+        consensus = np.nanmedian(np.where(complete[..., None], logm, np.nan), axis=0)
+        rank_m = np.argsort(np.argsort(np.where(np.isfinite(logm), logm, -np.inf), axis=-1), axis=-1)
+        rank_c = np.argsort(np.argsort(np.where(np.isfinite(consensus), consensus, -np.inf), axis=-1), axis=-1)
+        P = logm.shape[-1]
+        top = (rank_m == P - 1) & (rank_c[None] == P - 1)
+        bottom = (rank_m == 0) & (rank_c[None] == 0)
+        mismatches = 2 - top.any(axis=-1) - bottom.any(axis=-1)
+        ok = complete & np.isfinite(consensus).all(axis=-1)[None]
+        add("projection", "ranking", 1, mismatches.astype(float),
+            np.where(ok, grade(mismatches, 0, 1), NOT_EVALUATED), level="model")
+        share_m = logm - np.log(np.exp(logm).sum(axis=-1, keepdims=True))
+        share_c = consensus - np.log(np.exp(consensus).sum(axis=-1, keepdims=True))
+        share_err = np.abs(share_m - share_c[None]).max(axis=-1)
+        d = (rank_m - rank_c[None]).astype(float)
+        rho = 1 - 6 * (d ** 2).sum(axis=-1) / (P * (P ** 2 - 1)) if P > 1 else np.ones(ok.shape)
+        same_rank = (d == 0).all(axis=-1)
+        t2 = np.where(same_rank & (share_err <= th["ranking_share"]), 0, np.where(same_rank | (rho >= 0.5), 1, 2))
+        add("projection", "ranking", 2, rho, np.where(ok, t2, NOT_EVALUATED), level="model")
+
+        # Climate signal: high minus low scenario over the last SIGNAL_YEARS.
+        if low in scenarios and high in scenarios:
+            lo_i, hi_i = scenarios.index(low), scenarios.index(high)
+            diff = feat["sig_mean"][:, hi_i] - feat["sig_mean"][:, lo_i]
+            se = np.sqrt(feat["sig_var"][:, hi_i] / feat["sig_n"][:, hi_i] + feat["sig_var"][:, lo_i] / feat["sig_n"][:, lo_i])
+            t = diff / se
+            sign = ref["climatesign"][None]
+            expected = np.where(np.isfinite(sign), np.sign(diff) == sign, True)
+            label = [f"{high}-{low}"]
+            detect = np.abs(diff) >= th["signal_t1"]
+            any_ok = (detect & expected).any(axis=-1)
+            any_wrong = (detect & ~expected).any(axis=-1)
+            t1 = np.where(any_ok, 0, np.where(any_wrong, 2, 1))
+            n_detect = np.where(np.isfinite(diff), detect & expected, False).sum(axis=-1).astype(float)
+            has = np.isfinite(diff).any(axis=-1)
+            add("projection", "climate_signal", 1, n_detect[:, None], np.where(has, t1, NOT_EVALUATED)[:, None],
+                level="model", scen=label)
+            dist = np.abs(t) >= th["signal_t2_t"]
+            t2 = np.where(dist & expected, 0, np.where(dist, 2, 1))
+            add("projection", "climate_signal", 2, t[:, None], np.where(np.isfinite(t), t2, NOT_EVALUATED)[:, None, :],
+                scen=label)
+        else:
+            for tier in (1, 2):
+                add("projection", "climate_signal", tier, np.full((M, 1), np.nan), np.full((M, 1), NOT_EVALUATED),
+                    level="model", scen=["(missing scenario)"])
+    return res
+
+
+def stoplight_table(results, axes):
+    """Long table: one row per model x scenario x species x criterion x tier."""
+    models = np.asarray(axes["models"])
+    species = np.asarray(axes["species"])
+    classes = np.asarray([axes["model_class"].get(m, "") for m in axes["models"]])
+    frames = []
+    for r in results:
+        light = np.asarray(r["light"])
+        metric = np.broadcast_to(r["metric"], light.shape)
+        idx = np.indices(light.shape).reshape(light.ndim, -1)
+        sp = np.full(idx.shape[1], "(all)", dtype=object) if r["Level"] == "model" else species[idx[2]]
+        codes = light.ravel()
+        frames.append(pd.DataFrame({
+            "Model": models[idx[0]],
+            "ModelClass": classes[idx[0]],
+            "Scenario": np.asarray(r["scenarios"])[idx[1]],
+            "Species": sp,
+            "Phase": r["Phase"],
+            "Criterion": r["Criterion"],
+            "Tier": r["Tier"],
+            "Metric": metric.ravel(),
+            "Light": np.where(codes >= 0, LIGHTS[np.clip(codes, 0, 2)], "not evaluated"),
+            "_code": codes,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summary_table(table):
+    """Worst light per model x tier x criterion, plus the overall call.
+
+    Any red persistence light is a hard stop; otherwise the overall call is
+    the worst evaluated light.
+    """
+    ev = table[table["_code"] >= 0]
+    worst = ev.groupby(["Model", "Tier", "Phase", "Criterion"], sort=False)["_code"].max().unstack(["Phase", "Criterion"])
+    worst = worst[[pc for pc in CRITERIA if pc in worst.columns]]
+    worst.columns = [f"{p}:{c}" for p, c in worst.columns]
+    overall = worst.max(axis=1)
+    hard = ev[(ev["Criterion"] == "persistence") & (ev["_code"] == 2)].groupby(["Model", "Tier"]).size()
+    out = worst.apply(lambda col: col.map(lambda v: LIGHTS[int(v)] if pd.notna(v) else "not evaluated"))
+    out["Overall"] = overall.map(lambda v: LIGHTS[int(v)])
+    out["HardStop"] = [key in hard.index for key in out.index]
+    return out.reset_index()
+
+
+def bracket_diagnostics(arr, axes, ref, quantiles=(0.1, 0.9)):
+    """Does the ensemble bracket the assessment, per scenario x species x year?
+
+    Reads one scenario (all models, species and assessment years) of the
+    store at a time and reduces across the model axis.
+    """
+    years = np.asarray(axes["years"])
+    ref_b = ref["series"]["Biomass"]
+    yi = np.nonzero(np.isfinite(ref_b).any(axis=0))[0]
+    if not len(yi):
+        return pd.DataFrame()
+    a = ref_b[:, yi]
+    P, Y = a.shape
+    lo_name, hi_name = (f"Ensemble_q{int(q * 100)}" for q in quantiles)
+    rows = []
+    for s, scen in enumerate(axes["scenarios"]):
+        b = np.asarray(arr[:, s][:, :, yi], dtype=np.float64)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lo, med, hi = np.nanmin(b, axis=0), np.nanmedian(b, axis=0), np.nanmax(b, axis=0)
+            q = np.nanquantile(b, quantiles, axis=0)
+        rows.append(pd.DataFrame({
+            "Scenario": scen,
+            "Species": np.repeat(axes["species"], Y),
+            "Year": np.tile(years[yi], P),
+            "nModels": np.isfinite(b).sum(axis=0).ravel(),
+            "Ensemble_min": lo.ravel(),
+            lo_name: q[0].ravel(),
+            "Ensemble_median": med.ravel(),
+            hi_name: q[1].ravel(),
+            "Ensemble_max": hi.ravel(),
+            "Assessment": a.ravel(),
+            "Bracketed": ((lo <= a) & (a <= hi)).ravel(),
+            "QuantileBracketed": ((q[0] <= a) & (a <= q[1])).ravel(),
+        }))
+    out = pd.concat(rows, ignore_index=True)
+    return out[np.isfinite(out["Assessment"])].reset_index(drop=True)
+
+
+def outlier_counts(table, z=None):
+    """Per model, how many species-level metrics are ensemble outliers.
+
+    Outliers are |x - median| / (1.4826 * MAD) > z across models for each
+    scenario x species x criterion x tier; a model that is an outlier
+    everywhere is the exclusion candidate of the framework.
+    """
+    z = THRESHOLDS["outlier_z"] if z is None else z
+    sub = table[(table["Species"] != "(all)") & np.isfinite(table["Metric"])
+                & (table["Criterion"] != "persistence")].copy()
+    key = ["Scenario", "Species", "Phase", "Criterion", "Tier"]
+    g = sub.groupby(key)["Metric"]
+    med = g.transform("median")
+    mad = (sub["Metric"] - med).abs().groupby([sub[k] for k in key]).transform("median") * 1.4826
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(mad > 0, (sub["Metric"] - med).abs() / mad, 0.0)
+    sub["Outlier"] = score > z
+    out = sub.groupby("Model").agg(nMetrics=("Outlier", "size"), nOutliers=("Outlier", "sum"))
+    out["OutlierShare"] = out["nOutliers"] / out["nMetrics"]
+    return out.reset_index()
+
+
+def run(store, reference, model_diag=None, hindcast_end=HINDCAST_END, low=LOW_SCENARIO, high=HIGH_SCENARIO):
+    arr, axes = open_store(store)
+    feat = ensemble_features(arr, axes, hindcast_end)
+    ref = load_reference(reference, axes["species"], axes["years"], hindcast_end)
+    diag = load_model_diagnostics(model_diag, axes["models"], axes["species"])
+    table = stoplight_table(evaluate(feat, ref, diag, axes, low=low, high=high), axes)
+    return {
+        "stoplight": table,
+        "summary": summary_table(table),
+        "bracket": bracket_diagnostics(arr, axes, ref),
+        "outliers": outlier_counts(table),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Vectorized stoplight-criteria evaluation of multispecies ensemble runs.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    cv = sub.add_parser("convert", help="Chunk a long Model/Scenario/Species/Year/Biomass CSV into a memmap store.")
+    cv.add_argument("csv")
+    cv.add_argument("store")
+    cv.add_argument("--model-class", action="append", default=[], metavar="MODEL=CLASS",
+                    help="Model class for Tier 2 biomass tolerances (fitted or ecosystem).")
+    cv.add_argument("--chunksize", type=int, default=1_000_000)
+
+    ev = sub.add_parser("evaluate", help="Score a store against assessment benchmarks.")
+    ev.add_argument("store")
+    ev.add_argument("--reference", required=True, help="Assessment CSV: Species, Year, Biomass[, Biomass_lo, Biomass_hi, Status, Fref, ClimateSign].")
+    ev.add_argument("--model-diagnostics", default=None, help="Model/Species/Bref/Fref CSV for status and F_ref criteria.")
+    ev.add_argument("--hindcast-end", type=int, default=HINDCAST_END)
+    ev.add_argument("--low-scenario", default=LOW_SCENARIO)
+    ev.add_argument("--high-scenario", default=HIGH_SCENARIO)
+    ev.add_argument("--out-prefix", default="data/stoplight", help="Writes <prefix>_table.csv, _summary.csv, _bracket.csv, _outliers.csv.")
+    args = ap.parse_args(argv)
+
+    if args.command == "convert":
+        classes = dict(s.split("=", 1) for s in args.model_class)
+        shape = convert_long_csv(args.csv, args.store, chunksize=args.chunksize, model_class=classes)
+        print(f"Wrote {args.store} with shape (model, scenario, species, year) = {shape}")
+        return
+
+    if not os.path.exists(os.path.join(args.store, STORE_AXES)):
+        print(f"No ensemble store at {args.store}; run the convert command first.")
+        sys.exit(1)
+    t0 = time.monotonic()
+    out = run(args.store, args.reference, args.model_diagnostics, args.hindcast_end,
+              args.low_scenario, args.high_scenario)
+    elapsed = time.monotonic() - t0
+    out["stoplight"].drop(columns="_code").to_csv(f"{args.out_prefix}_table.csv", index=False)
+    for name in ("summary", "bracket", "outliers"):
+        out[name].to_csv(f"{args.out_prefix}_{name}.csv", index=False)
+    print(f"Evaluated {len(out['stoplight'])} criterion cells in {elapsed:.1f}s; wrote {args.out_prefix}_*.csv")
+    summary = out["summary"]
+    print(summary[["Model", "Tier", "Overall", "HardStop"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
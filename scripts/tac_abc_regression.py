@@ -0,0 +1,354 @@
+import re
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+REGION_PATHS = {
+    "BSAI": "data/BSAI_OFL_ABC_TAC.csv",
+    "GOA": "data/GOA_OFL_ABC_TAC_specs.csv",
+}
+
+# Default aggregation mirrors doc/index.qmd: BSAI sums every OY row per
+# species-year (dfOY), GOA keeps the Area == "Total" rows (goaOY).
+DEFAULT_AGGREGATION = {"BSAI": "all", "GOA": "total"}
+
+# BSAI five-stock specification from the report (mainspp minus POP and
+# Flathead sole, in mainspp order).
+BSAI_MAIN_GROUPS = [
+    "Pollock",
+    "Yellowfin sole",
+    "Pacific cod",
+    "Atka mackerel",
+    "Northern rock sole",
+]
+
+OUT_PATH = "data/tac_abc_regression_sweep.csv"
+
+
+def safe_names(names):
+    out = []
+    for x in names:
+        s = re.sub(r"[^A-Za-z0-9]+", "_", str(x))
+        out.append(re.sub(r"^_|_$", "", s))
+    return out
+
+
+def _is_total(area):
+    return area == "Total"
+
+
+def _is_leaf(area):
+    a = area.str.lower()
+    return ~(a.str.startswith("total") | a.str.contains("subtotal", regex=False))
+
+
+AREA_AGGREGATIONS = {
+    # Sum every OY row for the species-year.
+    "all": None,
+    # Use only published species totals.
+    "total": _is_total,
+    # Sum area-level rows, skipping published totals and subtotals.
+    "leaf": _is_leaf,
+}
+
+
+def load_region(region, path=None):
+    df = pd.read_csv(path or REGION_PATHS[region], encoding="utf-8-sig")
+    df["Area"] = df["Area"].fillna("").astype(str)
+    return df
+
+
+def yearly_series(df, aggregation="all", lag=1):
+    """Species-year ABC/TAC sums for lag-`lag`, OY == 1 rows."""
+    sub = df[(df["lag"] == lag) & (df["OY"] == 1)]
+    area_filter = AREA_AGGREGATIONS[aggregation]
+    if area_filter is not None:
+        sub = sub[area_filter(sub["Area"])]
+    out = (
+        sub.groupby(["ProjYear", "Species"], as_index=False)[["ABC", "TAC"]]
+        .sum(min_count=1)
+        .rename(columns={"ProjYear": "Year"})
+    )
+    out[["ABC", "TAC"]] = out[["ABC", "TAC"]].fillna(0.0)
+    return out
+
+
+def species_panel(series):
+    """Dense Year x Species ABC/TAC arrays built once per region/aggregation."""
+    years = np.sort(series["Year"].unique()).astype(float)
+    species = sorted(series["Species"].unique())
+    yi = np.searchsorted(years, series["Year"].to_numpy(dtype=float))
+    si = np.searchsorted(species, series["Species"].to_numpy())
+    abc = np.zeros((len(years), len(species)))
+    tac = np.zeros((len(years), len(species)))
+    np.add.at(abc, (yi, si), series["ABC"].to_numpy(dtype=float))
+    np.add.at(tac, (yi, si), series["TAC"].to_numpy(dtype=float))
+    return {"years": years, "species": species, "abc": abc, "tac": tac}
+
+
+def window_panel(panel, start=None, end=None):
+    keep = np.ones(len(panel["years"]), dtype=bool)
+    if start is not None:
+        keep &= panel["years"] >= start
+    if end is not None:
+        keep &= panel["years"] <= end
+    return {
+        "years": panel["years"][keep],
+        "species": panel["species"],
+        "abc": panel["abc"][keep],
+        "tac": panel["tac"][keep],
+    }
+
+
+def top_groups_by_tac(panel, n=5):
+    tot = panel["tac"].sum(axis=0)
+    order = np.argsort(-tot, kind="stable")
+    return [panel["species"][j] for j in order if np.isfinite(tot[j]) and tot[j] > 0][:n]
+
+
+def build_reg_base(panel, main_groups):
+    """Year x Group ABC/TAC arrays with non-main species pooled as Other."""
+    group_names = list(main_groups) + ["Other"]
+    member = np.zeros((len(panel["species"]), len(group_names)))
+    for j, sp in enumerate(panel["species"]):
+        member[j, main_groups.index(sp) if sp in main_groups else -1] = 1.0
+    return panel["years"], panel["abc"] @ member, panel["tac"] @ member, group_names
+
+
+def design_matrices(years, abc, tac, group_names):
+    """One (X, y, years) design per group, matching fit_tac_abc_regressions().
+
+    Columns are intercept, own log(ABC), other groups' log(ABC) in
+    group order, and a year term centred on the full window mean.
+    """
+    year_c = years - years.mean()
+    designs = []
+    for i, group in enumerate(group_names):
+        others = [j for j in range(len(group_names)) if j != i]
+        keep = (tac[:, i] > 0) & (abc[:, i] > 0)
+        if others:
+            keep &= (abc[:, others] > 0).all(axis=1)
+        cols = [np.ones(keep.sum()), np.log(abc[keep, i])]
+        cols.extend(np.log(abc[keep, j]) for j in others)
+        cols.append(year_c[keep])
+        X = np.column_stack(cols)
+        y = np.log(tac[keep, i])
+        designs.append({
+            "group": group,
+            "others": [group_names[j] for j in others],
+            "years": years[keep],
+            "X": X,
+            "y": y,
+        })
+    return designs
+
+
+def fit_batched(designs):
+    """Solve every design in one stacked least-squares call.
+
+    Designs are zero-padded to a common (n_max, p_max) shape; zero rows and
+    columns leave the pseudo-inverse solution unchanged and get zero
+    leverage, so the hat diagonal, leave-one-out residuals e / (1 - h) and
+    PRESS come out of the same batch without refitting.
+    """
+    if not designs:
+        return []
+    n_max = max(d["X"].shape[0] for d in designs)
+    p_max = max(d["X"].shape[1] for d in designs)
+    B = len(designs)
+    X = np.zeros((B, n_max, p_max))
+    y = np.zeros((B, n_max))
+    mask = np.zeros((B, n_max), dtype=bool)
+    for b, d in enumerate(designs):
+        n, p = d["X"].shape
+        X[b, :n, :p] = d["X"]
+        y[b, :n] = d["y"]
+        mask[b, :n] = True
+
+    X_pinv = np.linalg.pinv(X)
+    beta = np.einsum("bpn,bn->bp", X_pinv, y)
+    fitted = np.einsum("bnp,bp->bn", X, beta)
+    hat = np.einsum("bnp,bpn->bn", X, X_pinv)
+    rank = np.linalg.matrix_rank(X)
+
+    resid = np.where(mask, y - fitted, 0.0)
+    n_obs = mask.sum(axis=1)
+    y_mean = np.where(n_obs > 0, y.sum(axis=1) / np.maximum(n_obs, 1), 0.0)
+    sst = np.where(mask, (y - y_mean[:, None]) ** 2, 0.0).sum(axis=1)
+    sse = (resid ** 2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(sst > 0, 1.0 - sse / sst, np.nan)
+        loo = np.where(mask & (hat < 1 - 1e-10), resid / (1.0 - hat), np.nan)
+    press = np.nansum(np.where(mask, loo ** 2, np.nan), axis=1)
+
+    results = []
+    for b, d in enumerate(designs):
+        n, p = d["X"].shape
+        results.append({
+            "group": d["group"],
+            "others": d["others"],
+            "years": d["years"],
+            "n": int(n),
+            "rank": int(rank[b]),
+            "coef": beta[b, :p],
+            "observed": d["y"],
+            "fitted": fitted[b, :n],
+            "hat": hat[b, :n],
+            "loo_resid": loo[b, :n],
+            "r2": float(r2[b]),
+            "press": float(press[b]),
+        })
+    return results
+
+
+def regression_rows(results, group_names):
+    rows = []
+    for res in results:
+        p = len(res["coef"])
+        full_rank = res["rank"] == p and res["n"] > p
+        coef = res["coef"] if full_rank else np.full(p, np.nan)
+        loo = res["loo_resid"]
+        row = {
+            "Species": res["group"],
+            "n": res["n"],
+            "Intercept": coef[0],
+            "log_ABC": coef[1],
+            "Year_c": coef[-1],
+            "R2": res["r2"] if full_rank else np.nan,
+            "PRESS": res["press"] if full_rank else np.nan,
+            "LOO_RMSE": float(np.sqrt(np.nanmean(loo ** 2))) if full_rank and np.isfinite(loo).any() else np.nan,
+        }
+        other_coef = dict(zip(res["others"], coef[2:-1]))
+        for g, g_safe in zip(group_names, safe_names(group_names)):
+            row[f"log_ABC_{g_safe}"] = other_coef.get(g, np.nan)
+        rows.append(row)
+    return rows
+
+
+def regression_table(results, group_names):
+    """Coefficient/R2 table in the layout of render_regression_table()."""
+    return pd.DataFrame(regression_rows(results, group_names))
+
+
+def regression_predictions(results):
+    frames = []
+    for res in results:
+        frames.append(pd.DataFrame({
+            "Year": res["years"].astype(int),
+            "Species": res["group"],
+            "Observed": np.exp(res["observed"]),
+            "Predicted": np.exp(res["fitted"]),
+            "LOO_Predicted": np.exp(res["observed"] - res["loo_resid"]),
+            "Leverage": res["hat"],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["Year", "Species", "Observed", "Predicted", "LOO_Predicted", "Leverage"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def fit_tac_abc_regressions(series, main_groups):
+    """Single-variant equivalent of the report's fit_tac_abc_regressions()."""
+    years, abc, tac, group_names = build_reg_base(species_panel(series), main_groups)
+    results = fit_batched(design_matrices(years, abc, tac, group_names))
+    return {
+        "results": regression_table(results, group_names),
+        "pred": regression_predictions(results),
+        "group_names": group_names,
+    }
+
+
+def sweep(frames, variants):
+    """Score many (region, aggregation, window, groups) variants in one batch.
+
+    `frames` maps region -> raw table; each variant is a dict with keys
+    region, aggregation, start, end and (optionally) main_groups.
+    """
+    panels = {}
+    designs = []
+    spans = []
+    for v in variants:
+        key = (v["region"], v["aggregation"])
+        if key not in panels:
+            panels[key] = species_panel(yearly_series(frames[v["region"]], v["aggregation"]))
+        panel = window_panel(panels[key], v["start"], v["end"])
+        if len(panel["years"]) == 0:
+            continue
+        main_groups = v.get("main_groups") or top_groups_by_tac(panel)
+        years, abc, tac, group_names = build_reg_base(panel, main_groups)
+        d = design_matrices(years, abc, tac, group_names)
+        spans.append((v, group_names, len(designs), len(designs) + len(d)))
+        designs.extend(d)
+
+    results = fit_batched(designs)
+    rows = []
+    for v, group_names, lo, hi in spans:
+        groups = "|".join(group_names)
+        for row in regression_rows(results[lo:hi], group_names):
+            rows.append({
+                "Region": v["region"],
+                "Aggregation": v["aggregation"],
+                "StartYear": v["start"],
+                "EndYear": v["end"],
+                "Groups": groups,
+                **row,
+            })
+    # Variants with different group sets get their own log_ABC_* columns.
+    return pd.DataFrame(rows)
+
+
+def window_variants(regions, aggregations, first_years, last_years, min_span=10):
+    variants = []
+    for region in regions:
+        for agg in aggregations or [DEFAULT_AGGREGATION[region]]:
+            for start in first_years:
+                for end in last_years:
+                    if end - start + 1 < min_span:
+                        continue
+                    v = {"region": region, "aggregation": agg, "start": start, "end": end}
+                    if region == "BSAI":
+                        v["main_groups"] = BSAI_MAIN_GROUPS
+                    variants.append(v)
+    return variants
+
+
+def _year_range(text):
+    if "-" in text:
+        a, b = text.split("-", 1)
+        return list(range(int(a), int(b) + 1))
+    return [int(text)]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Batched log-linear TAC~ABC regressions with closed-form leave-one-out scores.",
+    )
+    ap.add_argument("--region", action="append", choices=sorted(REGION_PATHS), help="Region(s) to fit (default: all).")
+    ap.add_argument("--aggregation", action="append", choices=sorted(AREA_AGGREGATIONS), help="Area aggregation(s) to sweep (default: report setting per region).")
+    ap.add_argument("--first-years", default="1986", help="Window start year or range, e.g. 1986-2005.")
+    ap.add_argument("--last-years", default="2026", help="Window end year or range, e.g. 2015-2024.")
+    ap.add_argument("--min-span", type=int, default=10, help="Skip windows shorter than this many years.")
+    ap.add_argument("--out", default=OUT_PATH)
+    args = ap.parse_args(argv)
+
+    regions = args.region or sorted(REGION_PATHS)
+    frames = {r: load_region(r) for r in regions}
+    variants = window_variants(
+        regions,
+        args.aggregation,
+        _year_range(args.first_years),
+        _year_range(args.last_years),
+        min_span=args.min_span,
+    )
+    if not variants:
+        print("No year windows satisfy --min-span.")
+        sys.exit(1)
+
+    out = sweep(frames, variants)
+    out.to_csv(args.out, index=False)
+    print(f"Fitted {len(out)} regressions across {len(variants)} variants; wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from scrape_goa_fedreg import _digit_slips, link_records
+
+
+def _rows(*rows):
+    cols = ["SourceType", "PublicationDate", "Area", "OFL", "ABC", "TAC"]
+    df = pd.DataFrame(rows, columns=cols)
+    df.insert(0, "AssmentYr", 2023)
+    df.insert(1, "ProjYear", 2024)
+    df.insert(2, "lag", 1)
+    df.insert(3, "Species", "Pollock")
+    df["SourceURL"] = [f"doc{i}" for i in range(len(df))]
+    return df
+
+
+def test_empty_row_never_wins():
+    df = _rows(
+        ("XML", "2024-02-20", "Total", "", "", ""),
+        ("XML", "2024-02-20", "Total", "200,000", "150,000", "140,000"),
+        ("PDF", "2024-02-20", "Total", "200,000", "150,000", "140,000"),
+    )
+    kept, log = link_records(df)
+    assert kept["SourceURL"].tolist() == ["doc1"]
+    assert sorted(log["Match"]) == ["exact", "near"]
+
+
+def test_complete_row_beats_partial_row_of_equal_priority():
+    df = _rows(
+        ("HTML", "2024-02-20", "W", "", "12,000", ""),
+        ("HTML", "2024-02-20", "W", "15,000", "12,000", "11,000"),
+        ("HTML", "2024-02-20", "W", "", "12,000", ""),
+    )
+    kept, log = link_records(df)
+    assert kept["SourceURL"].tolist() == ["doc1"]
+    assert log["Match"].tolist() == ["near", "near"]
+
+
+def test_correction_wins_tie_and_is_logged_as_conflict():
+    df = _rows(
+        ("XML", "2024-02-20", "C", "30,000", "25,000", "25,000"),
+        ("XML", "2024-04-02", "C", "30,000", "21,500", "21,500"),
+    )
+    kept, log = link_records(df)
+    assert kept["SourceURL"].tolist() == ["doc1"]
+    assert kept["ABC"].tolist() == ["21,500"]
+    assert log["Match"].tolist() == ["conflict"]
+    assert log["Kept_PublicationDate"].tolist() == ["2024-04-02"]
+
+
+def test_leading_digit_change_is_not_a_slip():
+    a = np.array([17170.0, 17170.0, 17170.0])
+    b = np.array([27170.0, 17190.0, 1717.0])
+    assert _digit_slips(a, b).tolist() == [12, 1, 12]
@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+pdfplumber = pytest.importorskip("pdfplumber")
+
+import scrape_goa_fedreg as fr
+
+
+def _pdf_bytes(pages):
+    """Minimal PDF with one Helvetica text line per entry of each page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        ops = []
+        for j, line in enumerate(lines):
+            text = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"BT /F1 9 Tf 40 {760 - 14 * j} Td ({text}) Tj ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content)
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % n + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for off in offsets:
+        out.write(b"%010d 00000 n \n" % off)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+BODY_1 = [
+    "Pollock W 31,000 30,000 30,000",
+    "Pollock C 41,000 40,000 40,000",
+    "Pollock E 11,000 10,000 10,000",
+    "Pacific cod W 21,000 20,000 19,000",
+    "Pacific cod C 31,500 30,500 29,500",
+    "Pacific cod E 5,100 5,000 4,900",
+]
+BODY_2 = [
+    "Pollock W 32,000 31,000 31,000",
+    "Pollock C 42,000 41,000 41,000",
+    "Pollock E 12,000 11,000 11,000",
+    "Pacific cod W 22,000 21,000 20,000",
+    "Pacific cod C 32,500 31,500 30,500",
+    "Pacific cod E 5,200 5,100 5,000",
+]
+PAGES = [
+    ["SUMMARY: NMFS issues final 2024 and 2025 harvest specifications.", "See the tables below."],
+    # Caption and header only; the body starts on the next page.
+    ["TABLE 1 - FINAL 2024 OFL, ABC AND TAC (mt)", "Species Area OFL ABC TAC"],
+    BODY_1,
+    ["Classification", "This action is exempt from review under E.O. 12866."],
+    ["TABLE 2 - FINAL 2025 OFL, ABC AND TAC (mt)", "Species Area OFL ABC TAC"] + BODY_2,
+]
+
+
+@pytest.fixture
+def pdf():
+    with pdfplumber.open(io.BytesIO(_pdf_bytes(PAGES))) as doc:
+        yield doc
+
+
+def test_caption_page_without_tonnages_starts_table(pdf):
+    assert fr.candidate_pages(pdf) == [1, 2, 4]
+
+
+def test_prefilter_keeps_rows_of_full_scan(pdf):
+    prefiltered = fr.PdfPageCache(pdf)
+    full = fr.PdfPageCache(pdf, prefilter=False)
+    rows = fr.parse_pdf_text_tables(pdf, 2024, 2025, cache=prefiltered)
+    assert rows == fr.parse_pdf_text_tables(pdf, 2024, 2025, cache=full)
+    assert len(rows) == 12
+    assert {r["ProjYear"] for r in rows} == {2024, 2025}
+    # Only candidate pages are laid out.
+    assert {i for i, _ in prefiltered._text} == {1, 2, 4}
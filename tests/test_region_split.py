@@ -0,0 +1,60 @@
+import io
+
+import pandas as pd
+
+from scrape_goa_fedreg import link_records, parse_html_tables, parse_table
+
+BOTH = ("GOA", "BSAI")
+
+
+def _table(rows):
+    return pd.DataFrame(rows, columns=["Species", "Area", "2024 OFL", "2024 ABC", "2024 TAC"])
+
+
+def test_bsai_subareas_survive_linkage():
+    tbl = _table([
+        ("Pollock", "Bering Sea (BS)", "3,162,000", "2,313,000", "1,300,000"),
+        ("Pollock", "Aleutian Islands (AI)", "52,383", "43,413", "19,000"),
+        ("Pollock", "Bogoslof District", "115,146", "86,360", "250"),
+        ("Pacific Cod", "Eastern Aleutian District", "", "", "10,000"),
+    ])
+    rows = parse_table(tbl, 2024, 2025, regions=BOTH, region_hint="BSAI")
+    assert [r["Area"] for r in rows] == ["BS", "AI", "Bogoslof", "EAI"]
+
+    df = pd.DataFrame(rows).assign(AssmentYr=2023, lag=1, SourceType="HTML", SourceURL="doc")
+    kept, log = link_records(df)
+    assert sorted(kept["Area"]) == ["AI", "BS", "Bogoslof", "EAI"]
+    assert log.empty
+
+
+def test_unlabeled_rows_take_region_from_rows_above():
+    tbl = _table([
+        ("Total", "Total", "1", "1", "1"),
+        ("Pollock", "Bering Sea (BS)", "3,162,000", "2,313,000", "1,300,000"),
+        ("Pollock", "Total", "3,329,529", "2,442,773", "1,319,250"),
+        ("Pollock", "W (610)", "40,000", "30,000", "30,000"),
+        ("Pollock", "Total", "200,000", "150,000", "150,000"),
+    ])
+    rows = parse_table(tbl, 2024, 2025, regions=BOTH)
+    assert [(r["Region"], r["Area"]) for r in rows] == [
+        ("BSAI", "BS"), ("BSAI", "Total"), ("GOA", "Shumagin (610)"), ("GOA", "Total"),
+    ]
+
+
+def test_unplaced_total_is_dropped():
+    tbl = _table([("Pollock", "Total", "200,000", "150,000", "150,000")])
+    assert parse_table(tbl, 2024, 2025, regions=BOTH) == []
+
+
+def test_html_caption_sets_table_region():
+    html = b"""<html><body>
+    <h2>Harvest specifications</h2>
+    <p>Table 1 -- Final 2024 OFLs, ABCs and TACs in the Gulf of Alaska</p>
+    <table><tr><th>Species</th><th>Area</th><th>2024 OFL</th><th>2024 ABC</th><th>2024 TAC</th></tr>
+    <tr><td>Pollock</td><td>Total</td><td>200,000</td><td>150,000</td><td>150,000</td></tr></table>
+    <table><caption>Table 2 -- Final 2024 harvest specifications in the Bering Sea and Aleutian Islands</caption>
+    <tr><th>Species</th><th>Area</th><th>2024 OFL</th><th>2024 ABC</th><th>2024 TAC</th></tr>
+    <tr><td>Pollock</td><td>Total</td><td>3,329,529</td><td>2,442,773</td><td>1,319,250</td></tr></table>
+    </body></html>"""
+    rows = parse_html_tables(io.BytesIO(html), 2024, 2025, regions=BOTH)
+    assert [(r["Region"], r["OFL"]) for r in rows] == [("GOA", 200000), ("BSAI", 3329529)]